@@ -1,58 +1,126 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+import time
+_import_started = time.perf_counter()  # Import time is reported by /health
+
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, g, stream_with_context
 from functools import wraps
+import base64
+import csv
+import hashlib
+import io
 import json
 import os
 import requests
 import sqlite3
+import threading
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Database connection (per-thread reuse, WAL mode - see db.py)
+from db import (DB_PATH, PRICE_TIERS, close_thread_connection, connect, get_catalogue_version, get_db_connection,
+                init_catalogue_schema, release_thread_connection)
+from dietary_flags import add_dietary_masks, dietary_mask, dietary_text, restriction_bit
+from health_prober import HealthProber
+from migrate_to_sqlite import (IMPORT_COLUMNS, URL_INDEX, import_restaurants, iter_json_array, iter_ndjson, iter_records,
+                               normalize_record)
+from parallel_scoring import SCORING_WORKERS, get_sharded_scorer, start_pool
+from result_cursors import (RESULT_CURSOR_MAX_ITEMS, decode_cursor, encode_cursor, init_result_cursors,
+                            load_ranking, ranking_pending, save_ranking)
+from search_logger import init_rollup_tables, search_writer
+from semantic_search import create_retriever
+from text_search import TEXT_COLUMNS, init_text_search, relevance_join, text_match_condition
+from logging_config import debug_enabled, record_stage, setup_logging, start_request_logging, timed_stage
+from metrics import ANALYSIS_FALLBACKS, RECOMMEND_REQUESTS, observe_stages, record_cache, render_metrics
+
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-change-this-in-production')
 
-# Database connection
-def get_db_connection():
-    """Get SQLite database connection"""
-    conn = sqlite3.connect('data/restaurants.db')
-    conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-    return conn
+# Structured, non-blocking logging (see logging_config.py)
+logger = setup_logging()
+
+@app.before_request
+def assign_request_id():
+    start_request_logging()
+
+@app.teardown_request
+def release_db_connection(exception=None):
+    # The thread's connection outlives the request: roll back whatever it left open
+    release_thread_connection()
+
+@app.after_request
+def add_request_id_header(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '')
+    # Per-stage timings for browser dev tools and the load-test harness
+    if g.get('stage_timings'):
+        response.headers['Server-Timing'] = ', '.join(
+            f'{stage};dur={elapsed_ms}' for stage, elapsed_ms in g.stage_timings.items()
+        )
+    return response
+
+# Static asset URLs carry a content hash so they can be cached for a long time
+_asset_versions = {}
+
+def asset_url(filename):
+    """URL for a file in static/, versioned by its content hash"""
+    version = _asset_versions.get(filename)
+    if version is None or app.debug:
+        with open(os.path.join(app.static_folder, filename), 'rb') as f:
+            version = hashlib.sha1(f.read()).hexdigest()[:12]
+        _asset_versions[filename] = version
+    return url_for('static', filename=filename, v=version)
+
+app.jinja_env.globals['asset_url'] = asset_url
 
 def init_search_history_table():
-    """Initialize search history table if it doesn't exist"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS search_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                preferences TEXT,
-                cuisine TEXT,
-                district TEXT,
-                budget TEXT,
-                results_count INTEGER,
-                language TEXT,
-                session_id TEXT
-            )
-        ''')
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Error creating search_history table: {e}")
+    """Initialize search history table if it doesn't exist (errors fail startup)"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            preferences TEXT,
+            cuisine TEXT,
+            district TEXT,
+            budget TEXT,
+            results_count INTEGER,
+            language TEXT,
+            session_id TEXT
+        )
+    ''')
+    # Keyset pagination index for the admin search history view
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_search_history_timestamp_id ON search_history(timestamp, id)')
+    # Daily analytics rollups, maintained by the search_history writer
+    init_rollup_tables(conn)
+    conn.commit()
+    conn.close()
+
+def init_catalogue_tables():
+    """Initialize restaurant indexes, catalogue version tracking and the full-text
+    index; True if the schema was migrated (errors fail startup)"""
+    global text_search_enabled
+    conn = get_db_connection()
+    migrated = init_catalogue_schema(conn)
+    if migrated:
+        print("🔧 Migrated restaurants table to the typed schema (integer ratings, price tier)")
+    text_search_enabled = init_text_search(conn)
+    if not text_search_enabled:
+        print("⚠️ SQLite has no FTS5 trigram support; text search falls back to LIKE scans")
+    return migrated
+
+text_search_enabled = False
 
 def init_database_from_json():
-    """Initialize database from JSON file if database doesn't exist"""
-    import os
-    
-    db_path = 'data/restaurants.db'
+    """Initialize database from JSON file if the restaurants table doesn't exist"""
     json_path = 'data/openrice_complete.json'
     
-    # Check if database already exists
-    if os.path.exists(db_path):
+    # The connection creates an empty database file, so check for the table itself
+    conn = get_db_connection()
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'restaurants'").fetchone():
         return False
     
-    print("🔧 Database not found. Creating from JSON...")
+    print("🔧 Restaurants table not found. Creating from JSON...")
     
     # Check if JSON file exists
     if not os.path.exists(json_path):
@@ -60,103 +128,42 @@ def init_database_from_json():
         return False
     
     try:
-        # Create data directory if it doesn't exist
-        os.makedirs('data', exist_ok=True)
-        
-        # Load JSON data
-        with open(json_path, 'r', encoding='utf-8') as f:
-            restaurants_data = json.load(f)
-        
-        print(f"📄 Loaded {len(restaurants_data)} restaurants from JSON")
-        
-        # Create database and table
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS restaurants (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name_en TEXT,
-                name_zh TEXT,
-                address_en TEXT,
-                address_zh TEXT,
-                district_en TEXT,
-                district_zh TEXT,
-                cuisine_en TEXT,
-                cuisine_zh TEXT,
-                price TEXT,
-                phone TEXT,
-                opening_hours_en TEXT,
-                opening_hours_zh TEXT,
-                rating_smile TEXT,
-                rating_ok TEXT,
-                rating_cry TEXT,
-                description_en TEXT,
-                description_zh TEXT,
-                popular_dishes_en TEXT,
-                popular_dishes_zh TEXT,
-                url TEXT
-            )
-        ''')
-        
-        # Insert data
-        print("💾 Inserting data into database...")
-        for restaurant in restaurants_data:
-            cursor.execute('''
-                INSERT INTO restaurants (
-                    name_en, name_zh, address_en, address_zh, district_en, district_zh,
-                    cuisine_en, cuisine_zh, price, phone, opening_hours_en, opening_hours_zh,
-                    rating_smile, rating_ok, rating_cry, description_en, description_zh,
-                    popular_dishes_en, popular_dishes_zh, url
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                restaurant.get('name_en'),
-                restaurant.get('name_zh'),
-                restaurant.get('address_en'),
-                restaurant.get('address_zh'),
-                restaurant.get('district_en'),
-                restaurant.get('district_zh'),
-                restaurant.get('cuisine_en'),
-                restaurant.get('cuisine_zh'),
-                restaurant.get('price'),
-                restaurant.get('phone'),
-                restaurant.get('opening_hours_en'),
-                restaurant.get('opening_hours_zh'),
-                restaurant.get('rating_smile'),
-                restaurant.get('rating_ok'),
-                restaurant.get('rating_cry'),
-                restaurant.get('description_en'),
-                restaurant.get('description_zh'),
-                restaurant.get('popular_dishes_en'),
-                restaurant.get('popular_dishes_zh'),
-                restaurant.get('url')
-            ))
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"✅ Database created successfully with {len(restaurants_data)} restaurants!")
+        # Streamed, batched import (see migrate_to_sqlite.py); it needs the
+        # database to itself to relax journaling
+        close_thread_connection()
+        stats = import_restaurants(iter_records(json_path), DB_PATH)
+        print(f"✅ Database created successfully with {stats['processed']} restaurants "
+              f"({stats['rows_per_second']:,} rows/s)!")
         return True
         
     except Exception as e:
         print(f"❌ Error creating database: {e}")
         return False
 
+# 'memory' scores the whole catalogue, held by every worker; 'sql' leaves it
+# in SQLite and scores only the candidates fetch_candidates() selects
+RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'memory')
+RETRIEVAL_MAX_CANDIDATES = int(os.getenv('RETRIEVAL_MAX_CANDIDATES', '20000'))
+
 def load_restaurants():
-    """Load all restaurants from SQLite database"""
+    """Load all restaurants from SQLite database (none in SQL retrieval mode)"""
     try:
         conn = get_db_connection()
+        if RETRIEVAL_MODE == 'sql':
+            count = conn.execute('SELECT COUNT(*) FROM restaurants').fetchone()[0]
+            print(f"🗄️ SQL retrieval mode: {count} restaurants stay in SQLite")
+            return []
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM restaurants')
         rows = cursor.fetchall()
         conn.close()
         
-        # Convert Row objects to dictionaries
-        restaurants = [dict(row) for row in rows]
+        # Convert Row objects to dictionaries, flagging common dietary restrictions once
+        restaurants = add_dietary_masks([dict(row) for row in rows])
         
         print(f"📂 Loaded {len(restaurants)} restaurants from SQLite")
         if restaurants:
-            print(f"🔍 Sample restaurant keys: {list(restaurants[0].keys())[:10]}")
+            logger.debug("Sample restaurant keys: %s", list(restaurants[0].keys())[:10])
         
         return restaurants
     except sqlite3.Error as e:
@@ -171,10 +178,145 @@ def load_restaurants():
             print("❌ Failed to initialize database")
             return []
 
-restaurants = load_restaurants()
+def build_filter_options(restaurants):
+    """Sorted distinct districts and cuisines used by the search filters"""
+    return {
+        'districts_en': sorted({r['district_en'] for r in restaurants if r.get('district_en')}),
+        'districts_zh': sorted({r['district_zh'] for r in restaurants if r.get('district_zh')}),
+        'cuisines_en': sorted({r['cuisine_en'] for r in restaurants if r.get('cuisine_en')}),
+        'cuisines_zh': sorted({r['cuisine_zh'] for r in restaurants if r.get('cuisine_zh')})
+    }
+
+def query_filter_options(conn):
+    """build_filter_options() straight from the database, for SQL retrieval mode"""
+    def distinct(column):
+        return [row[0] for row in conn.execute(
+            f"SELECT DISTINCT {column} FROM restaurants WHERE {column} != '' ORDER BY {column}"
+        )]
+    return {
+        'districts_en': distinct('district_en'),
+        'districts_zh': distinct('district_zh'),
+        'cuisines_en': distinct('cuisine_en'),
+        'cuisines_zh': distinct('cuisine_zh')
+    }
+
+def load_filter_options():
+    if RETRIEVAL_MODE == 'sql':
+        return query_filter_options(get_db_connection())
+    return build_filter_options(restaurants)
+
+def read_catalogue_version():
+    """Catalogue version from the database, or None if unavailable"""
+    try:
+        return get_catalogue_version(get_db_connection())
+    except sqlite3.Error:
+        return None
+
+# Catalogue state derived once per catalogue version (per worker)
+CATALOGUE_CHECK_INTERVAL = float(os.getenv('CATALOGUE_CHECK_INTERVAL', '5'))
+catalogue_version = None
+filter_options = {}
+page_cache = {}  # Rendered index page per language
+_catalogue_checked_at = 0.0
+
+def reload_catalogue(embed=False):
+    """Reload restaurants and rebuild everything derived from them
+
+    embed: the change was made here (admin), so this process embeds the
+    new and edited restaurants for semantic retrieval; others only reload
+    """
+    global restaurants, catalogue_version, filter_options
+    # Read the version first: a change during the load triggers another reload
+    version = read_catalogue_version()
+    restaurants = load_restaurants()
+    filter_options = load_filter_options()
+    catalogue_version = version
+    page_cache.clear()
+    if semantic_retriever:
+        semantic_retriever.refresh(embed=embed)
+
+def refresh_catalogue_if_stale():
+    """Reload if another worker changed the catalogue (checked every few seconds)"""
+    global _catalogue_checked_at
+    now = time.monotonic()
+    if now - _catalogue_checked_at < CATALOGUE_CHECK_INTERVAL:
+        return
+    _catalogue_checked_at = now
+    version = read_catalogue_version()
+    if version is not None and version != catalogue_version:
+        logger.info("Catalogue changed (version %s -> %s), reloading", catalogue_version, version)
+        reload_catalogue()
 
-# Initialize search history table
-init_search_history_table()
+def catalogue_loaded():
+    """True if there are restaurants to recommend (in memory, or in SQLite in SQL retrieval mode)"""
+    if RETRIEVAL_MODE == 'sql':
+        return get_db_connection().execute('SELECT 1 FROM restaurants LIMIT 1').fetchone() is not None
+    return bool(restaurants)
+
+# Startup: importing app.py only defines things; initialize_app() creates the
+# database, loads the catalogue and builds its indexes. 'eager' runs it during
+# the import (under gunicorn with GUNICORN_PRELOAD=1 that is once, in the
+# master, and workers share the result copy-on-write); 'background' runs it
+# in a thread so the worker accepts connections at once. Until it succeeds
+# every page and API answers 503 and /health/ready reports not ready.
+APP_INIT = os.getenv('APP_INIT', 'eager')
+# Set for gunicorn.conf.py: the master initializes but never serves
+GUNICORN_PRELOAD = os.getenv('GUNICORN_PRELOAD', '0') == '1'
+# Embed new and edited restaurants while initializing (SEMANTIC_SEARCH=1). Off in
+# gunicorn workers without preload (see gunicorn.conf.py): they only load the vectors
+SEMANTIC_EMBED_ON_START = os.getenv('SEMANTIC_EMBED_ON_START', '1') == '1'
+startup = {'mode': APP_INIT, 'status': 'pending', 'error': None, 'import_seconds': None, 'init_seconds': None}
+_init_lock = threading.Lock()
+restaurants = []
+semantic_retriever = None
+
+def start_scoring_pool():
+    """Fork the parallel scoring workers (SCORING_WORKERS) over the loaded catalogue"""
+    if RETRIEVAL_MODE == 'memory':
+        start_pool(restaurants, catalogue_version, load_restaurants, calculate_match_score, MIN_MATCH_SCORE)
+
+def initialize_app():
+    """Create or migrate the database, then load the catalogue and build its indexes; True once ready"""
+    global restaurants, catalogue_version, filter_options, semantic_retriever
+    with _init_lock:
+        if startup['status'] == 'ready':
+            return True
+        startup['status'] = 'initializing'
+        start = time.perf_counter()
+        try:
+            init_database_from_json()
+            init_search_history_table()
+            init_result_cursors(get_db_connection())
+            # Restaurant indexes and catalogue version triggers (migrating a legacy schema first)
+            init_catalogue_tables()
+            # Read the version first: a change during the load triggers a reload
+            catalogue_version = read_catalogue_version()
+            restaurants = load_restaurants()
+            filter_options = load_filter_options()
+            if not catalogue_loaded():
+                raise RuntimeError(f"No restaurants in {DB_PATH}")
+            # Fork the scoring workers before this process starts its own background
+            # threads; with GUNICORN_PRELOAD each worker does it in post_fork instead
+            if not GUNICORN_PRELOAD:
+                start_scoring_pool()
+            # Optional embedding index (SEMANTIC_SEARCH=1, see semantic_search.py); later
+            # catalogue changes refresh it in the background
+            semantic_retriever = create_retriever()
+            if semantic_retriever:
+                semantic_retriever.load(embed=SEMANTIC_EMBED_ON_START)
+        except Exception as e:
+            # Leave nothing half-done open on this thread's connection
+            get_db_connection().rollback()
+            startup.update(status='failed', error=str(e))
+            logger.error("Startup failed after %.2fs: %s", time.perf_counter() - start, e)
+            print(f"❌ Startup failed: {e}")
+            return False
+        # With GUNICORN_PRELOAD the master never serves: each worker starts it in post_fork
+        if not GUNICORN_PRELOAD:
+            health_prober.start()
+        startup.update(status='ready', error=None, init_seconds=round(time.perf_counter() - start, 3))
+        print(f"✅ Ready in {startup['init_seconds']:.2f}s")
+        return True
 
 # AI Service Configuration
 AI_SERVICE = os.getenv('AI_SERVICE', 'ollama')  # 'ollama', 'openrouter', or 'openai'
@@ -184,6 +326,21 @@ OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
 
+def ai_settings():
+    """Current AI provider settings (the admin panel can change them at runtime)"""
+    return {
+        'service': AI_SERVICE,
+        'ollama_url': OLLAMA_URL,
+        'ollama_model': OLLAMA_MODEL,
+        'openrouter_configured': bool(OPENROUTER_API_KEY),
+        'openai_configured': bool(OPENAI_API_KEY),
+        'openai_model': OPENAI_MODEL
+    }
+
+# Provider status for /health, refreshed in the background (see health_prober.py);
+# started by initialize_app, or by the first /health call
+health_prober = HealthProber(ai_settings)
+
 def analyze_with_ollama(prompt):
     """Use Ollama local LLM for analysis"""
     try:
@@ -201,7 +358,7 @@ def analyze_with_ollama(prompt):
         else:
             return None
     except Exception as e:
-        print(f"Ollama error: {e}")
+        logger.warning("Ollama error: %s", e)
         return None
 
 def analyze_with_openrouter(prompt):
@@ -224,7 +381,7 @@ def analyze_with_openrouter(prompt):
         else:
             return None
     except Exception as e:
-        print(f"OpenRouter error: {e}")
+        logger.warning("OpenRouter error: %s", e)
         return None
 
 def analyze_with_openai(prompt):
@@ -248,17 +405,18 @@ def analyze_with_openai(prompt):
         else:
             return None
     except Exception as e:
-        print(f"OpenAI error: {e}")
+        logger.warning("OpenAI error: %s", e)
         return None
 
 def analyze_preferences(user_input):
     """Use AI to analyze user preferences and extract key information"""
     lang = user_input.get('lang', 'en')
     conversation_history = user_input.get('conversation_history', [])
+    prompt_start = time.perf_counter()
     
     # Build context from conversation history
     context = ""
-    print(f"🗨️ Conversation history length: {len(conversation_history)}")
+    logger.debug("Conversation history length: %d", len(conversation_history))
     if conversation_history:
         context = "\n\n對話歷史 (用於理解上下文):\n" if lang == 'zh' else "\n\nConversation History (for context):\n"
         for msg in conversation_history[-4:]:  # Last 4 messages
@@ -269,8 +427,8 @@ def analyze_preferences(user_input):
                 if analysis.get('cuisine_types'):
                     cuisines = ', '.join(analysis['cuisine_types'])
                     context += f"  (之前推薦: {cuisines})\n" if lang == 'zh' else f"  (Previous: {cuisines})\n"
-                    print(f"📝 Adding previous cuisine to context: {cuisines}")
-        print(f"📋 Context being sent:\n{context}")
+                    logger.debug("Adding previous cuisine to context: %s", cuisines)
+        logger.debug("Context being sent:\n%s", context)
     
     if lang == 'zh':
         prompt = f"""分析以下餐廳偏好，提取關鍵信息並生成一個友好的回應：
@@ -343,36 +501,43 @@ Provide:
 Return ONLY JSON format: {{"cuisine_types": ["cuisine"], "atmosphere": "vibe", "key_requirements": ["requirements"], "dietary_restrictions": ["things to avoid"], "extracted_budget": "budget or null", "extracted_district": "district or null", "ai_message": "friendly response"}}
 Example: {{"cuisine_types": ["japanese"], "atmosphere": "celebration", "key_requirements": ["high quality", "birthday"], "dietary_restrictions": ["seafood", "spicy"], "extracted_budget": "$201-400", "extracted_district": "Mong Kok", "ai_message": "Happy birthday! Let me find you some high-quality Japanese restaurants in Mong Kok area for your special celebration! I'll avoid seafood and spicy options."}}"""
 
-    if AI_SERVICE == 'ollama':
-        result = analyze_with_ollama(prompt)
-    elif AI_SERVICE == 'openrouter':
-        result = analyze_with_openrouter(prompt)
-    elif AI_SERVICE == 'openai':
-        result = analyze_with_openai(prompt)
-    else:
-        result = None
+    record_stage('prompt', prompt_start)
+    
+    with timed_stage('llm'):
+        if AI_SERVICE == 'ollama':
+            result = analyze_with_ollama(prompt)
+        elif AI_SERVICE == 'openrouter':
+            result = analyze_with_openrouter(prompt)
+        elif AI_SERVICE == 'openai':
+            result = analyze_with_openai(prompt)
+        else:
+            result = None
     
+    fallback_reason = 'no_result'
     if result:
-        print(f"🤖 AI Raw Response: {result[:200]}...")  # Debug: Show first 200 chars
+        logger.debug("AI raw response: %s...", result[:200])
+        fallback_reason = 'no_json'
         try:
-            # Extract JSON from response
-            import re
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                parsed = json.loads(json_match.group())
-                print(f"✅ AI Parsed Analysis: {parsed}")  # Debug: Show parsed result
+            with timed_stage('parse'):
+                # Extract JSON from response
+                import re
+                json_match = re.search(r'\{.*\}', result, re.DOTALL)
+                parsed = json.loads(json_match.group()) if json_match else None
+            if parsed is not None:
+                logger.debug("AI parsed analysis: %s", parsed)
                 # Ensure ai_message exists
                 if 'ai_message' not in parsed:
                     parsed['ai_message'] = ''
                 return parsed
         except Exception as e:
-            print(f"❌ AI Parsing Error: {e}")  # Debug: Show parsing error
-            pass
+            fallback_reason = 'parse_error'
+            logger.warning("AI parsing error: %s", e)
     else:
-        print("⚠️ AI returned no result")  # Debug: No AI response
+        logger.warning("AI returned no result")
     
     # Fallback to basic analysis
-    print("⚠️ Using fallback analysis")  # Debug: Using fallback
+    ANALYSIS_FALLBACKS.labels(provider=AI_SERVICE, reason=fallback_reason).inc()
+    logger.info("Using fallback analysis")
     return {
         "cuisine_types": [],
         "atmosphere": "casual",
@@ -426,34 +591,37 @@ def get_cuisine_keywords(cuisine_query):
     # Also add the original query split by spaces
     keywords.extend(query_lower.split())
     
-    # Remove duplicates and short words
-    return list(set([k for k in keywords if len(k) >= 3]))
+    # Remove duplicates and short words, keeping order: the first matching
+    # term decides the score, so the order must not depend on hash seeds
+    return list(dict.fromkeys(k for k in keywords if len(k) >= 3))
+
+# "Fine dining" is a style, not a cuisine: it matches upscale cuisines at a high price tier
+FINE_DINING_STYLES = ['fine dining', 'fine-dining', 'fine_dining', 'upscale', 'high-end']
+FINE_DINING_CUISINES = ['french', 'italian', 'japanese', 'european', 'contemporary',
+                        'modern', 'fusion', 'international', 'steakhouse', 'seafood']
 
-def calculate_match_score(restaurant, analysis, user_input, debug=False):
+# Restaurants scoring below this are not recommended at all
+MIN_MATCH_SCORE = 30
+# Most points semantic similarity adds (SEMANTIC_SEARCH only)
+SEMANTIC_WEIGHT = 10
+
+def calculate_match_score(restaurant, analysis, user_input, debug=False, semantic_similarity=None):
     """Calculate how well a restaurant matches user preferences"""
     score = 0
     reasons = []
     lang = user_input.get('lang', 'zh')
     
     if debug:
-        print(f"\n🔍 DEBUG Scoring: {restaurant.get('name_en', 'N/A')}")
-        print(f"   Cuisine: {restaurant.get('cuisine_en', 'N/A')}")
-        print(f"   District: {restaurant.get('district_en', 'N/A')}")
-        print(f"   Price: {restaurant.get('price', 'N/A')}")
-        print(f"   Analysis cuisines: {analysis.get('cuisine_types', [])}")
+        logger.debug("DEBUG Scoring: %s", restaurant.get('name_en', 'N/A'))
+        logger.debug("   Cuisine: %s", restaurant.get('cuisine_en', 'N/A'))
+        logger.debug("   District: %s", restaurant.get('district_en', 'N/A'))
+        logger.debug("   Price: %s", restaurant.get('price', 'N/A'))
+        logger.debug("   Analysis cuisines: %s", analysis.get('cuisine_types', []))
     
     # Budget matching (40 points) - Strict exact match only
-    budget_map = {
-        "Below $50": 1,
-        "$51-100": 2,
-        "$101-200": 3,
-        "$201-400": 4,
-        "$401-800": 5,
-        "Above $800": 6
-    }
-    
     user_budget = user_input['budget']
     rest_budget = restaurant.get('price', '')
+    rest_tier = restaurant.get('price_tier')  # Derived from price by SQLite (see db.py)
     
     if user_budget == 'Any':
         # If user doesn't care about budget, give small bonus
@@ -464,8 +632,8 @@ def calculate_match_score(restaurant, analysis, user_input, debug=False):
             reasons.append(f"預算完美配對 ({user_budget})")
         else:
             reasons.append(f"Perfect budget match ({user_budget})")
-    elif user_budget in budget_map and rest_budget in budget_map:
-        diff = abs(budget_map[user_budget] - budget_map[rest_budget])
+    elif user_budget in PRICE_TIERS and rest_tier:
+        diff = abs(PRICE_TIERS[user_budget] - rest_tier)
         if diff == 1:
             score += 15
             if lang == 'zh':
@@ -502,24 +670,20 @@ def calculate_match_score(restaurant, analysis, user_input, debug=False):
         is_fine_dining_query = False
         
         if debug:
-            print(f"   Checking cuisines: {analysis['cuisine_types']}")
-            print(f"   Restaurant cuisine_en: '{rest_cuisine_en}'")
-            print(f"   Restaurant cuisine_zh: '{rest_cuisine_zh}'")
-        
-        # Fine dining upscale cuisines (typically associated with fine dining)
-        fine_dining_cuisines = ['french', 'italian', 'japanese', 'european', 'contemporary', 
-                                'modern', 'fusion', 'international', 'steakhouse', 'seafood']
+            logger.debug("   Checking cuisines: %s", analysis['cuisine_types'])
+            logger.debug("   Restaurant cuisine_en: '%s'", rest_cuisine_en)
+            logger.debug("   Restaurant cuisine_zh: '%s'", rest_cuisine_zh)
         
         for cuisine in analysis['cuisine_types']:
             cuisine_lower = cuisine.lower().strip()
             
             # Special handling for "fine dining" - it's a style, not a cuisine
-            if cuisine_lower in ['fine dining', 'fine-dining', 'fine_dining', 'upscale', 'high-end']:
+            if cuisine_lower in FINE_DINING_STYLES:
                 is_fine_dining_query = True
                 # Match any upscale cuisine + require higher price tier
-                if any(fd_cuisine in rest_cuisine_en for fd_cuisine in fine_dining_cuisines):
+                if any(fd_cuisine in rest_cuisine_en for fd_cuisine in FINE_DINING_CUISINES):
                     # Check if price is appropriate for fine dining
-                    if rest_budget in ['$201-400', '$401-800', 'Above $800']:
+                    if rest_tier and rest_tier >= PRICE_TIERS['$201-400']:
                         score += 40
                         if lang == 'zh':
                             reasons.append(f"符合fine dining菜系")
@@ -527,14 +691,14 @@ def calculate_match_score(restaurant, analysis, user_input, debug=False):
                             reasons.append(f"Matches fine dining cuisine")
                         cuisine_matched = True
                         if debug:
-                            print(f"   ✓ Matched fine dining: {rest_cuisine_en} in price tier {rest_budget}")
+                            logger.debug("   ✓ Matched fine dining: %s in price tier %s", rest_cuisine_en, rest_budget)
                         break
-                    elif rest_budget == '$101-200':
+                    elif rest_tier == PRICE_TIERS['$101-200']:
                         # Mid-tier, partial match
                         score += 20
                         cuisine_matched = True
                         if debug:
-                            print(f"   ~ Partial fine dining match: {rest_cuisine_en}")
+                            logger.debug("   ~ Partial fine dining match: %s", rest_cuisine_en)
                         break
                 continue
             
@@ -542,7 +706,7 @@ def calculate_match_score(restaurant, analysis, user_input, debug=False):
             search_terms = get_cuisine_keywords(cuisine_lower)
             
             if debug:
-                print(f"   Search terms for '{cuisine}': {search_terms[:5]}...")  # Show first 5
+                logger.debug("   Search terms for '%s': %s...", cuisine, search_terms[:5])  # Show first 5
             
             # Get restaurant name and description for extended search
             rest_name_en = restaurant.get('name_en', '').lower()
@@ -581,7 +745,8 @@ def calculate_match_score(restaurant, analysis, user_input, debug=False):
                         reasons.append(f"Matches {cuisine} cuisine")
                     cuisine_matched = True
                     if debug:
-                        print(f"   ✓ Matched cuisine: {cuisine} via term '{term}' in {match_location} (score: {match_score})")
+                        logger.debug("   ✓ Matched cuisine: %s via term '%s' in %s (score: %s)",
+                                     cuisine, term, match_location, match_score)
                     break
             
             if cuisine_matched:
@@ -592,50 +757,49 @@ def calculate_match_score(restaurant, analysis, user_input, debug=False):
             penalty = -10 if is_fine_dining_query else -20
             score += penalty
             if debug:
-                print(f"   ✗ No cuisine match, {penalty} points")
+                logger.debug("   ✗ No cuisine match, %s points", penalty)
     
     # Dietary restrictions / Negative prompts (heavy penalty for matches)
     if analysis.get('dietary_restrictions'):
+        # Common restrictions were flagged when the catalogue loaded (see dietary_flags.py);
+        # SQL retrieval candidates are flagged here
+        rest_dietary_mask = restaurant.get('dietary_mask')
+        rest_text = None
         for restriction in analysis['dietary_restrictions']:
             restriction_lower = restriction.lower().strip()
             
-            # Expand restriction keywords
-            restriction_keywords = get_cuisine_keywords(restriction_lower)
-            
-            if debug:
-                print(f"   Checking restriction: {restriction} → {restriction_keywords[:3]}...")
+            restriction_flag = restriction_bit(restriction_lower)
+            if restriction_flag:
+                if rest_dietary_mask is None:
+                    rest_dietary_mask = dietary_mask(restaurant)
+                matched_via = 'its dietary flag' if rest_dietary_mask & restriction_flag else None
+            else:
+                # Expand restriction keywords and check cuisine, name, description, and dishes
+                restriction_keywords = get_cuisine_keywords(restriction_lower)
+                if debug:
+                    logger.debug("   Checking restriction: %s → %s...", restriction, restriction_keywords[:3])
+                if rest_text is None:
+                    rest_text = dietary_text(restaurant)
+                matched_via = next((f"'{keyword}'" for keyword in restriction_keywords
+                                    if any(keyword in text for text in rest_text)), None)
             
             # Check if restaurant matches any restriction (bad!)
-            for keyword in restriction_keywords:
-                if len(keyword) < 3:
-                    continue
-                    
-                # Check in cuisine, name, description, and dishes
-                if (keyword in rest_cuisine_en or keyword in rest_cuisine_zh or
-                    keyword in rest_name_en or keyword in rest_name_zh or
-                    keyword in rest_desc_en or keyword in rest_desc_zh or
-                    keyword in restaurant.get('popular_dishes_en', '').lower() or
-                    keyword in restaurant.get('popular_dishes_zh', '').lower()):
-                    
-                    # Heavy penalty for matching a restriction
-                    score -= 50
-                    if lang == 'zh':
-                        reasons.append(f"⚠️ 包含不想要的：{restriction}")
-                    else:
-                        reasons.append(f"⚠️ Contains unwanted: {restriction}")
-                    
-                    if debug:
-                        print(f"   ✗ RESTRICTION MATCH: {restriction} via '{keyword}' (-50 points)")
-                    break
+            if matched_via:
+                # Heavy penalty for matching a restriction
+                score -= 50
+                if lang == 'zh':
+                    reasons.append(f"⚠️ 包含不想要的：{restriction}")
+                else:
+                    reasons.append(f"⚠️ Contains unwanted: {restriction}")
+                
+                if debug:
+                    logger.debug("   ✗ RESTRICTION MATCH: %s via %s (-50 points)", restriction, matched_via)
     
-    # Rating score (20 points) - Quality indicator
-    smile = int(restaurant.get('rating_smile', 0) or 0)
-    ok = int(restaurant.get('rating_ok', 0) or 0)
-    cry = int(restaurant.get('rating_cry', 0) or 0)
-    total_ratings = smile + ok + cry
+    # Rating score (20 points) - Quality indicator (total and ratio are stored columns)
+    total_ratings = restaurant.get('rating_total') or 0
+    rating_ratio = restaurant.get('smile_ratio')
     
     if total_ratings >= 20:  # Require meaningful number of ratings
-        rating_ratio = smile / total_ratings
         if rating_ratio >= 0.75:
             score += 20
             if lang == 'zh':
@@ -654,7 +818,6 @@ def calculate_match_score(restaurant, analysis, user_input, debug=False):
             score -= 10  # Penalty for poor ratings
     elif total_ratings >= 10:
         # Moderate number of ratings
-        rating_ratio = smile / total_ratings
         if rating_ratio >= 0.75:
             score += 10
         elif rating_ratio >= 0.6:
@@ -673,8 +836,170 @@ def calculate_match_score(restaurant, analysis, user_input, debug=False):
             else:
                 reasons.append(f"Matches {atmosphere} atmosphere")
     
+    # Semantic similarity bonus (10 points) - embedding match on cuisine, description and dishes
+    if semantic_similarity:
+        bonus = round(SEMANTIC_WEIGHT * semantic_similarity)
+        if bonus > 0:
+            score += bonus
+            if lang == 'zh':
+                reasons.append("貼近你嘅描述")
+            else:
+                reasons.append("Close to what you described")
+    
     return score, reasons
 
+def score_restaurants(restaurants, analysis, user_input, debug=False, semantic=None):
+    """Score every restaurant; returns (matches sorted best first, skipped count)
+
+    semantic maps restaurant ids to the similarity of their embedding to the
+    request (SEMANTIC_SEARCH); without it scores are purely rule based.
+
+    This is the reference ranking: any alternative scoring engine must return
+    the same order, scores and reasons (see benchmarks/golden_rankings.py).
+    """
+    scored_restaurants = []
+    skipped_count = 0
+    
+    for idx, restaurant in enumerate(restaurants):
+        # Skip restaurants with missing critical data
+        if not restaurant.get('name_en') or not restaurant.get('cuisine_en'):
+            skipped_count += 1
+            continue
+        
+        # Debug dump for the first 3 restaurants of sampled requests only
+        score, reasons = calculate_match_score(restaurant, analysis, user_input, debug=debug and idx < 3,
+                                               semantic_similarity=semantic.get(restaurant['id']) if semantic else None)
+        
+        # Only include restaurants with meaningful positive scores
+        if score >= MIN_MATCH_SCORE:  # Require at least one match criterion
+            scored_restaurants.append({
+                'restaurant': restaurant,
+                'score': score,
+                'reasons': reasons
+            })
+    
+    # Sort by score (stable, so ties keep catalogue order)
+    scored_restaurants.sort(key=lambda x: x['score'], reverse=True)
+    return scored_restaurants, skipped_count
+
+# calculate_match_score's rating points, from the stored rating_total/smile_ratio columns
+RATING_POINTS_SQL = '''CASE
+    WHEN rating_total >= 20 THEN CASE WHEN smile_ratio >= 0.75 THEN 20 WHEN smile_ratio >= 0.6 THEN 12
+        WHEN smile_ratio >= 0.5 THEN 5 WHEN smile_ratio < 0.4 THEN -10 ELSE 0 END
+    WHEN rating_total >= 10 THEN CASE WHEN smile_ratio >= 0.75 THEN 10 WHEN smile_ratio >= 0.6 THEN 5
+        WHEN smile_ratio < 0.4 THEN -5 ELSE 0 END
+    ELSE 0 END'''
+
+# Columns calculate_match_score looks for cuisine keywords in
+CUISINE_MATCH_COLUMNS = ['cuisine_en', 'cuisine_zh', 'name_en', 'name_zh', 'description_en', 'description_zh']
+
+def candidate_query(analysis, user_input, semantic=None):
+    """(SQL, params) selecting every restaurant that could reach MIN_MATCH_SCORE
+
+    Mirrors calculate_match_score part by part: budget, district and rating
+    points are computed exactly from stored columns, cuisine counts as a full
+    match for any row containing one of its keywords, the atmosphere as always
+    matching and dietary restrictions as never matching. The sum (score_bound)
+    is an upper bound on the real score, so filtering on it never changes the
+    ranking. A criterion that on its own decides whether a row can reach the
+    threshold is also added as a plain predicate the planner can serve from an
+    index (district, price tier, FTS cuisine candidates, rating).
+    """
+    # (points SQL, params, most points, [(predicate, params, most points without it)])
+    parts = []
+
+    user_budget = user_input['budget']
+    if user_budget == 'Any':
+        parts.append(('5', [], 5, []))
+    elif user_budget in PRICE_TIERS:
+        tier = PRICE_TIERS[user_budget]
+        parts.append((
+            'CASE WHEN price = ? THEN 40 WHEN abs(price_tier - ?) = 1 THEN 15 '
+            'WHEN price_tier IS NOT NULL THEN -15 ELSE 0 END',
+            [user_budget, tier], 40,
+            [('price = ?', [user_budget], 15), ('price_tier BETWEEN ? AND ?', [tier - 1, tier + 1], 0)]
+        ))
+    else:
+        parts.append(('CASE WHEN price = ? THEN 40 ELSE 0 END', [user_budget], 40,
+                      [('price = ?', [user_budget], 0)]))
+
+    district = user_input['district']
+    if district and district != 'Any':
+        # English district names are ASCII, where SQLite's lower() agrees with Python's
+        matches = '(lower(district_en) = ? OR district_zh = ?)'
+        params = [district.lower(), district]
+        parts.append((f'CASE WHEN {matches} THEN 40 ELSE -20 END', params, 40, [(matches, params, -20)]))
+
+    if analysis['cuisine_types']:
+        keywords, fine_dining = [], False
+        for cuisine in analysis['cuisine_types']:
+            cuisine_lower = cuisine.lower().strip()
+            if cuisine_lower in FINE_DINING_STYLES:
+                fine_dining = True
+            else:
+                keywords.extend(get_cuisine_keywords(cuisine_lower))
+        conditions, params = [], []
+        if keywords:
+            condition, condition_params = text_match_condition(keywords, CUISINE_MATCH_COLUMNS, text_search_enabled)
+            conditions.append(condition)
+            params.extend(condition_params)
+        if fine_dining:
+            upscale = ' OR '.join('instr(lower(cuisine_en), ?) > 0' for _ in FINE_DINING_CUISINES)
+            conditions.append(f'(price_tier >= ? AND ({upscale}))')
+            params.extend([PRICE_TIERS['$101-200']] + FINE_DINING_CUISINES)
+        matches = '(' + ' OR '.join(conditions) + ')' if conditions else '0'
+        penalty = -10 if fine_dining else -20
+        parts.append((f'CASE WHEN {matches} THEN 40 ELSE {penalty} END', params, 40, [(matches, params, penalty)]))
+
+    parts.append((RATING_POINTS_SQL, [], 20, [('rating_total >= 10 AND smile_ratio >= 0.5', [], 0)]))
+
+    if analysis.get('atmosphere'):
+        parts.append(('10', [], 10, []))
+
+    if semantic:
+        ids = list(semantic)
+        parts.append((f"CASE WHEN restaurants.id IN ({', '.join('?' for _ in ids)}) THEN {SEMANTIC_WEIGHT} ELSE 0 END",
+                      ids, SEMANTIC_WEIGHT, []))
+
+    best = sum(most for _, _, most, _ in parts)
+    where, where_params = ["name_en != ''", "cuisine_en != ''"], []
+    for _, _, most, gates in parts:
+        # Gates go from most to least selective: take the first one that is required
+        for predicate, params, fallback in gates:
+            if best - most + fallback < MIN_MATCH_SCORE:
+                where.append(predicate)
+                where_params.extend(params)
+                break
+
+    points = ' + '.join(f'({sql})' for sql, _, _, _ in parts)
+    sql = (f"SELECT *, {points} AS score_bound FROM restaurants "
+           f"WHERE {' AND '.join(where)} AND score_bound >= ? "
+           f"ORDER BY score_bound DESC, id LIMIT ?")
+    params = [param for _, part_params, _, _ in parts for param in part_params]
+    return sql, params + where_params + [MIN_MATCH_SCORE]
+
+def fetch_candidates(conn, analysis, user_input, limit=None, semantic=None):
+    """Restaurants that could match, in catalogue order, for score_restaurants (SQL retrieval mode)
+
+    score_restaurants over these gives the same ranking as over the whole
+    catalogue, unless more than limit rows qualify: then only those with the
+    highest score bound are kept.
+    """
+    limit = limit or RETRIEVAL_MAX_CANDIDATES
+    sql, params = candidate_query(analysis, user_input, semantic)
+    rows = conn.execute(sql, params + [limit]).fetchall()
+    if len(rows) >= limit:
+        logger.warning("Candidate set truncated at %d restaurants; ranking may be approximate", limit)
+
+    candidates = []
+    for row in rows:
+        restaurant = dict(row)
+        del restaurant['score_bound']
+        candidates.append(restaurant)
+    # Ties keep catalogue order in score_restaurants, as with the in-memory list
+    candidates.sort(key=lambda restaurant: restaurant['id'])
+    return candidates
+
 def generate_welcome_message(lang='zh'):
     """Generate welcome message with helpful hints"""
     if lang == 'zh':
@@ -724,32 +1049,138 @@ def generate_welcome_message(lang='zh'):
 
 @app.route('/')
 def index():
-    """Render the main page"""
+    """Render the main page (cached per language until the catalogue changes)"""
     lang = request.args.get('lang', 'zh')
+    refresh_catalogue_if_stale()
     
-    # Generate AI welcome message
-    welcome_message = generate_welcome_message(lang)
-    
-    # Get unique districts and cuisines for filters
-    districts_en = sorted(list(set([r.get('district_en', '') for r in restaurants if r.get('district_en')])))
-    districts_zh = sorted(list(set([r.get('district_zh', '') for r in restaurants if r.get('district_zh')])))
-    cuisines_en = sorted(list(set([r.get('cuisine_en', '') for r in restaurants if r.get('cuisine_en')])))
-    cuisines_zh = sorted(list(set([r.get('cuisine_zh', '') for r in restaurants if r.get('cuisine_zh')])))
+    cached = page_cache.get(lang)
+    record_cache('index_page', cached is not None)
+    if cached is None:
+        # Generate AI welcome message
+        welcome_message = generate_welcome_message(lang)
+        
+        html = render_template('index.html', 
+                               lang=lang,
+                               welcome_message=welcome_message,
+                               **filter_options)
+        body = html.encode('utf-8')
+        cached = {
+            'body': body,
+            'etag': hashlib.sha1(body).hexdigest(),
+            'last_modified': datetime.now(timezone.utc)
+        }
+        # Only cache the known languages, and never while editing templates in debug mode
+        if lang in ('zh', 'en') and not app.debug:
+            page_cache[lang] = cached
     
-    return render_template('index.html', 
-                         lang=lang,
-                         welcome_message=welcome_message,
-                         districts_en=districts_en, 
-                         districts_zh=districts_zh,
-                         cuisines_en=cuisines_en,
-                         cuisines_zh=cuisines_zh)
+    response = app.response_class(cached['body'], mimetype='text/html')
+    response.set_etag(cached['etag'])
+    response.last_modified = cached['last_modified']
+    response.cache_control.public = True
+    response.cache_control.no_cache = True  # Always revalidate; a 304 is cheap
+    return response.make_conditional(request)
+
+def semantic_query_text(analysis, user_input):
+    """What the request is about, as text for the embedding backend"""
+    parts = [user_input.get('preferences', '')]
+    parts.extend(analysis.get('cuisine_types') or [])
+    parts.append(analysis.get('atmosphere') or '')
+    parts.extend(analysis.get('key_requirements') or [])
+    return ' '.join(part for part in parts if part)
+
+def format_restaurant(rest):
+    """JSON shape of one restaurant, as rendered by index.js"""
+    return {
+        'id': rest.get('id'),
+        'name_en': rest.get('name_en', ''),
+        'name_zh': rest.get('name_zh', ''),
+        'cuisine_en': rest.get('cuisine_en', ''),
+        'cuisine_zh': rest.get('cuisine_zh', ''),
+        'district_en': rest.get('district_en', ''),
+        'district_zh': rest.get('district_zh', ''),
+        'address_en': rest.get('address_en', ''),
+        'address_zh': rest.get('address_zh', ''),
+        'price': rest.get('price', ''),
+        'phone': rest.get('phone', ''),
+        'opening_hours_en': rest.get('opening_hours_en', ''),
+        'opening_hours_zh': rest.get('opening_hours_zh', ''),
+        'description_en': rest.get('description_en', ''),
+        'description_zh': rest.get('description_zh', ''),
+        'popular_dishes_en': rest.get('popular_dishes_en', ''),
+        'popular_dishes_zh': rest.get('popular_dishes_zh', ''),
+        'rating_smile': rest.get('rating_smile', '0'),
+        'rating_ok': rest.get('rating_ok', '0'),
+        'rating_cry': rest.get('rating_cry', '0'),
+        'url': rest.get('url', '')
+    }
+
+def format_recommendation(rest, score, reasons):
+    """JSON shape of one recommendation, before project_restaurant applies projection, fields and description_chars (adding truncated)"""
+    return {
+        **format_restaurant(rest),
+        'match_score': score,
+        'match_reasons': reasons  # Include reasons for display
+    }
+
+# Bilingual fields a 'lang' projection reduces to one language. Names stay
+# bilingual: the detail view shows both
+LANG_PROJECTED_FIELDS = ['cuisine', 'district', 'address', 'opening_hours', 'description', 'popular_dishes']
+TRUNCATED_FIELDS = ['description_en', 'description_zh', 'popular_dishes_en', 'popular_dishes_zh']
+
+def read_projection(options):
+    """Projection options from request JSON or query args (fields may be comma-separated)"""
+    fields = options.get('fields')
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    description_chars = options.get('description_chars')
+    try:
+        description_chars = None if description_chars in (None, '') else max(0, int(description_chars))
+    except (TypeError, ValueError):
+        description_chars = None
+    return {
+        'projection': options.get('projection', 'full'),
+        'fields': fields or None,
+        'description_chars': description_chars
+    }
+
+def project_restaurant(formatted, lang, projection='full', fields=None, description_chars=None):
+    """Slimmed copy of a format_restaurant/format_recommendation dict
+
+    projection='lang' keeps only the lang variant of LANG_PROJECTED_FIELDS
+    (the other language too where lang's is empty, as index.js falls back to
+    it), fields keeps only the listed keys ('name' means name_en and name_zh),
+    and description_chars cuts descriptions and dishes, setting 'truncated'
+    so the client knows to fetch /restaurant/<id> for the full text.
+    """
+    result = dict(formatted)
+    if projection == 'lang' and lang in ('en', 'zh'):
+        other = 'zh' if lang == 'en' else 'en'
+        for field in LANG_PROJECTED_FIELDS:
+            if result.get(f'{field}_{lang}'):
+                result.pop(f'{field}_{other}', None)
+    if fields:
+        wanted = {'id'}
+        for field in fields:
+            wanted.update((field, f'{field}_en', f'{field}_zh'))
+        result = {key: value for key, value in result.items() if key in wanted}
+    if description_chars is not None:
+        for key in TRUNCATED_FIELDS:
+            value = result.get(key)
+            if value and len(value) > description_chars:
+                result[key] = value[:description_chars].rstrip() + '…' if description_chars else ''
+                result['truncated'] = True
+    return result
 
 @app.route('/recommend', methods=['POST'])
 def recommend():
     """Get restaurant recommendations based on user preferences"""
+    request_start = time.perf_counter()
     try:
+        refresh_catalogue_if_stale()
         request_data = request.json
-        print(f"\n🔍 Raw request keys: {list(request_data.keys())}")
+        debug = debug_enabled()
+        if debug:
+            logger.debug("Raw request keys: %s", list(request_data.keys()))
         
         user_input = {
             'preferences': request_data.get('preferences', ''),
@@ -759,147 +1190,80 @@ def recommend():
             'conversation_history': request_data.get('conversation_history', [])
         }
         
-        print(f"\n{'='*60}")
-        print(f" User Request:")
-        print(f"   Preferences: {user_input['preferences']}")
-        print(f"   Budget: {user_input['budget']}")
-        print(f"   District: {user_input['district']}")
-        print(f"   Language: {user_input['lang']}")
-        print(f"   Conv history: {len(user_input.get('conversation_history', []))} items")
-        print(f"{'='*60}\n")
+        if debug:
+            logger.debug("User request", extra={
+                'preferences': user_input['preferences'],
+                'budget': user_input['budget'],
+                'district': user_input['district'],
+                'lang': user_input['lang'],
+                'history_items': len(user_input['conversation_history'])
+            })
         
         # Analyze user preferences with AI
         analysis = analyze_preferences(user_input)
-        print(f" Final Analysis: {analysis}\n")
+        logger.debug("Final analysis: %s", analysis)
         
         # Override budget and district if AI extracted them from natural language
         extracted_budget = analysis.get('extracted_budget')
         if extracted_budget and extracted_budget not in ['null', 'None', None]:
             user_input['budget'] = extracted_budget
-            print(f"✅ Extracted budget from message: {extracted_budget}")
+            logger.debug("Extracted budget from message: %s", extracted_budget)
         
         extracted_district = analysis.get('extracted_district')
         if extracted_district and extracted_district not in ['null', 'None', None]:
             user_input['district'] = extracted_district
-            print(f"✅ Extracted district from message: {extracted_district}")
-        
-        print(f"📍 Final search params: Budget={user_input['budget']}, District={user_input['district']}")
-        print()
-        
-        # Score all restaurants (using cached list for now, can optimize with SQL later)
-        scored_restaurants = []
-        debug_count = 0
-        skipped_count = 0
-        
-        print(f"🔍 Scoring {len(restaurants)} restaurants...")
+            logger.debug("Extracted district from message: %s", extracted_district)
+        
+        # Nearest restaurants by embedding, for the semantic bonus
+        semantic = None
+        if semantic_retriever:
+            with timed_stage('semantic'):
+                semantic = semantic_retriever.similar(semantic_query_text(analysis, user_input))
+        
+        # Score the in-memory catalogue, or in SQL mode just the restaurants that can still match
+        if RETRIEVAL_MODE == 'sql':
+            with timed_stage('retrieve'):
+                candidates = fetch_candidates(get_db_connection(), analysis, user_input, semantic=semantic)
+        else:
+            candidates = restaurants
+        with timed_stage('score'):
+            # Large in-memory catalogues are scored across worker processes (see parallel_scoring.py)
+            scorer = get_sharded_scorer(candidates) if candidates is restaurants else None
+            if scorer:
+                scored_restaurants, total_matches, skipped_count = scorer.top_k(
+                    candidates, catalogue_version, analysis, user_input, max(10, RESULT_CURSOR_MAX_ITEMS), semantic)
+            else:
+                scored_restaurants, skipped_count = score_restaurants(candidates, analysis, user_input, debug, semantic)
+                total_matches = len(scored_restaurants)
+            top_recommendations = scored_restaurants[:10]
         
-        for idx, restaurant in enumerate(restaurants):
-            # Skip restaurants with missing critical data
-            if not restaurant.get('name_en') or not restaurant.get('cuisine_en'):
-                skipped_count += 1
-                continue
-            
-            # Debug first 3 restaurants
-            debug_this = (idx < 3)
-            score, reasons = calculate_match_score(restaurant, analysis, user_input, debug=debug_this)
-            
-            # Debug first valid restaurant
-            if idx == 0:
-                print(f"🔍 First restaurant being scored:")
-                print(f"   Restaurant object type: {type(restaurant)}")
-                print(f"   Restaurant keys: {list(restaurant.keys())[:10] if isinstance(restaurant, dict) else 'NOT A DICT'}")
-                print(f"   name_en: {restaurant.get('name_en', 'MISSING') if isinstance(restaurant, dict) else 'N/A'}")
-                print(f"   Score: {score}")
-                print()
-            
-            # Only include restaurants with meaningful positive scores
-            if score >= 30:  # Require at least one match criterion
-                scored_restaurants.append({
-                    'restaurant': restaurant,
-                    'score': score,
-                    'reasons': reasons
-                })
-                debug_count += 1
-                if debug_count <= 5:
-                    print(f"✓ Restaurant #{debug_count} scored {score}: {restaurant.get('name_en', 'N/A')} - {restaurant.get('cuisine_en', 'N/A')}")
-        
-        print(f"⚠️ Skipped {skipped_count} restaurants with missing data")
-        
-        # Sort by score and get top 10
-        scored_restaurants.sort(key=lambda x: x['score'], reverse=True)
-        top_recommendations = scored_restaurants[:10]
-        
-        print(f"\n🎯 Scoring Results:")
-        print(f"   Total scored: {len(scored_restaurants)}")
-        print(f"   Top 10 scores: {[item['score'] for item in top_recommendations]}")
-        if top_recommendations:
-            top_rest = top_recommendations[0]['restaurant']
-            print(f"   Top match restaurant object type: {type(top_rest)}")
-            print(f"   Top match keys: {list(top_rest.keys())[:10] if isinstance(top_rest, dict) else 'NOT A DICT'}")
-            print(f"   Top match name_en value: '{top_rest.get('name_en', 'MISSING')}'")
-            print(f"   Top match name_en type: {type(top_rest.get('name_en'))}")
-            print(f"   Top match: {top_rest.get('name_en', 'N/A')} (Score: {top_recommendations[0]['score']})")
-        print()
+        if debug:
+            logger.debug("Scoring results", extra={
+                'scored': total_matches,
+                'skipped': skipped_count,
+                'top_scores': [item['score'] for item in top_recommendations],
+                'top_matches': [item['restaurant'].get('name_en') for item in top_recommendations[:5]]
+            })
         
         # Format recommendations
-        recommendations = []
-        print(f"\n📦 Formatting {len(top_recommendations)} recommendations...")
-        
-        for idx, item in enumerate(top_recommendations):
-            rest = item['restaurant']
-            
-            if idx == 0:
-                print(f"\n🔍 Formatting first restaurant:")
-                print(f"   rest type: {type(rest)}")
-                print(f"   rest.get('name_en'): '{rest.get('name_en', 'MISSING')}'")
-                print(f"   rest['name_en'] direct: '{rest['name_en'] if 'name_en' in rest else 'KEY NOT FOUND'}'")
-            
-            formatted = {
-                'name_en': rest.get('name_en', ''),
-                'name_zh': rest.get('name_zh', ''),
-                'cuisine_en': rest.get('cuisine_en', ''),
-                'cuisine_zh': rest.get('cuisine_zh', ''),
-                'district_en': rest.get('district_en', ''),
-                'district_zh': rest.get('district_zh', ''),
-                'address_en': rest.get('address_en', ''),
-                'address_zh': rest.get('address_zh', ''),
-                'price': rest.get('price', ''),
-                'phone': rest.get('phone', ''),
-                'opening_hours_en': rest.get('opening_hours_en', ''),
-                'opening_hours_zh': rest.get('opening_hours_zh', ''),
-                'description_en': rest.get('description_en', ''),
-                'description_zh': rest.get('description_zh', ''),
-                'popular_dishes_en': rest.get('popular_dishes_en', ''),
-                'popular_dishes_zh': rest.get('popular_dishes_zh', ''),
-                'rating_smile': rest.get('rating_smile', '0'),
-                'rating_ok': rest.get('rating_ok', '0'),
-                'rating_cry': rest.get('rating_cry', '0'),
-                'url': rest.get('url', ''),
-                'match_score': item['score'],
-                'match_reasons': item['reasons']  # Include reasons for display
-            }
-            
-            if idx == 0:
-                print(f"\n📋 Formatted Restaurant Data (#{idx+1}):")
-                print(f"   Name: '{formatted['name_en']}' / '{formatted['name_zh']}'")
-                print(f"   Cuisine: '{formatted['cuisine_en']}'")
-                print(f"   District: '{formatted['district_en']}'")
-                print(f"   Price: '{formatted['price']}'")
-                print(f"   Ratings: 😊{formatted['rating_smile']} 😐{formatted['rating_ok']} 😢{formatted['rating_cry']}")
-            
-            recommendations.append(formatted)
-        
-        print(f"✅ Returning {len(recommendations)} recommendations\n")
-        print(f"{'='*60}\n")
-        
-        # Log search to history
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO search_history (preferences, cuisine, district, budget, results_count, language, session_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
+        with timed_stage('format'):
+            projection = read_projection(request_data)
+            recommendations = [
+                project_restaurant(format_recommendation(item['restaurant'], item['score'], item['reasons']),
+                                   user_input['lang'], **projection)
+                for item in top_recommendations
+            ]
+        
+        # Keep the rest of the ranking for "show more" (see result_cursors.py)
+        next_cursor = None
+        if len(scored_restaurants) > len(top_recommendations):
+            with timed_stage('cursor'):
+                token = save_ranking(scored_restaurants, total_matches)
+                next_cursor = encode_cursor(token, len(top_recommendations))
+        
+        # Log search to history (queued; written in batches off the request path)
+        with timed_stage('search_log'):
+            search_writer.log(
                 user_input['preferences'],
                 ', '.join(analysis.get('cuisine_types', [])) if analysis.get('cuisine_types') else None,
                 user_input['district'],
@@ -907,50 +1271,179 @@ def recommend():
                 len(recommendations),
                 user_input['lang'],
                 session.get('session_id', 'anonymous')
-            ))
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            print(f"Error logging search history: {e}")
+            )
+        
+        record_stage('total', request_start)
+        observe_stages(g.stage_timings, AI_SERVICE)
+        RECOMMEND_REQUESTS.labels(provider=AI_SERVICE, outcome='success').inc()
+        logger.info("recommend", extra={
+            'service': AI_SERVICE,
+            'results': len(recommendations),
+            'total_matches': total_matches,
+            'catalogue_size': len(restaurants),
+            'retrieval_mode': RETRIEVAL_MODE,
+            'candidates': len(candidates),
+            'stages_ms': g.stage_timings
+        })
         
         return jsonify({
             'success': True,
             'recommendations': recommendations,
             'analysis': analysis,
-            'total_matches': len(scored_restaurants)
+            'total_matches': total_matches,
+            'next_cursor': next_cursor,
+            'remaining': max(0, min(len(scored_restaurants), RESULT_CURSOR_MAX_ITEMS) - len(recommendations))
         })
         
     except Exception as e:
+        RECOMMEND_REQUESTS.labels(provider=AI_SERVICE, outcome='error').inc()
+        logger.exception("recommend failed")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/recommend/more')
+def recommend_more():
+    """Next page of a /recommend ranking by cursor, without re-analysis or re-scoring"""
+    try:
+        token, offset = decode_cursor(request.args.get('cursor', ''))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    
+    try:
+        conn = get_db_connection()
+        cached = load_ranking(conn, token)
+        record_cache('result_cursor', cached is not None)
+        if cached is None:
+            if ranking_pending(token):
+                # Saved by another worker and not flushed to SQLite yet
+                response = jsonify({'success': False, 'error': 'Results are still being saved, please retry'})
+                response.headers['Retry-After'] = '1'
+                return response, 503
+            return jsonify({'success': False, 'error': 'Cursor expired, please search again'}), 410
+        
+        page = cached['ranking'][offset:offset + limit]
+        ids = [restaurant_id for restaurant_id, _, _ in page]
+        rows = {}
+        if ids:
+            placeholders = ', '.join('?' for _ in ids)
+            rows = {row['id']: dict(row) for row in
+                    conn.execute(f'SELECT * FROM restaurants WHERE id IN ({placeholders})', ids)}
+        # Restaurants deleted since the search are left out
+        lang = request.args.get('lang', 'zh')
+        projection = read_projection(request.args)
+        recommendations = [
+            project_restaurant(format_recommendation(rows[restaurant_id], score, reasons), lang, **projection)
+            for restaurant_id, score, reasons in page if restaurant_id in rows
+        ]
+        
+        next_offset = offset + len(page)
+        remaining = len(cached['ranking']) - next_offset
+        return jsonify({
+            'success': True,
+            'recommendations': recommendations,
+            'total_matches': cached['total_matches'],
+            'next_cursor': encode_cursor(token, next_offset) if remaining > 0 else None,
+            'remaining': max(0, remaining)
+        })
+    except Exception as e:
+        logger.exception("recommend/more failed")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/restaurant/<int:restaurant_id>')
+def restaurant_detail(restaurant_id):
+    """One restaurant in full, e.g. after recommendations with truncated descriptions"""
+    try:
+        row = get_db_connection().execute('SELECT * FROM restaurants WHERE id = ?', (restaurant_id,)).fetchone()
+        if row is None:
+            return jsonify({'success': False, 'error': 'Restaurant not found'}), 404
+        projection = read_projection(request.args)
+        projection['description_chars'] = None
+        restaurant = project_restaurant(format_restaurant(dict(row)), request.args.get('lang', 'zh'), **projection)
+        response = jsonify({'success': True, 'restaurant': restaurant})
+        response.cache_control.public = True
+        response.cache_control.max_age = 60
+        return response
+    except Exception as e:
+        logger.exception("restaurant detail failed")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/health')
 def health():
-    """Health check endpoint"""
-    ai_status = "Unknown"
+    """Health check endpoint (AI provider status from the last background probe)"""
+    ai = health_prober.snapshot()
+    ai_status = ai.pop('ai_status')
+    ai.pop('ai_service', None)
     
-    if AI_SERVICE == 'ollama':
-        try:
-            response = requests.get(f"{OLLAMA_URL}/api/tags", timeout=2)
-            ai_status = "Connected" if response.status_code == 200 else "Disconnected"
-        except:
-            ai_status = "Disconnected"
-    elif AI_SERVICE == 'openrouter':
-        ai_status = "OpenRouter" if OPENROUTER_API_KEY else "Not Configured"
-    elif AI_SERVICE == 'openai':
-        ai_status = "OpenAI" if OPENAI_API_KEY else "Not Configured"
-    else:
-        ai_status = "Unknown Service"
+    # Rows in the database, not in memory: RETRIEVAL_MODE=sql loads none
+    try:
+        conn = get_db_connection()
+        row = conn.execute("SELECT count FROM catalogue_stats WHERE dimension = 'total'").fetchone()
+        conn.close()
+        restaurants_loaded = row[0] if row else 0
+    except sqlite3.Error:
+        restaurants_loaded = None
     
     return jsonify({
         'status': 'healthy',
+        # The app still answers without the AI (basic analysis fallback), just worse
+        'degraded': ai_status == 'Disconnected',
         'ai_service': AI_SERVICE,
         'ai_status': ai_status,
-        'restaurants_loaded': len(restaurants)
+        'ai_probe': ai,
+        'restaurants_loaded': restaurants_loaded,
+        'retrieval_mode': RETRIEVAL_MODE,
+        'startup': startup
     })
 
+@app.route('/health/live')
+def health_live():
+    """Liveness: the worker is up and serving requests (no dependency checks)"""
+    return jsonify({'status': 'alive'})
+
+def readiness_checks():
+    """(ready, {check: passed}) for /health/ready"""
+    started = startup['status'] == 'ready'
+    try:
+        catalogue = started and catalogue_loaded()
+        database = read_catalogue_version() is not None
+    except sqlite3.Error:
+        catalogue = database = False
+    checks = {'startup': started, 'database': database, 'catalogue': catalogue}
+    return all(checks.values()), checks
+
+@app.route('/health/ready')
+def health_ready():
+    """Readiness: 200 once this worker can serve recommendations, 503 until then"""
+    ready, checks = readiness_checks()
+    return jsonify({
+        'status': 'ready' if ready else 'not ready',
+        'checks': checks,
+        'startup': startup
+    }), 200 if ready else 503
+
+# Endpoints that answer while the app is still starting up
+STARTUP_EXEMPT_ENDPOINTS = {'health', 'health_live', 'health_ready', 'metrics', 'static'}
+
+@app.before_request
+def require_startup():
+    """503 for everything that needs the catalogue until initialize_app() has succeeded"""
+    if startup['status'] == 'ready' or request.endpoint in STARTUP_EXEMPT_ENDPOINTS:
+        return None
+    message = 'Startup failed' if startup['status'] == 'failed' else 'Starting up, please retry shortly'
+    response = jsonify({'error': message, 'startup': startup})
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics (aggregated across workers under gunicorn)"""
+    body, content_type = render_metrics()
+    return app.response_class(body, mimetype=None, content_type=content_type)
+
 # ============================================================================
 # ADMIN PANEL ROUTES
 # ============================================================================
@@ -1001,6 +1494,9 @@ def admin_dashboard():
     lang = request.args.get('lang', 'zh')
     return render_template('admin.html', lang=lang)
 
+# Dashboard statistics for the current catalogue version (per worker)
+_stats_cache = {'version': None, 'stats': None}
+
 @app.route('/admin/api/stats')
 @admin_required
 def admin_stats():
@@ -1009,100 +1505,133 @@ def admin_stats():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Total restaurants
-        cursor.execute('SELECT COUNT(*) as count FROM restaurants')
-        total_restaurants = cursor.fetchone()['count']
+        # catalogue_stats is kept current by triggers (see db.py), and the
+        # result is only recomputed when the catalogue version changes
+        version = get_catalogue_version(conn)
+        record_cache('admin_stats', _stats_cache['version'] == version)
+        if _stats_cache['version'] == version:
+            conn.close()
+            return jsonify(_stats_cache['stats'])
         
-        # Total districts
-        cursor.execute('SELECT COUNT(DISTINCT district_en) as count FROM restaurants WHERE district_en IS NOT NULL')
-        total_districts = cursor.fetchone()['count']
+        cursor.execute('SELECT dimension, value, count FROM catalogue_stats WHERE count != 0')
+        stats_rows = cursor.fetchall()
+        conn.close()
         
-        # Total cuisines
-        cursor.execute('SELECT COUNT(DISTINCT cuisine_en) as count FROM restaurants WHERE cuisine_en IS NOT NULL')
-        total_cuisines = cursor.fetchone()['count']
+        totals = {}
+        groups = {'district': {}, 'cuisine': {}, 'price': {}}
+        for row in stats_rows:
+            if row['dimension'] in groups:
+                groups[row['dimension']][row['value']] = row['count']
+            else:
+                totals[row['dimension']] = row['count']
         
         # Average rating
-        cursor.execute('''
-            SELECT 
-                SUM(CAST(rating_smile AS INTEGER)) as total_smile,
-                SUM(CAST(rating_ok AS INTEGER)) as total_ok,
-                SUM(CAST(rating_cry AS INTEGER)) as total_cry
-            FROM restaurants
-        ''')
-        ratings = cursor.fetchone()
-        total_ratings = (ratings['total_smile'] or 0) + (ratings['total_ok'] or 0) + (ratings['total_cry'] or 0)
-        avg_rating = round((ratings['total_smile'] or 0) / total_ratings * 100) if total_ratings > 0 else 0
+        total_ratings = totals.get('rating_smile', 0) + totals.get('rating_ok', 0) + totals.get('rating_cry', 0)
+        avg_rating = round(totals.get('rating_smile', 0) / total_ratings * 100) if total_ratings > 0 else 0
         
-        # Most popular cuisine
-        cursor.execute('''
-            SELECT cuisine_en, COUNT(*) as count 
-            FROM restaurants 
-            WHERE cuisine_en IS NOT NULL 
-            GROUP BY cuisine_en 
-            ORDER BY count DESC 
-            LIMIT 1
-        ''')
-        popular_cuisine_row = cursor.fetchone()
-        popular_cuisine = popular_cuisine_row['cuisine_en'] if popular_cuisine_row else 'N/A'
-        
-        # Most popular district
-        cursor.execute('''
-            SELECT district_en, COUNT(*) as count 
-            FROM restaurants 
-            WHERE district_en IS NOT NULL 
-            GROUP BY district_en 
-            ORDER BY count DESC 
-            LIMIT 1
-        ''')
-        popular_district_row = cursor.fetchone()
-        popular_district = popular_district_row['district_en'] if popular_district_row else 'N/A'
+        # Most popular cuisine / district
+        popular_cuisine = max(groups['cuisine'], key=groups['cuisine'].get) if groups['cuisine'] else 'N/A'
+        popular_district = max(groups['district'], key=groups['district'].get) if groups['district'] else 'N/A'
         
         # Price distribution
-        cursor.execute('''
-            SELECT price, COUNT(*) as count 
-            FROM restaurants 
-            WHERE price IS NOT NULL 
-            GROUP BY price 
-            ORDER BY 
-                CASE price
-                    WHEN 'Below $50' THEN 1
-                    WHEN '$51-100' THEN 2
-                    WHEN '$101-200' THEN 3
-                    WHEN '$201-400' THEN 4
-                    WHEN '$401-800' THEN 5
-                    WHEN 'Above $800' THEN 6
-                    ELSE 7
-                END
-        ''')
-        price_dist = {row['price']: row['count'] for row in cursor.fetchall()}
-        
-        conn.close()
+        price_dist = {
+            price: groups['price'][price]
+            for price in sorted(groups['price'], key=lambda p: PRICE_TIERS.get(p, len(PRICE_TIERS) + 1))
+        }
         
-        return jsonify({
-            'total_restaurants': total_restaurants,
-            'total_districts': total_districts,
-            'total_cuisines': total_cuisines,
+        stats = {
+            'total_restaurants': totals.get('total', 0),
+            'total_districts': len(groups['district']),
+            'total_cuisines': len(groups['cuisine']),
             'avg_rating': avg_rating,
             'popular_cuisine': popular_cuisine,
             'popular_district': popular_district,
             'price_distribution': price_dist
-        })
+        }
+        _stats_cache['version'] = version
+        _stats_cache['stats'] = stats
+        
+        return jsonify(stats)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Sortable columns for the admin listing (all backed by indexes)
+ADMIN_SORT_COLUMNS = {
+    'name': 'name_en',
+    'cuisine': 'cuisine_en',
+    'district': 'district_en',
+    'price': 'price_tier',
+    'rating': 'rating_smile',
+    'id': 'id'
+}
+
 @app.route('/admin/api/restaurants')
 @admin_required
 def admin_get_restaurants():
-    """Get all restaurants for admin panel"""
+    """Get one page of restaurants with server-side filtering and sorting"""
     try:
+        page = max(1, int(request.args.get('page', 1)))
+        per_page = min(200, max(1, int(request.args.get('per_page', 50))))
+        sort_column = ADMIN_SORT_COLUMNS.get(request.args.get('sort', 'name'), 'name_en')
+        order = 'DESC' if request.args.get('order', 'asc').lower() == 'desc' else 'ASC'
+        
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM restaurants ORDER BY name_en')
-        rows = cursor.fetchall()
+        
+        # Unchanged catalogue + same query -> same page, so let the client revalidate
+        version = get_catalogue_version(conn)
+        etag = hashlib.sha1(f"{version}|{request.query_string.decode('utf-8')}".encode('utf-8')).hexdigest()
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        conditions = []
+        params = []
+        for arg, column in (('district', 'district_en'), ('cuisine', 'cuisine_en'), ('price', 'price')):
+            value = request.args.get(arg)
+            if value:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        query = request.args.get('q', '').strip()
+        join_clause, join_params = '', []
+        fts = relevance_join([query]) if query and text_search_enabled else None
+        if fts:
+            # Full-text index over names, cuisines, districts, descriptions and dishes
+            join_clause, join_params = fts
+        elif query:
+            # Too short for the trigram index (or no FTS5): scan the same columns
+            condition, condition_params = text_match_condition([query], TEXT_COLUMNS, indexed=False)
+            conditions.append(condition)
+            params.extend(condition_params)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        if request.args.get('sort') == 'relevance' and fts:
+            order_clause = 'fts.relevance DESC, id ASC'  # Best match first
+        else:
+            order_clause = f'{sort_column} {order}, id {order}'
+        
+        cursor.execute(f'SELECT COUNT(*) as count FROM restaurants {join_clause} {where_clause}', join_params + params)
+        total_count = cursor.fetchone()['count']
+        
+        cursor.execute(f'''
+            SELECT restaurants.* FROM restaurants {join_clause}
+            {where_clause}
+            ORDER BY {order_clause}
+            LIMIT ? OFFSET ?
+        ''', join_params + params + [per_page, (page - 1) * per_page])
+        restaurants_list = [dict(row) for row in cursor.fetchall()]
         conn.close()
         
-        restaurants_list = [dict(row) for row in rows]
-        return jsonify({'restaurants': restaurants_list})
+        response = jsonify({
+            'restaurants': restaurants_list,
+            'current_page': page,
+            'per_page': per_page,
+            'total_pages': max(1, (total_count + per_page - 1) // per_page),
+            'total_count': total_count
+        })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1154,11 +1683,15 @@ def admin_add_restaurant():
         conn.close()
         
         # Reload restaurants in memory
-        global restaurants
-        restaurants = load_restaurants()
+        reload_catalogue(embed=True)
         
         return jsonify({'success': True, 'id': restaurant_id})
+    except sqlite3.IntegrityError:
+        # The unique url index (see migrate_to_sqlite.URL_INDEX)
+        get_db_connection().rollback()
+        return jsonify({'error': 'Another restaurant already has this url'}), 409
     except Exception as e:
+        get_db_connection().rollback()
         return jsonify({'error': str(e)}), 500
 
 @app.route('/admin/api/restaurants/<int:restaurant_id>', methods=['PUT'])
@@ -1190,11 +1723,14 @@ def admin_update_restaurant(restaurant_id):
         conn.close()
         
         # Reload restaurants in memory
-        global restaurants
-        restaurants = load_restaurants()
+        reload_catalogue(embed=True)
         
         return jsonify({'success': True})
+    except sqlite3.IntegrityError:
+        get_db_connection().rollback()
+        return jsonify({'error': 'Another restaurant already has this url'}), 409
     except Exception as e:
+        get_db_connection().rollback()
         return jsonify({'error': str(e)}), 500
 
 @app.route('/admin/api/restaurants/<int:restaurant_id>', methods=['DELETE'])
@@ -1209,13 +1745,161 @@ def admin_delete_restaurant(restaurant_id):
         conn.close()
         
         # Reload restaurants in memory
-        global restaurants
-        restaurants = load_restaurants()
+        reload_catalogue()
         
         return jsonify({'success': True})
     except Exception as e:
+        get_db_connection().rollback()
         return jsonify({'error': str(e)}), 500
 
+# Streaming export: rows are read and written this many at a time, so memory
+# stays constant however large the table
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def iter_export(sql, fmt):
+    """Rows of a query as NDJSON lines or CSV (header first), one chunk per batch"""
+    # Own connection: the generator outlives the request, and its read
+    # transaction sees one consistent snapshot of the table (WAL)
+    conn = connect()
+    try:
+        cursor = conn.execute(sql)
+        columns = [column[0] for column in cursor.description]
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if fmt == 'csv':
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            elif rows:
+                yield ''.join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows)
+            if not rows:
+                break
+    finally:
+        conn.really_close()
+
+def export_response(sql, name):
+    """Streaming download of a query in the format asked for (?format=ndjson|csv)"""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({'error': f"Unknown format: {fmt} (use ndjson or csv)"}), 400
+    response = app.response_class(iter_export(sql, fmt), mimetype=EXPORT_MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={name}.{fmt}'
+    return response
+
+@app.route('/admin/api/restaurants/export')
+@admin_required
+def admin_export_restaurants():
+    """Stream every restaurant as NDJSON or CSV"""
+    return export_response('SELECT * FROM restaurants ORDER BY id', 'restaurants')
+
+# Bulk import: rows are upserted in batches of this size, all in one transaction
+IMPORT_BATCH_SIZE = 1000
+
+# Bulk import spool (see iter_import). Of several records with one url the last
+# wins. Existing urls are updated in place and only new ones inserted: an
+# INSERT ... ON CONFLICT DO UPDATE would use up an AUTOINCREMENT id per update.
+# The url conditions repeat idx_url's WHERE so the partial index can be used
+_SPOOL_LATEST = ("SELECT MAX(rowid) FROM temp.import_spool WHERE url IS NOT NULL AND url != '' GROUP BY url")
+SPOOL_UPDATE_SQL = f'''
+    UPDATE restaurants SET {', '.join(f'{column} = spool.{column}' for column in IMPORT_COLUMNS if column != 'url')}
+    FROM (SELECT * FROM temp.import_spool WHERE rowid IN ({_SPOOL_LATEST})) AS spool
+    WHERE restaurants.url = spool.url AND restaurants.url IS NOT NULL AND restaurants.url != ''
+'''
+SPOOL_INSERT_SQL = f'''
+    INSERT INTO restaurants ({', '.join(IMPORT_COLUMNS)})
+    SELECT {', '.join(IMPORT_COLUMNS)} FROM temp.import_spool AS spool
+    WHERE url IS NULL OR url = ''
+       OR (rowid IN ({_SPOOL_LATEST}) AND NOT EXISTS (
+           SELECT 1 FROM restaurants
+           WHERE restaurants.url = spool.url AND restaurants.url IS NOT NULL AND restaurants.url != ''))
+    ORDER BY rowid
+'''
+
+def iter_upload_records(stream, mimetype):
+    """Records from a request body: CSV with a header row, a JSON array, or NDJSON"""
+    text = io.TextIOWrapper(stream, encoding='utf-8')
+    if mimetype == 'text/csv':
+        return csv.DictReader(text)
+    if mimetype == 'application/json':
+        return iter_json_array(text)
+    return iter_ndjson(text)
+
+def iter_import(records):
+    """Upsert records by url in one transaction, yielding NDJSON progress lines
+
+    The upload is read and normalized into a temporary table first, so a
+    slow or malformed body never holds the write lock; only the upsert from
+    that table runs inside BEGIN IMMEDIATE.
+    """
+    start = time.perf_counter()
+    processed = skipped = 0
+
+    def progress(**extra):
+        elapsed = time.perf_counter() - start
+        return json.dumps({'processed': processed, 'skipped': skipped, 'seconds': round(elapsed, 2),
+                           'rows_per_second': round(processed / elapsed) if elapsed else processed,
+                           **extra}, ensure_ascii=False) + '\n'
+
+    conn = connect()
+    try:
+        # Spool: a TEMP table lives in this connection's own temp database (no lock on restaurants)
+        conn.execute(f"CREATE TEMP TABLE import_spool ({', '.join(IMPORT_COLUMNS)})")
+        conn.execute('CREATE INDEX temp.import_spool_url ON import_spool(url)')
+        spool_sql = f"INSERT INTO temp.import_spool VALUES ({', '.join('?' for _ in IMPORT_COLUMNS)})"
+        batch = []
+        for record in records:
+            row = normalize_record(record)
+            if row is None:
+                skipped += 1
+                continue
+            batch.append(row)
+            processed += 1
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                conn.executemany(spool_sql, batch)
+                conn.commit()
+                batch.clear()
+                yield progress(stage='reading')
+        if batch:
+            conn.executemany(spool_sql, batch)
+        conn.commit()
+        yield progress(stage='writing')
+
+        conn.execute(URL_INDEX)
+        conn.commit()
+        # Take the write lock up front; readers keep working on the old snapshot (WAL)
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute(SPOOL_UPDATE_SQL)
+        inserted = conn.execute(SPOOL_INSERT_SQL).rowcount
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.error("Bulk import failed after %d rows, nothing imported: %s", processed, e)
+        yield progress(done=True, success=False, error=str(e))
+        return
+    finally:
+        conn.really_close()
+
+    # One catalogue refresh for the whole import
+    reload_catalogue(embed=True)
+    yield progress(done=True, success=True, inserted=inserted, updated=processed - inserted)
+
+@app.route('/admin/api/restaurants/import', methods=['POST'])
+@admin_required
+def admin_import_restaurants():
+    """Bulk upsert restaurants by url from an NDJSON, JSON array or CSV body
+
+    Streams NDJSON progress lines as it goes; the last one has done=true and
+    tells whether the import (all or nothing) succeeded.
+    """
+    records = iter_upload_records(request.stream, request.mimetype)
+    return app.response_class(stream_with_context(iter_import(records)), mimetype='application/x-ndjson')
+
 @app.route('/admin/api/settings', methods=['GET'])
 @admin_required
 def admin_get_settings():
@@ -1306,6 +1990,7 @@ def admin_save_settings():
         OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')
         OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
         OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+        health_prober.wake()
         
         return jsonify({'success': True})
     except Exception as e:
@@ -1319,44 +2004,23 @@ def admin_analytics():
         conn = get_db_connection()
         cursor = conn.cursor()
         
+        # All figures come from the daily rollups (see search_logger.py),
+        # so this stays flat no matter how large search_history grows
+        
         # Total searches
-        cursor.execute('SELECT COUNT(*) as count FROM search_history')
+        cursor.execute("SELECT COALESCE(SUM(count), 0) as count FROM search_rollup_daily WHERE dimension = 'total'")
         total_searches = cursor.fetchone()['count']
         
         # Unique users (sessions)
-        cursor.execute('SELECT COUNT(DISTINCT session_id) as count FROM search_history')
+        cursor.execute("SELECT COALESCE(SUM(count), 0) as count FROM search_rollup_daily WHERE dimension = 'session'")
         unique_users = cursor.fetchone()['count']
         
-        # Popular cuisine
-        cursor.execute('''
-            SELECT cuisine, COUNT(*) as count 
-            FROM search_history 
-            WHERE cuisine IS NOT NULL AND cuisine != ''
-            GROUP BY cuisine 
-            ORDER BY count DESC 
-            LIMIT 1
-        ''')
-        popular_cuisine_row = cursor.fetchone()
-        popular_cuisine = popular_cuisine_row['cuisine'] if popular_cuisine_row else 'N/A'
-        
-        # Popular district
-        cursor.execute('''
-            SELECT district, COUNT(*) as count 
-            FROM search_history 
-            WHERE district IS NOT NULL AND district != '' AND district != 'Any'
-            GROUP BY district 
-            ORDER BY count DESC 
-            LIMIT 1
-        ''')
-        popular_district_row = cursor.fetchone()
-        popular_district = popular_district_row['district'] if popular_district_row else 'N/A'
-        
         # Cuisine stats
         cursor.execute('''
-            SELECT cuisine, COUNT(*) as count 
-            FROM search_history 
-            WHERE cuisine IS NOT NULL AND cuisine != ''
-            GROUP BY cuisine 
+            SELECT value as cuisine, SUM(count) as count 
+            FROM search_rollup_daily 
+            WHERE dimension = 'cuisine'
+            GROUP BY value 
             ORDER BY count DESC 
             LIMIT 10
         ''')
@@ -1364,23 +2028,27 @@ def admin_analytics():
         
         # District stats
         cursor.execute('''
-            SELECT district, COUNT(*) as count 
-            FROM search_history 
-            WHERE district IS NOT NULL AND district != '' AND district != 'Any'
-            GROUP BY district 
+            SELECT value as district, SUM(count) as count 
+            FROM search_rollup_daily 
+            WHERE dimension = 'district'
+            GROUP BY value 
             ORDER BY count DESC 
             LIMIT 10
         ''')
         district_stats = {row['district']: row['count'] for row in cursor.fetchall()}
         
+        # Popular cuisine / district (top of the stats above)
+        popular_cuisine = next(iter(cuisine_stats), 'N/A')
+        popular_district = next(iter(district_stats), 'N/A')
+        
         # Budget stats
         cursor.execute('''
-            SELECT budget, COUNT(*) as count 
-            FROM search_history 
-            WHERE budget IS NOT NULL AND budget != '' AND budget != 'Any'
-            GROUP BY budget 
+            SELECT value as budget, SUM(count) as count 
+            FROM search_rollup_daily 
+            WHERE dimension = 'budget'
+            GROUP BY value 
             ORDER BY 
-                CASE budget
+                CASE value
                     WHEN 'Below $50' THEN 1
                     WHEN '$51-100' THEN 2
                     WHEN '$101-200' THEN 3
@@ -1394,10 +2062,9 @@ def admin_analytics():
         
         # Trend data (last 7 days)
         cursor.execute('''
-            SELECT DATE(timestamp) as date, COUNT(*) as count 
-            FROM search_history 
-            WHERE timestamp >= DATE('now', '-7 days')
-            GROUP BY DATE(timestamp)
+            SELECT date, count 
+            FROM search_rollup_daily 
+            WHERE dimension = 'total' AND date >= DATE('now', '-7 days')
             ORDER BY date
         ''')
         trend_data = [{'date': row['date'], 'count': row['count']} for row in cursor.fetchall()]
@@ -1417,53 +2084,98 @@ def admin_analytics():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def encode_history_cursor(timestamp, row_id):
+    """Encode a search history position as an opaque cursor"""
+    raw = json.dumps([timestamp, row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_history_cursor(cursor_value):
+    """Decode a cursor from encode_history_cursor, or raise ValueError"""
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor_value.encode('ascii')))
+        return str(timestamp), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
 @app.route('/admin/api/search-history')
 @admin_required
 def admin_search_history():
-    """Get search history with pagination"""
+    """Get search history with keyset (cursor) pagination"""
     try:
         page = int(request.args.get('page', 1))
         per_page = 50
         filter_type = request.args.get('filter', 'all')
+        cursor_value = request.args.get('cursor')
         
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Build WHERE clause based on filter
-        where_clause = ''
+        # Range predicates only, so idx_search_history_timestamp_id can be used
+        since = None
         if filter_type == 'today':
-            where_clause = "WHERE DATE(timestamp) = DATE('now')"
+            since = "DATE('now')"
         elif filter_type == 'week':
-            where_clause = "WHERE timestamp >= DATE('now', '-7 days')"
+            since = "DATE('now', '-7 days')"
         elif filter_type == 'month':
-            where_clause = "WHERE timestamp >= DATE('now', '-30 days')"
+            since = "DATE('now', '-30 days')"
         
-        # Get total count
-        cursor.execute(f'SELECT COUNT(*) as count FROM search_history {where_clause}')
+        # Total count comes from the daily rollups instead of a COUNT(*) scan
+        if since:
+            cursor.execute(f"SELECT COALESCE(SUM(count), 0) as count FROM search_rollup_daily WHERE dimension = 'total' AND date >= {since}")
+        else:
+            cursor.execute("SELECT COALESCE(SUM(count), 0) as count FROM search_rollup_daily WHERE dimension = 'total'")
         total_count = cursor.fetchone()['count']
-        total_pages = (total_count + per_page - 1) // per_page
+        total_pages = max(1, (total_count + per_page - 1) // per_page)
+        
+        conditions = []
+        params = []
+        if since:
+            conditions.append(f'timestamp >= {since}')
+        offset = 0
+        if cursor_value:
+            try:
+                after_timestamp, after_id = decode_history_cursor(cursor_value)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            conditions.append('(timestamp, id) < (?, ?)')
+            params.extend([after_timestamp, after_id])
+        else:
+            # Legacy page-number access without a cursor
+            offset = (page - 1) * per_page
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
         
-        # Get paginated data
-        offset = (page - 1) * per_page
+        # Fetch one extra row to know whether there is a next page
         cursor.execute(f'''
             SELECT * FROM search_history 
             {where_clause}
-            ORDER BY timestamp DESC 
+            ORDER BY timestamp DESC, id DESC 
             LIMIT ? OFFSET ?
-        ''', (per_page, offset))
+        ''', params + [per_page + 1, offset])
         
         history = [dict(row) for row in cursor.fetchall()]
         conn.close()
         
+        next_cursor = None
+        if len(history) > per_page:
+            history = history[:per_page]
+            next_cursor = encode_history_cursor(history[-1]['timestamp'], history[-1]['id'])
+        
         return jsonify({
             'history': history,
             'current_page': page,
             'total_pages': total_pages,
-            'total_count': total_count
+            'total_count': total_count,
+            'next_cursor': next_cursor
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/admin/api/search-history/export')
+@admin_required
+def admin_export_search_history():
+    """Stream the whole search history, oldest first, as NDJSON or CSV"""
+    return export_response('SELECT * FROM search_history ORDER BY id', 'search_history')
+
 @app.route('/admin/api/search-history', methods=['DELETE'])
 @admin_required
 def admin_clear_search_history():
@@ -1472,16 +2184,30 @@ def admin_clear_search_history():
         conn = get_db_connection()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM search_history')
+        cursor.execute('DELETE FROM search_rollup_daily')
+        cursor.execute('DELETE FROM search_sessions')
         conn.commit()
         conn.close()
         return jsonify({'success': True})
     except Exception as e:
+        get_db_connection().rollback()
         return jsonify({'error': str(e)}), 500
 
 # ============================================================================
 # END ADMIN PANEL ROUTES
 # ============================================================================
 
+startup['import_seconds'] = round(time.perf_counter() - _import_started, 3)
+logger.info("app.py imported in %.3fs (APP_INIT=%s)", startup['import_seconds'], APP_INIT)
+if APP_INIT == 'background':
+    if SCORING_WORKERS > 1 and RETRIEVAL_MODE == 'memory':
+        # The pool forks in initialize_app, which must not run beside other threads
+        raise RuntimeError("APP_INIT=background can't be combined with SCORING_WORKERS > 1: "
+                           "use APP_INIT=eager (or GUNICORN_PRELOAD=1)")
+    threading.Thread(target=initialize_app, name='app-init', daemon=True).start()
+else:
+    initialize_app()
+
 if __name__ == '__main__':
     print(f"🍽️  AIEat - Hong Kong Restaurant Recommendation System")
     print(f"📊 Loaded {len(restaurants)} restaurants")
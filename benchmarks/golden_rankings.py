@@ -0,0 +1,202 @@
+"""
+Golden-ranking equivalence suite for scoring engines
+
+A recorded corpus of analyses and user inputs with the ranked output of
+the reference engine (app.score_restaurants, the loop /recommend runs)
+lives in benchmarks/golden/rankings.json. Every engine in ENGINES is run
+against the corpus; its top-10 ids, scores, reasons and total match count
+are diffed against the recording, and its speed is reported relative to
+the reference engine. Exits 1 on any ranking drift.
+
+An engine is a callable (restaurants, analysis, user_input) returning the
+full list of matches sorted best first, as dicts with 'restaurant',
+'score' and 'reasons' (the first element of score_restaurants' result),
+or a (top matches, total match count) pair for engines that only rank
+the top of the list.
+
+Usage:
+    python benchmarks/golden_rankings.py                   # check every engine
+    python benchmarks/golden_rankings.py --engine reference
+    python benchmarks/golden_rankings.py --record          # after an intended scoring change
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from load_test import import_app, prepare_database
+from parallel_scoring import ShardedScorer
+from scoring_bench import build_cases
+
+DEFAULT_CORPUS = os.path.join(BENCH_DIR, 'golden', 'rankings.json')
+TOP_N = 10
+
+# Cases beyond the workload mix, covering the other scoring branches
+EXTRA_CASES = [
+    ('budget_mismatch_district_en',
+     {'cuisine_types': ['italian'], 'atmosphere': 'romantic', 'key_requirements': [], 'dietary_restrictions': []},
+     {'preferences': 'Cheap Italian in Central', 'budget': '$51-100', 'district': 'Central', 'lang': 'en'}),
+    ('no_cuisine_district_budget_zh',
+     {'cuisine_types': [], 'atmosphere': 'cozy', 'key_requirements': [], 'dietary_restrictions': []},
+     {'preferences': '旺角有咩好食？', 'budget': '$101-200', 'district': '旺角', 'lang': 'zh'}),
+    ('fine_dining_district_zh',
+     {'cuisine_types': ['fine dining'], 'atmosphere': 'celebration', 'key_requirements': [], 'dietary_restrictions': []},
+     {'preferences': '中環高級餐廳慶祝', 'budget': 'Any', 'district': '中環', 'lang': 'zh'}),
+    ('multiple_cuisines_en',
+     {'cuisine_types': ['thai', 'vietnamese', 'korean'], 'atmosphere': 'casual', 'key_requirements': [],
+      'dietary_restrictions': []},
+     {'preferences': 'Thai, Vietnamese or Korean, something casual', 'budget': 'Any', 'district': 'Any', 'lang': 'en'}),
+    ('seafood_avoid_beef_en',
+     {'cuisine_types': ['seafood'], 'atmosphere': 'lively', 'key_requirements': [], 'dietary_restrictions': ['beef']},
+     {'preferences': 'Seafood, no beef', 'budget': '$201-400', 'district': 'Sai Kung', 'lang': 'en'}),
+    # Some Cantonese places list 咕嚕肉 only in Chinese: the pork flag must catch it
+    ('dim_sum_no_pork_zh',
+     {'cuisine_types': ['dim sum'], 'atmosphere': 'family-friendly', 'key_requirements': [],
+      'dietary_restrictions': ['豬肉']},
+     {'preferences': '想飲茶食點心，唔食豬肉', 'budget': 'Any', 'district': 'Any', 'lang': 'zh'}),
+]
+
+
+def load_app(rows, seed):
+    """Import app.py against the synthetic catalogue the corpus was recorded on"""
+    aieat, _ = import_app(prepare_database(rows, seed))
+    return aieat
+
+
+def build_engines(aieat):
+    """Engines to check, by name; 'reference' is what the corpus was recorded with"""
+    sharded = None
+
+    def parallel(restaurants, analysis, user_input):
+        # SCORING_WORKERS > 1: catalogue shards scored in worker processes, local top-k merged
+        nonlocal sharded
+        if sharded is None:
+            sharded = ShardedScorer(restaurants, aieat.catalogue_version, aieat.load_restaurants,
+                                    aieat.calculate_match_score, aieat.MIN_MATCH_SCORE, max(2, os.cpu_count() or 1))
+        top, total, _ = sharded.top_k(restaurants, aieat.catalogue_version, analysis, user_input, TOP_N)
+        return top, total
+
+    return {
+        'reference': lambda restaurants, analysis, user_input:
+            aieat.score_restaurants(restaurants, analysis, user_input)[0],
+        # RETRIEVAL_MODE=sql: SQLite selects the candidates, the reference loop scores them
+        'sql': lambda restaurants, analysis, user_input:
+            aieat.score_restaurants(aieat.fetch_candidates(aieat.get_db_connection(), analysis, user_input),
+                                    analysis, user_input)[0],
+        'parallel': parallel,
+    }
+
+
+def summarize_ranking(matches):
+    total = None
+    if isinstance(matches, tuple):
+        matches, total = matches
+    return {
+        'total_matches': len(matches) if total is None else total,
+        'top': [{'id': item['restaurant']['id'], 'score': item['score'], 'reasons': item['reasons']}
+                for item in matches[:TOP_N]],
+    }
+
+
+def record_corpus(path, rows, seed):
+    aieat = load_app(rows, seed)
+    reference = build_engines(aieat)['reference']
+    cases = []
+    for name, analysis, user_input in build_cases() + EXTRA_CASES:
+        ranking = summarize_ranking(reference(aieat.restaurants, analysis, user_input))
+        cases.append({'name': name, 'analysis': analysis, 'user_input': user_input, **ranking})
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'catalogue': {'rows': rows, 'seed': seed}, 'cases': cases}, f, ensure_ascii=False, indent=1)
+    print(f"💾 Recorded {len(cases)} cases on {rows} restaurants → {path}")
+
+
+def diff_ranking(expected, actual):
+    """Human-readable differences between a recorded and an actual ranking"""
+    problems = []
+    if expected['total_matches'] != actual['total_matches']:
+        problems.append(f"total_matches {expected['total_matches']} → {actual['total_matches']}")
+    for rank, (want, got) in enumerate(zip(expected['top'], actual['top']), 1):
+        if want['id'] != got['id']:
+            problems.append(f"#{rank}: id {want['id']} → {got['id']}")
+        elif want['score'] != got['score']:
+            problems.append(f"#{rank} (id {want['id']}): score {want['score']} → {got['score']}")
+        elif want['reasons'] != got['reasons']:
+            problems.append(f"#{rank} (id {want['id']}): reasons {want['reasons']} → {got['reasons']}")
+    if len(expected['top']) != len(actual['top']):
+        problems.append(f"top length {len(expected['top'])} → {len(actual['top'])}")
+    return problems
+
+
+def run_engine(engine, restaurants, cases, repeat):
+    """(problems per case name, fastest seconds for the whole corpus)"""
+    problems = {}
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rankings = [engine(restaurants, case['analysis'], case['user_input']) for case in cases]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    for case, matches in zip(cases, rankings):
+        case_problems = diff_ranking(case, summarize_ranking(matches))
+        if case_problems:
+            problems[case['name']] = case_problems
+    return problems, best
+
+
+def check_corpus(path, engine_names, repeat):
+    with open(path, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+    aieat = load_app(corpus['catalogue']['rows'], corpus['catalogue']['seed'])
+    engines = build_engines(aieat)
+    unknown = set(engine_names or []) - set(engines)
+    if unknown:
+        sys.exit(f"Unknown engine(s): {', '.join(sorted(unknown))} (available: {', '.join(engines)})")
+
+    # The reference always runs: speedups are relative to it
+    names = ['reference'] + [name for name in (engine_names or engines) if name != 'reference']
+    cases = corpus['cases']
+    print(f"🔍 {len(cases)} cases on {len(aieat.restaurants)} restaurants\n")
+    print(f"{'engine':<20}{'corpus (ms)':>12}{'speedup':>10}   result")
+
+    failed = False
+    reference_seconds = None
+    for name in names:
+        problems, seconds = run_engine(engines[name], aieat.restaurants, cases, repeat)
+        reference_seconds = reference_seconds or seconds
+        status = '✅ identical' if not problems else f"❌ {len(problems)} case(s) differ"
+        print(f"{name:<20}{seconds * 1000:>12.1f}{reference_seconds / seconds:>9.2f}x   {status}")
+        for case_name, case_problems in problems.items():
+            failed = True
+            print(f"    {case_name}:")
+            for problem in case_problems[:5]:
+                print(f"      {problem}")
+    if failed:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check scoring engines against the golden rankings')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--engine', action='append', help='engine to check (repeatable; default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per engine (fastest is kept)')
+    parser.add_argument('--record', action='store_true', help='re-record the corpus with the reference engine')
+    parser.add_argument('--rows', type=int, default=2000, help='with --record: synthetic catalogue size')
+    parser.add_argument('--seed', type=int, default=42, help='with --record: synthetic catalogue seed')
+    args = parser.parse_args()
+
+    if args.record:
+        record_corpus(args.corpus, args.rows, args.seed)
+    else:
+        check_corpus(args.corpus, args.engine, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
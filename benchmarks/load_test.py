@@ -0,0 +1,270 @@
+"""
+End-to-end load test for /recommend (fully offline)
+
+Boots the Flask app against a synthetic restaurant database and a stub
+Ollama server, replays the weighted query mix from workload.py with N
+concurrent clients, and reports throughput plus p50/p95/p99 latency end to
+end and per stage (from the Server-Timing header app.py sets).
+
+Usage:
+    python benchmarks/load_test.py --rows 10000 --requests 500 --concurrency 8
+    python benchmarks/load_test.py --output benchmarks/baselines/load_test.json
+    python benchmarks/load_test.py --compare benchmarks/baselines/load_test.json --max-regression 20
+    python benchmarks/load_test.py --rows 1000000 --retrieval-mode sql
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import requests
+
+from stub_llm import start_stub_server
+from synthetic_data import build_database
+from workload import sample_queries
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 3),
+        'p50': round(percentile(values, 50), 3),
+        'p95': round(percentile(values, 95), 3),
+        'p99': round(percentile(values, 99), 3),
+        'max': round(values[-1], 3),
+    }
+
+
+def parse_server_timing(header):
+    """'score;dur=1.2, format;dur=0.3' -> {'score': 1.2, 'format': 0.3}"""
+    timings = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if params.startswith('dur='):
+            timings[name] = float(params[4:])
+    return timings
+
+
+def prepare_database(rows, seed):
+    """Fresh copy of the (cached) synthetic database for rows/seed; returns its path
+
+    The app writes search_history into the database it serves, so every run
+    gets its own copy and starts from the same state as the cached original.
+    """
+    cache_dir = os.path.join(tempfile.gettempdir(), 'aieat-bench')
+    cache_path = os.path.join(cache_dir, f'restaurants-{rows}-{seed}.db')
+    if not os.path.exists(cache_path):
+        print(f"🔧 Generating {rows} synthetic restaurants...")
+        start = time.perf_counter()
+        build_database(cache_path, rows, seed)
+        print(f"   done in {time.perf_counter() - start:.1f}s")
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='aieat-run-'), 'restaurants.db')
+    # The backup API also picks up anything still in the cache's WAL
+    source, target = sqlite3.connect(cache_path), sqlite3.connect(db_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+    return db_path
+
+
+def import_app(db_path):
+    """Import app.py against db_path; returns (module, import seconds)"""
+    os.environ['DATABASE_PATH'] = db_path
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    # db.py may already be imported (the synthetic importer uses it) with the default path
+    import db
+    db.DB_PATH = db_path
+
+    start = time.perf_counter()
+    import app as aieat
+    return aieat, time.perf_counter() - start
+
+
+def boot_app(db_path, ollama_url, retrieval_mode='memory'):
+    """Import app.py against the synthetic DB and serve it on a free port"""
+    os.environ['AI_SERVICE'] = 'ollama'
+    os.environ['OLLAMA_URL'] = ollama_url
+    os.environ['RETRIEVAL_MODE'] = retrieval_mode
+
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    aieat, import_seconds = import_app(db_path)
+
+    server = make_server('127.0.0.1', 0, aieat.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}', import_seconds
+
+
+def run_load(base_url, queries, concurrency):
+    """Send all queries with concurrency clients; returns per-request samples"""
+    local = threading.local()
+
+    def send(query):
+        name, payload = query
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = local.session.post(f'{base_url}/recommend', json=payload, timeout=120)
+            ok = response.status_code == 200 and response.json().get('success', False)
+            timings = parse_server_timing(response.headers.get('Server-Timing'))
+        except requests.RequestException:
+            ok, timings = False, {}
+        return name, ok, (time.perf_counter() - start) * 1000, timings
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(send, queries))
+
+
+def build_report(samples, wall_seconds, config):
+    client = [latency for _, ok, latency, _ in samples if ok]
+    stages = defaultdict(list)
+    by_query = defaultdict(list)
+    for name, ok, latency, timings in samples:
+        if not ok:
+            continue
+        by_query[name].append(latency)
+        for stage, elapsed in timings.items():
+            stages[stage].append(elapsed)
+    return {
+        'config': config,
+        'requests': len(samples),
+        'errors': sum(1 for _, ok, _, _ in samples if not ok),
+        'wall_seconds': round(wall_seconds, 3),
+        'throughput_rps': round(len(client) / wall_seconds, 2) if wall_seconds else 0,
+        'latency_ms': {
+            'client': summarize(client),
+            'stages': {stage: summarize(values) for stage, values in sorted(stages.items())},
+        },
+        'by_query_ms': {name: summarize(values) for name, values in sorted(by_query.items())},
+    }
+
+
+def print_report(report, baseline=None):
+    print(f"\n📊 {report['requests']} requests, {report['errors']} errors, "
+          f"{report['throughput_rps']} req/s over {report['wall_seconds']}s")
+    rows = [('client', report['latency_ms']['client'])] + list(report['latency_ms']['stages'].items())
+    base_rows = {}
+    if baseline:
+        base_rows = dict([('client', baseline['latency_ms']['client'])] + list(baseline['latency_ms']['stages'].items()))
+    print(f"{'stage':<14}{'p50':>10}{'p95':>10}{'p99':>10}   (ms)")
+    for stage, stats in rows:
+        line = f"{stage:<14}{stats['p50']:>10.2f}{stats['p95']:>10.2f}{stats['p99']:>10.2f}"
+        base = base_rows.get(stage)
+        if base and base.get('p95'):
+            line += f"   p95 {percent_change(base['p95'], stats['p95']):+.1f}% vs baseline"
+        print(line)
+
+
+def percent_change(before, after):
+    return (after - before) / before * 100 if before else 0.0
+
+
+def find_regressions(report, baseline, max_regression):
+    """Stages whose p95 grew by more than max_regression percent"""
+    regressions = []
+    current = dict([('client', report['latency_ms']['client'])] + list(report['latency_ms']['stages'].items()))
+    previous = dict([('client', baseline['latency_ms']['client'])] + list(baseline['latency_ms']['stages'].items()))
+    for stage, stats in current.items():
+        base = previous.get(stage)
+        # Ignore sub-millisecond stages: their noise dwarfs any real change
+        if base and base.get('p95', 0) >= 1.0:
+            change = percent_change(base['p95'], stats['p95'])
+            if change > max_regression:
+                regressions.append((stage, base['p95'], stats['p95'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline end-to-end load test for /recommend')
+    parser.add_argument('--rows', type=int, default=10000, help='synthetic catalogue size (1k-1M)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0)
+    parser.add_argument('--llm-jitter-ms', type=float, default=0.0)
+    parser.add_argument('--retrieval-mode', choices=['memory', 'sql'], default='memory')
+    parser.add_argument('--output', help='write the JSON report here (e.g. a new baseline)')
+    parser.add_argument('--compare', help='baseline JSON report to compare against')
+    parser.add_argument('--max-regression', type=float,
+                        help='with --compare: exit 1 if any stage p95 regresses by more than this percent')
+    args = parser.parse_args()
+
+    db_path = prepare_database(args.rows, args.seed)
+    stub, stub_url = start_stub_server(latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms)
+    server, base_url, import_seconds = boot_app(db_path, stub_url, args.retrieval_mode)
+    print(f"🚀 App up at {base_url} (import {import_seconds:.2f}s), stub LLM at {stub_url}")
+
+    run_load(base_url, sample_queries(args.warmup, seed=args.seed + 1), args.concurrency)
+
+    queries = sample_queries(args.requests, seed=args.seed)
+    start = time.perf_counter()
+    samples = run_load(base_url, queries, args.concurrency)
+    wall_seconds = time.perf_counter() - start
+
+    config = {
+        'rows': args.rows, 'seed': args.seed, 'requests': args.requests, 'concurrency': args.concurrency,
+        'llm_latency_ms': args.llm_latency_ms, 'llm_jitter_ms': args.llm_jitter_ms,
+        'retrieval_mode': args.retrieval_mode,
+        'app_import_seconds': round(import_seconds, 3),
+        'python': platform.python_version(), 'machine': platform.machine(),
+    }
+    report = build_report(samples, wall_seconds, config)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.output}")
+
+    server.shutdown()
+    stub.shutdown()
+    shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+    if baseline and args.max_regression is not None:
+        regressions = find_regressions(report, baseline, args.max_regression)
+        for stage, before, after, change in regressions:
+            print(f"❌ {stage}: p95 {before:.2f}ms → {after:.2f}ms ({change:+.1f}%)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Micro-benchmark and regression guard for the scoring hot path
+
+Times get_cuisine_keywords per call and calculate_match_score per
+restaurant and per full catalogue pass, for every analysis in the
+workload.py query mix (single cuisine, fine dining, multiple dietary
+restrictions, follow-ups; EN and ZH). Results are compared against a
+stored baseline and the run fails if any case is slower by more than
+the tolerance. Times are normalized against a fixed calibration loop, so
+the baseline survives moving between machines of similar architecture.
+
+Usage:
+    python benchmarks/scoring_bench.py                      # compare with the stored baseline
+    python benchmarks/scoring_bench.py --tolerance 15
+    python benchmarks/scoring_bench.py --update-baseline    # after an intended change
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from load_test import import_app, prepare_database
+from workload import QUERY_MIX
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baselines', 'scoring.json')
+
+
+def load_app(rows):
+    """Import app.py against a synthetic DB of rows restaurants"""
+    aieat, _ = import_app(prepare_database(rows, 42))
+    return aieat
+
+
+def build_cases():
+    """(name, analysis, user_input) for each query in the mix, as /recommend sees them"""
+    cases = []
+    for name, _, payload, analysis in QUERY_MIX:
+        user_input = {
+            'preferences': payload['preferences'],
+            'budget': analysis.get('extracted_budget') or payload['budget'],
+            'district': analysis.get('extracted_district') or payload['district'],
+            'lang': payload['lang'],
+        }
+        cases.append((name, analysis, user_input))
+    return cases
+
+
+def keyword_terms():
+    """Every cuisine and restriction term the mix feeds to get_cuisine_keywords"""
+    terms = []
+    for _, _, _, analysis in QUERY_MIX:
+        terms.extend(analysis['cuisine_types'] + analysis['dietary_restrictions'])
+    return sorted(set(terms))
+
+
+def calibration_loop():
+    """Fixed pure-Python reference workload (string scans, dict lookups, branches)"""
+    haystack = 'a cozy italian restaurant in central known for its carbonara'
+    table = {'italian': 1, 'japanese': 2, 'chinese': 3}
+    total = 0
+    for i in range(20000):
+        if 'carbonara' in haystack:
+            total += table.get('italian', 0)
+        if i % 3 == 0:
+            total -= 1
+    return total
+
+
+def time_once(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def measure(func, repeat):
+    """(fastest seconds, median cost relative to the calibration loop) over repeat runs
+
+    Each run of func is paired with a run of the calibration loop and the
+    ratio is taken per pair, so a slower or busier machine (or frequency
+    scaling mid-run) shifts both sides and cancels out.
+    """
+    timings, ratios = [], []
+    for _ in range(repeat):
+        elapsed = time_once(func)
+        timings.append(elapsed)
+        ratios.append(elapsed / time_once(calibration_loop))
+    return min(timings), statistics.median(ratios)
+
+
+def run_benchmarks(rows, repeat):
+    aieat = load_app(rows)
+    get_cuisine_keywords, calculate_match_score = aieat.get_cuisine_keywords, aieat.calculate_match_score
+    # Rows as loaded from SQLite, derived columns included
+    catalogue = aieat.restaurants
+    results = {}
+
+    terms = keyword_terms()
+    loops = 2000
+
+    def keywords_loop():
+        for _ in range(loops):
+            for term in terms:
+                get_cuisine_keywords(term)
+
+    elapsed, relative = measure(keywords_loop, repeat)
+    results['get_cuisine_keywords'] = {
+        'per_call_us': round(elapsed / (loops * len(terms)) * 1e6, 3),
+        'relative': round(relative, 4),
+    }
+
+    for name, analysis, user_input in build_cases():
+        def catalogue_pass():
+            for restaurant in catalogue:
+                calculate_match_score(restaurant, analysis, user_input)
+
+        elapsed, relative = measure(catalogue_pass, repeat)
+        results[f'calculate_match_score/{name}'] = {
+            'per_restaurant_us': round(elapsed / len(catalogue) * 1e6, 3),
+            'catalogue_pass_ms': round(elapsed * 1000, 3),
+            # Per restaurant, so baselines recorded with a different --rows still compare
+            'relative': round(relative / len(catalogue) * 1000, 4),
+        }
+    return results
+
+
+def find_regressions(results, baseline, tolerance):
+    """(case, before, after, change %) for every case slower than tolerance percent"""
+    regressions = []
+    for case, metrics in results.items():
+        before = baseline.get('results', {}).get(case, {}).get('relative')
+        if before:
+            change = percent_change(before, metrics['relative'])
+            if change > tolerance:
+                regressions.append((case, before, metrics['relative'], change))
+    return regressions
+
+
+def percent_change(before, after):
+    return (after - before) / before * 100 if before else 0.0
+
+
+def print_results(results, baseline=None):
+    previous = (baseline or {}).get('results', {})
+    print(f"\n{'case':<50}{'per item (µs)':>15}{'pass (ms)':>12}")
+    for case, metrics in results.items():
+        per_item = metrics.get('per_restaurant_us', metrics.get('per_call_us'))
+        line = f"{case:<50}{per_item:>15.3f}"
+        line += f"{metrics['catalogue_pass_ms']:>12.2f}" if 'catalogue_pass_ms' in metrics else ' ' * 12
+        before = previous.get(case, {}).get('relative')
+        if before:
+            line += f"   {percent_change(before, metrics['relative']):+.1f}% vs baseline"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scoring micro-benchmark with a stored baseline')
+    parser.add_argument('--rows', type=int, default=5000, help='restaurants per catalogue pass')
+    parser.add_argument('--repeat', type=int, default=9, help='timed runs per case')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=25.0,
+                        help='fail if any case is slower than the baseline by more than this percent')
+    parser.add_argument('--update-baseline', action='store_true', help='overwrite the baseline with this run')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.rows, args.repeat)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.update_baseline or baseline is None:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'config': {'rows': args.rows, 'repeat': args.repeat,
+                           'python': platform.python_version(), 'machine': platform.machine()},
+                'results': results,
+            }, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return
+
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for case, before, after, change in regressions:
+        print(f"❌ {case}: relative cost {before} → {after} ({change:+.1f}%)")
+    if regressions:
+        sys.exit(1)
+    print(f"✅ No case slower than baseline by more than {args.tolerance:g}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Recall and latency of the semantic vector index: exhaustive vs IVF
+
+Embeds the synthetic catalogue with the deterministic stub backend (cached
+in the benchmark database after the first run), then times top-k queries
+for every request in the workload mix against the exact index and the IVF
+partition, reporting IVF recall relative to the exact results.
+
+Usage:
+    python benchmarks/semantic_bench.py --rows 100000
+    python benchmarks/semantic_bench.py --rows 100000 --nprobe 16 --k 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from load_test import prepare_database
+from scoring_bench import build_cases
+
+import db
+from semantic_search import StubEmbedder, VectorIndex, build_embeddings, np
+
+
+def query_text(analysis, user_input):
+    return ' '.join([user_input['preferences'], *analysis['cuisine_types'], analysis.get('atmosphere') or ''])
+
+
+def time_queries(index, queries, k, repeat):
+    """(median ms per query, results of the last pass)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [index.search(query, k) for query in queries]
+        timings.append((time.perf_counter() - start) / len(queries) * 1000)
+    return statistics.median(timings), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Semantic index recall/latency benchmark')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--nlist', type=int, help='IVF clusters (default 4 * sqrt(rows))')
+    parser.add_argument('--nprobe', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    if np is None:
+        sys.exit("NumPy is required: pip install numpy")
+
+    conn = db.connect(prepare_database(args.rows, 42))
+    embedder = StubEmbedder()
+    start = time.perf_counter()
+    embedded = build_embeddings(conn, embedder)
+    print(f"🔧 {embedded} restaurants embedded in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    exact = VectorIndex.load(conn, embedder.name)
+    print(f"📂 Loaded {len(exact)} vectors in {time.perf_counter() - start:.2f}s")
+    nlist = args.nlist or int(4 * len(exact) ** 0.5)
+    start = time.perf_counter()
+    ivf = VectorIndex(exact.ids, exact.matrix, nlist=nlist, nprobe=args.nprobe)
+    print(f"🧭 IVF with {nlist} clusters built in {time.perf_counter() - start:.2f}s")
+
+    queries = embedder.embed([query_text(analysis, user_input) for _, analysis, user_input in build_cases()])
+    exact_ms, exact_results = time_queries(exact, queries, args.k, args.repeat)
+    ivf_ms, ivf_results = time_queries(ivf, queries, args.k, args.repeat)
+    recall = statistics.mean(
+        len({i for i, _ in want} & {i for i, _ in got}) / max(1, len(want))
+        for want, got in zip(exact_results, ivf_results)
+    )
+
+    print(f"\n{'index':<10}{'ms/query':>10}{'recall@' + str(args.k):>12}")
+    print(f"{'exact':<10}{exact_ms:>10.2f}{1.0:>12.2f}")
+    print(f"{'ivf':<10}{ivf_ms:>10.2f}{recall:>12.2f}   nprobe={args.nprobe}, {exact_ms / ivf_ms:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Local stub for the Ollama API, for offline benchmarks
+
+Serves POST /api/generate and GET /api/tags like Ollama. It answers
+with the canned analysis from workload.py after a configurable delay, so
+AI_SERVICE=ollama with OLLAMA_URL pointing here exercises the real
+request path without a model.
+
+Usage:
+    python benchmarks/stub_llm.py --port 11435 --latency-ms 800 --jitter-ms 200
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from workload import canned_analysis_for
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Request handler; latency settings live on the server object"""
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._send_json({'models': [{'name': 'stub:latest', 'size': 0}]})
+        else:
+            self._send_json({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        if self.path != '/api/generate':
+            self._send_json({'error': 'not found'}, 404)
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+
+        server = self.server
+        delay_ms = server.latency_ms + random.uniform(-server.jitter_ms, server.jitter_ms)
+        time.sleep(max(0.0, delay_ms) / 1000)
+
+        analysis = canned_analysis_for(request.get('prompt', ''))
+        # Models wrap the JSON in chatter; app.py has to extract it
+        text = f"Sure! Here is the analysis:\n{json.dumps(analysis, ensure_ascii=False)}"
+        self._send_json({'model': request.get('model', 'stub'), 'response': text, 'done': True})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, latency_ms=0.0, jitter_ms=0.0):
+    """Start the stub in a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubOllamaHandler)
+    server.daemon_threads = True
+    server.latency_ms = latency_ms
+    server.jitter_ms = jitter_ms
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub Ollama server for offline benchmarks')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.port, args.latency_ms, args.jitter_ms)
+    print(f"🤖 Stub Ollama listening on {url} (latency {args.latency_ms}±{args.jitter_ms} ms)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
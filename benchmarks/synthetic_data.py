@@ -0,0 +1,138 @@
+"""
+Synthetic bilingual restaurant catalogue for benchmarks
+
+Generates a deterministic restaurants database with the same schema as
+migrate_to_sqlite.py, from 1k to 1M rows, with realistic HK districts,
+cuisines, price tiers, ratings and EN/ZH text.
+
+Usage:
+    python benchmarks/synthetic_data.py --rows 100000 --output /tmp/aieat-bench.db
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from migrate_to_sqlite import import_restaurants
+
+DISTRICTS = [
+    ('Central', '中環'), ('Sheung Wan', '上環'), ('Wan Chai', '灣仔'), ('Causeway Bay', '銅鑼灣'),
+    ('Tsim Sha Tsui', '尖沙咀'), ('Mong Kok', '旺角'), ('Yau Ma Tei', '油麻地'), ('Jordan', '佐敦'),
+    ('Sham Shui Po', '深水埗'), ('Kowloon City', '九龍城'), ('North Point', '北角'), ('Quarry Bay', '鰂魚涌'),
+    ('Sai Kung', '西貢'), ('Sha Tin', '沙田'), ('Tsuen Wan', '荃灣'), ('Kennedy Town', '堅尼地城'),
+    ('Tai Koo', '太古'), ('Prince Edward', '太子'),
+]
+
+# (cuisine_en, cuisine_zh, typical dishes en, typical dishes zh)
+CUISINES = [
+    ('Italian', '意大利菜', ['Carbonara', 'Margherita Pizza', 'Seafood Risotto'], ['卡邦尼意粉', '瑪格麗特薄餅', '海鮮意大利飯']),
+    ('Japanese', '日本菜', ['Sashimi Platter', 'Tonkotsu Ramen', 'Wagyu Beef Don'], ['刺身拼盤', '豚骨拉麵', '和牛丼']),
+    ('Cantonese', '粵菜', ['Roast Goose', 'Steamed Fish', 'Sweet and Sour Pork'], ['燒鵝', '清蒸魚', '咕嚕肉']),
+    ('Dim Sum', '點心', ['Har Gow', 'Siu Mai', 'Char Siu Bao'], ['蝦餃', '燒賣', '叉燒包']),
+    ('Hot Pot', '火鍋', ['Spicy Sichuan Broth', 'Beef Slices', 'Handmade Meatballs'], ['麻辣湯底', '肥牛', '手打丸']),
+    ('Sichuan', '川菜', ['Mapo Tofu', 'Dan Dan Noodles', 'Spicy Chicken'], ['麻婆豆腐', '擔擔麵', '辣子雞']),
+    ('Korean', '韓國菜', ['Korean BBQ Pork Belly', 'Kimchi Stew', 'Bibimbap'], ['韓式烤五花腩', '泡菜鍋', '石鍋拌飯']),
+    ('Thai', '泰國菜', ['Tom Yum Goong', 'Pad Thai', 'Green Curry'], ['冬蔭功', '泰式炒金邊粉', '青咖喱']),
+    ('Vietnamese', '越南菜', ['Beef Pho', 'Banh Mi', 'Fresh Spring Rolls'], ['牛肉河粉', '越南法包', '越式米紙卷']),
+    ('French', '法國菜', ['Duck Confit', 'Beef Bourguignon', 'Creme Brulee'], ['油封鴨髀', '紅酒燉牛肉', '焦糖燉蛋']),
+    ('Steakhouse', '扒房', ['Ribeye Steak', 'Lobster Bisque', 'Truffle Fries'], ['肉眼扒', '龍蝦湯', '松露薯條']),
+    ('Seafood', '海鮮', ['Garlic Steamed Scallops', 'Chilli Crab', 'Oysters'], ['蒜蓉蒸扇貝', '辣椒蟹', '生蠔']),
+    ('Indian', '印度菜', ['Butter Chicken', 'Lamb Biryani', 'Garlic Naan'], ['牛油雞', '羊肉香飯', '蒜蓉烤餅']),
+    ('American', '美國菜', ['Cheeseburger', 'BBQ Pork Ribs', 'Buffalo Wings'], ['芝士漢堡', '燒豬肋骨', '水牛城雞翼']),
+    ('Bar', '酒吧', ['Craft Beer', 'Signature Cocktail', 'Fish and Chips'], ['手工啤酒', '招牌雞尾酒', '炸魚薯條']),
+    ('Cafe', '咖啡店', ['Flat White', 'Avocado Toast', 'Tiramisu'], ['鮮奶咖啡', '牛油果多士', '提拉米蘇']),
+    ('Hong Kong Style', '港式', ['Milk Tea', 'Pineapple Bun', 'Macaroni in Soup'], ['奶茶', '菠蘿包', '火腿通粉']),
+    ('Vegetarian', '素食', ['Vegetarian Dim Sum', 'Tofu Hot Pot', 'Mushroom Rice'], ['素點心', '豆腐煲', '雜菌飯']),
+    ('Buffet', '自助餐', ['Seafood Buffet', 'Roast Beef', 'Dessert Station'], ['海鮮自助餐', '烤牛肉', '甜品站']),
+    ('Spanish', '西班牙菜', ['Paella', 'Iberico Ham', 'Churros'], ['西班牙海鮮飯', '黑毛豬火腿', '西班牙油條']),
+]
+
+PRICES = ['Below $50', '$51-100', '$101-200', '$201-400', '$401-800', 'Above $800']
+PRICE_WEIGHTS = [10, 30, 30, 18, 8, 4]
+
+ATMOSPHERES = [
+    ('casual', '輕鬆'), ('romantic', '浪漫'), ('family-friendly', '適合一家大細'),
+    ('fine dining', '高級'), ('celebration', '慶祝'), ('cozy', '舒適'), ('lively', '熱鬧'),
+]
+
+NAME_PREFIXES = [('Golden', '金'), ('Harbour', '海港'), ('Dragon', '龍'), ('Lucky', '好運'), ('Jade', '翡翠'),
+                 ('Happy', '開心'), ('Grand', '大'), ('Little', '小'), ('Old Town', '老街'), ('Star', '星')]
+NAME_SUFFIXES = [('Kitchen', '廚房'), ('House', '館'), ('Garden', '園'), ('Bistro', '小館'), ('Corner', '角落'),
+                 ('Restaurant', '餐廳'), ('Table', '食堂'), ('Room', '軒')]
+
+
+def generate_restaurant(rng, index):
+    """One synthetic restaurant row (dict keyed like the JSON source)"""
+    district_en, district_zh = rng.choice(DISTRICTS)
+    cuisine_en, cuisine_zh, dishes_en, dishes_zh = rng.choice(CUISINES)
+    prefix_en, prefix_zh = rng.choice(NAME_PREFIXES)
+    suffix_en, suffix_zh = rng.choice(NAME_SUFFIXES)
+    atmosphere_en, atmosphere_zh = rng.choice(ATMOSPHERES)
+    # Popularity is long-tailed: most places have few reviews
+    reviews = int(rng.paretovariate(1.2) * 5)
+    quality = rng.betavariate(5, 2)
+    smile = int(reviews * quality)
+    cry = int((reviews - smile) * rng.random() * 0.5)
+    ok = reviews - smile - cry
+    street_no = rng.randint(1, 300)
+    return {
+        'name_en': f'{prefix_en} {cuisine_en} {suffix_en} {index}',
+        'name_zh': f'{prefix_zh}{cuisine_zh}{suffix_zh}{index}',
+        'cuisine_en': cuisine_en,
+        'cuisine_zh': cuisine_zh,
+        'district_en': district_en,
+        'district_zh': district_zh,
+        'address_en': f'{street_no} Main Street, {district_en}',
+        'address_zh': f'{district_zh}大街{street_no}號',
+        'price': rng.choices(PRICES, PRICE_WEIGHTS)[0],
+        'phone': f'{rng.randint(21000000, 39999999)}',
+        'url': f'https://www.openrice.com/en/hongkong/r-synthetic-{index}',
+        'rating_smile': smile,
+        'rating_ok': ok,
+        'rating_cry': cry,
+        'description_en': (f'A {atmosphere_en} {cuisine_en.lower()} restaurant in {district_en} '
+                           f'known for its {dishes_en[0].lower()} and {dishes_en[1].lower()}.'),
+        'description_zh': f'位於{district_zh}嘅{atmosphere_zh}{cuisine_zh}餐廳，招牌{dishes_zh[0]}同{dishes_zh[1]}。',
+        'popular_dishes_en': ', '.join(rng.sample(dishes_en, 2)),
+        'popular_dishes_zh': '、'.join(rng.sample(dishes_zh, 2)),
+        'opening_hours_en': 'Mon-Sun 11:30-22:00',
+        'opening_hours_zh': '星期一至日 11:30-22:00',
+    }
+
+
+def generate_restaurants(rows, seed=42):
+    """Yield rows restaurants deterministically for a given seed"""
+    rng = random.Random(seed)
+    for index in range(1, rows + 1):
+        yield generate_restaurant(rng, index)
+
+
+def build_database(db_path, rows, seed=42, batch_size=10000):
+    """Create a restaurants database at db_path with rows synthetic restaurants"""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    import_restaurants(generate_restaurants(rows, seed), db_path, batch_size, verbose=False)
+    return db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic AIEat restaurant database')
+    parser.add_argument('--rows', type=int, default=10000, help='number of restaurants (1k-1M)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='benchmarks/data/restaurants.db')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build_database(args.output, args.rows, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Generated {args.rows} restaurants in {elapsed:.1f}s → {args.output}")
+
+
+if __name__ == '__main__':
+    main()
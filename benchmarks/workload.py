@@ -0,0 +1,78 @@
+"""
+Realistic /recommend query mix for benchmarks
+
+Each entry pairs a request payload with the analysis the stub LLM returns
+for it, so runs are reproducible without a real model. Weights roughly
+follow production traffic: mostly simple cuisine/district searches, some
+follow-ups, restrictions and fine-dining queries, in both languages.
+"""
+
+import random
+
+
+def _analysis(cuisines, atmosphere='casual', restrictions=(), budget=None, district=None, message=''):
+    return {
+        'cuisine_types': list(cuisines),
+        'atmosphere': atmosphere,
+        'key_requirements': [],
+        'dietary_restrictions': list(restrictions),
+        'extracted_budget': budget,
+        'extracted_district': district,
+        'ai_message': message,
+    }
+
+
+# (name, weight, request payload, analysis returned by the stub LLM)
+QUERY_MIX = [
+    ('single_cuisine_en', 20,
+     {'preferences': 'Looking for good Japanese food', 'budget': 'Any', 'district': 'Any', 'lang': 'en'},
+     _analysis(['japanese'])),
+    ('single_cuisine_zh', 20,
+     {'preferences': '想食日本菜', 'budget': 'Any', 'district': 'Any', 'lang': 'zh'},
+     _analysis(['日本菜'])),
+    ('cuisine_district_budget_en', 15,
+     {'preferences': 'Romantic Italian dinner in Central', 'budget': '$201-400', 'district': 'Central', 'lang': 'en'},
+     _analysis(['italian'], atmosphere='romantic')),
+    ('hotpot_no_spicy_zh', 10,
+     {'preferences': '想食火鍋，但唔要辣', 'budget': 'Any', 'district': '旺角', 'lang': 'zh'},
+     _analysis(['火鍋'], restrictions=['spicy'])),
+    ('fine_dining_en', 8,
+     {'preferences': 'High-end fine dining for a birthday', 'budget': 'Any', 'district': 'Any', 'lang': 'en'},
+     _analysis(['fine dining'], atmosphere='celebration', budget='$401-800')),
+    ('multiple_restrictions_en', 7,
+     {'preferences': 'Chinese food, no pork, no seafood, avoid spicy', 'budget': '$101-200', 'district': 'Any', 'lang': 'en'},
+     _analysis(['chinese'], restrictions=['pork', 'seafood', 'spicy'])),
+    ('dim_sum_zh', 8,
+     {'preferences': '星期日想去飲茶食點心', 'budget': '$101-200', 'district': 'Any', 'lang': 'zh'},
+     _analysis(['點心'], atmosphere='family-friendly', district='沙田')),
+    ('bar_followup_en', 6,
+     {'preferences': 'After dinner drinks nearby?', 'budget': 'Any', 'district': 'Tsim Sha Tsui', 'lang': 'en',
+      'conversation_history': [
+          {'role': 'user', 'message': 'Korean BBQ in Tsim Sha Tsui'},
+          {'role': 'assistant', 'message': 'Here are some Korean BBQ places!', 'analysis': {'cuisine_types': ['korean']}},
+      ]},
+     _analysis(['bar', 'pub', 'cafe'], atmosphere='lively')),
+    ('location_only_followup_zh', 6,
+     {'preferences': '旺角呢？', 'budget': 'Any', 'district': 'Any', 'lang': 'zh',
+      'conversation_history': [
+          {'role': 'user', 'message': '想食意大利菜'},
+          {'role': 'assistant', 'message': '幫你搵咗意大利餐廳！', 'analysis': {'cuisine_types': ['意大利菜']}},
+      ]},
+     _analysis(['意大利菜'], district='旺角')),
+]
+
+
+def canned_analysis_for(prompt):
+    """Analysis for the query whose preferences appear in an LLM prompt"""
+    for _, _, payload, analysis in QUERY_MIX:
+        if payload['preferences'] in prompt:
+            return analysis
+    return _analysis([])
+
+
+def sample_queries(count, seed=7):
+    """Draw count (name, payload) pairs from the weighted mix"""
+    rng = random.Random(seed)
+    weights = [weight for _, weight, _, _ in QUERY_MIX]
+    picks = rng.choices(QUERY_MIX, weights, k=count)
+    return [(name, payload) for name, _, payload, _ in picks]
@@ -0,0 +1,336 @@
+"""
+SQLite connection management for AIEat
+
+Each thread (or gunicorn worker) reuses a single connection instead of
+opening a new one per query. Connections run in WAL mode so readers are
+never blocked by the search_history writer.
+
+The catalogue version lives in the database too: triggers bump it on any
+change to the restaurants table, so every worker can tell when its cached
+data is stale. Similar triggers keep catalogue_stats (counts per district,
+cuisine and price plus rating totals) up to date for the admin dashboard.
+
+RESTAURANTS_SCHEMA is the one canonical restaurants table; databases created
+by older versions (TEXT ratings, no derived columns) are rebuilt into it at
+startup by migrate_restaurants_table.
+"""
+
+import os
+import sqlite3
+import threading
+
+DB_PATH = os.getenv('DATABASE_PATH', 'data/restaurants.db')
+
+# Tunables (override via .env)
+BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000'))
+MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+STATEMENT_CACHE_SIZE = int(os.getenv('SQLITE_STATEMENT_CACHE_SIZE', '256'))
+
+_local = threading.local()
+
+
+class ReusableConnection(sqlite3.Connection):
+    """Connection whose close() only releases it back to its thread.
+
+    Call sites keep their existing ``conn.close()`` calls; any transaction
+    left open is rolled back so the next user starts clean.
+    """
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def really_close(self):
+        super().close()
+
+
+def configure_connection(conn):
+    """Apply journal, cache and timeout pragmas to a connection"""
+    conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA cache_size = -{CACHE_SIZE_KB}')
+    conn.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute('PRAGMA foreign_keys = ON')
+
+
+def connect(path=None):
+    """Open a new, fully configured connection (not shared)"""
+    conn = sqlite3.connect(
+        path or DB_PATH,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        factory=ReusableConnection
+    )
+    conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+    configure_connection(conn)
+    return conn
+
+
+def get_db_connection():
+    """Get this thread's SQLite connection, opening it on first use"""
+    conn = getattr(_local, 'conn', None)
+    # A forked worker must not reuse the parent's connection
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+
+    conn = connect()
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+
+def release_thread_connection():
+    """Roll back any transaction this thread's connection left open (end of a request)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.pid == os.getpid():
+        conn.close()
+
+
+def close_thread_connection():
+    """Really close this thread's connection (e.g. on shutdown)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.pid == os.getpid():
+        conn.really_close()
+    _local.conn = None
+
+
+# Price labels in ascending order; price_tier stores the number
+PRICE_TIERS = {
+    'Below $50': 1,
+    '$51-100': 2,
+    '$101-200': 3,
+    '$201-400': 4,
+    '$401-800': 5,
+    'Above $800': 6,
+}
+_PRICE_TIER_SQL = 'CASE price ' + ' '.join(f"WHEN '{label}' THEN {tier}" for label, tier in PRICE_TIERS.items()) + ' END'
+
+# Canonical restaurants table. Ratings are integers; price_tier, rating_total
+# and smile_ratio are derived by SQLite on every write, so neither SQL nor the
+# scoring loop has to cast or parse per row.
+RESTAURANTS_SCHEMA = f'''
+    CREATE TABLE IF NOT EXISTS restaurants (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name_en TEXT,
+        name_zh TEXT,
+        cuisine_en TEXT,
+        cuisine_zh TEXT,
+        district_en TEXT,
+        district_zh TEXT,
+        address_en TEXT,
+        address_zh TEXT,
+        price TEXT,
+        phone TEXT,
+        url TEXT,
+        rating_smile INTEGER NOT NULL DEFAULT 0,
+        rating_ok INTEGER NOT NULL DEFAULT 0,
+        rating_cry INTEGER NOT NULL DEFAULT 0,
+        description_en TEXT,
+        description_zh TEXT,
+        popular_dishes_en TEXT,
+        popular_dishes_zh TEXT,
+        opening_hours_en TEXT,
+        opening_hours_zh TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        price_tier INTEGER GENERATED ALWAYS AS ({_PRICE_TIER_SQL}) STORED,
+        rating_total INTEGER GENERATED ALWAYS AS (rating_smile + rating_ok + rating_cry) STORED,
+        smile_ratio REAL GENERATED ALWAYS AS (
+            CASE WHEN rating_total > 0 THEN CAST(rating_smile AS REAL) / rating_total END
+        ) STORED
+    )
+'''
+RATING_COLUMNS = ('rating_smile', 'rating_ok', 'rating_cry')
+
+
+def restaurants_schema_is_current(conn):
+    """True if restaurants is missing (nothing to migrate) or already canonical"""
+    columns = {row[1]: row[2].upper() for row in conn.execute('PRAGMA table_xinfo(restaurants)')}
+    return not columns or ('smile_ratio' in columns and columns['rating_smile'] == 'INTEGER')
+
+
+def migrate_restaurants_table(conn):
+    """Rebuild a legacy restaurants table (TEXT ratings, no derived columns); True if migrated
+
+    Ids are preserved. Triggers and indexes go with the old table; the
+    callers recreate them right after.
+    """
+    if restaurants_schema_is_current(conn):
+        return False
+    conn.commit()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # Another worker may have migrated while we waited for the write lock
+        if restaurants_schema_is_current(conn):
+            conn.execute('COMMIT')
+            return False
+        legacy = {row[1] for row in conn.execute('PRAGMA table_info(restaurants)')}
+        conn.execute('ALTER TABLE restaurants RENAME TO restaurants_legacy')
+        conn.execute(RESTAURANTS_SCHEMA)
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(restaurants)')]
+        values = []
+        for column in columns:
+            if column not in legacy:
+                values.append('CURRENT_TIMESTAMP' if column == 'created_at' else 'NULL')
+            elif column in RATING_COLUMNS:
+                values.append(f'COALESCE(CAST({column} AS INTEGER), 0)')
+            else:
+                values.append(column)
+        conn.execute(f'''
+            INSERT INTO restaurants ({', '.join(columns)})
+            SELECT {', '.join(values)} FROM restaurants_legacy ORDER BY id
+        ''')
+        conn.execute('DROP TABLE restaurants_legacy')
+        # The stats triggers went with the old table: have init_catalogue_schema
+        # backfill from scratch, and make every worker reload the new rows
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'catalogue_stats' in tables:
+            conn.execute('DELETE FROM catalogue_stats')
+        if 'restaurants_fts' in tables:
+            conn.execute("INSERT INTO restaurants_fts (restaurants_fts) VALUES ('rebuild')")
+        if 'catalogue_meta' in tables:
+            conn.execute("UPDATE catalogue_meta SET value = value + 1 WHERE key = 'version'")
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return True
+
+
+# Indexes backing the admin listing filters and sort orders, SQL-side
+# filtering by district and budget tier (RETRIEVAL_MODE=sql, matching
+# districts case-insensitively like calculate_match_score) and the filter
+# option lists
+RESTAURANT_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_name_en ON restaurants(name_en)',
+    'CREATE INDEX IF NOT EXISTS idx_cuisine_en ON restaurants(cuisine_en)',
+    'CREATE INDEX IF NOT EXISTS idx_district_en ON restaurants(district_en)',
+    'CREATE INDEX IF NOT EXISTS idx_district_en_lower ON restaurants(lower(district_en))',
+    'CREATE INDEX IF NOT EXISTS idx_district_zh ON restaurants(district_zh)',
+    'CREATE INDEX IF NOT EXISTS idx_cuisine_zh ON restaurants(cuisine_zh)',
+    'CREATE INDEX IF NOT EXISTS idx_price ON restaurants(price)',
+    'CREATE INDEX IF NOT EXISTS idx_price_tier ON restaurants(price_tier)',
+    'CREATE INDEX IF NOT EXISTS idx_district_price_tier ON restaurants(district_en, price_tier)',
+    'CREATE INDEX IF NOT EXISTS idx_rating_smile ON restaurants(rating_smile)',
+    'CREATE INDEX IF NOT EXISTS idx_smile_ratio ON restaurants(smile_ratio)',
+]
+
+CATALOGUE_VERSION_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS catalogue_meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    "INSERT OR IGNORE INTO catalogue_meta (key, value) VALUES ('version', 0)",
+] + [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS restaurants_version_{event.lower()}
+    AFTER {event} ON restaurants
+    BEGIN
+        UPDATE catalogue_meta SET value = value + 1 WHERE key = 'version';
+    END
+    '''
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+
+# (dimension, SQL expression over a restaurants row) kept in catalogue_stats.
+# Group dimensions count rows per value; sum dimensions keep a running total.
+STATS_GROUP_DIMENSIONS = [
+    ('district', 'district_en'),
+    ('cuisine', 'cuisine_en'),
+    ('price', 'price'),
+]
+STATS_SUM_DIMENSIONS = [
+    ('rating_smile', 'rating_smile'),
+    ('rating_ok', 'rating_ok'),
+    ('rating_cry', 'rating_cry'),
+]
+
+UPSERT_STATS_SQL = '''
+    INSERT INTO catalogue_stats (dimension, value, count) SELECT {dimension}, {value}, {delta} WHERE {condition}
+    ON CONFLICT(dimension, value) DO UPDATE SET count = count + excluded.count;
+'''
+
+
+def _stats_statements(row, sign):
+    """Trigger statements adding (sign=1) or removing (sign=-1) a row"""
+    statements = [UPSERT_STATS_SQL.format(dimension="'total'", value="''", delta=sign, condition='1')]
+    for dimension, column in STATS_GROUP_DIMENSIONS:
+        statements.append(UPSERT_STATS_SQL.format(
+            dimension=f"'{dimension}'", value=f'{row}.{column}', delta=sign,
+            condition=f'{row}.{column} IS NOT NULL'
+        ))
+    for dimension, expression in STATS_SUM_DIMENSIONS:
+        expression = expression.replace('rating_', f'{row}.rating_')
+        statements.append(UPSERT_STATS_SQL.format(
+            dimension=f"'{dimension}'", value="''", delta=f'{sign} * {expression}', condition='1'
+        ))
+    return ''.join(statements)
+
+
+_STATS_CLEANUP = "DELETE FROM catalogue_stats WHERE count = 0 AND dimension IN ('district', 'cuisine', 'price');"
+
+CATALOGUE_STATS_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS catalogue_stats (
+        dimension TEXT NOT NULL,
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimension, value)
+    ) WITHOUT ROWID
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS restaurants_stats_insert AFTER INSERT ON restaurants
+    BEGIN {_stats_statements('NEW', 1)} END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS restaurants_stats_delete AFTER DELETE ON restaurants
+    BEGIN {_stats_statements('OLD', -1)} {_STATS_CLEANUP} END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS restaurants_stats_update
+    AFTER UPDATE OF district_en, cuisine_en, price, rating_smile, rating_ok, rating_cry ON restaurants
+    BEGIN {_stats_statements('OLD', -1)} {_stats_statements('NEW', 1)} {_STATS_CLEANUP} END
+    ''',
+]
+
+
+def rebuild_catalogue_stats(conn):
+    """Recompute catalogue_stats from scratch (full scan of restaurants)"""
+    conn.execute('DELETE FROM catalogue_stats')
+    conn.execute("INSERT INTO catalogue_stats (dimension, value, count) SELECT 'total', '', COUNT(*) FROM restaurants")
+    for dimension, column in STATS_GROUP_DIMENSIONS:
+        conn.execute(f'''
+            INSERT INTO catalogue_stats (dimension, value, count)
+            SELECT '{dimension}', {column}, COUNT(*) FROM restaurants
+            WHERE {column} IS NOT NULL
+            GROUP BY {column}
+        ''')
+    for dimension, expression in STATS_SUM_DIMENSIONS:
+        conn.execute(f'''
+            INSERT INTO catalogue_stats (dimension, value, count)
+            SELECT '{dimension}', '', COALESCE(SUM({expression}), 0) FROM restaurants
+        ''')
+
+
+def init_catalogue_schema(conn):
+    """Migrate restaurants to the canonical schema, then create indexes, catalogue
+    version and stats triggers; returns True if the table was migrated"""
+    migrated = migrate_restaurants_table(conn)
+    for statement in RESTAURANT_INDEXES + CATALOGUE_VERSION_SCHEMA + CATALOGUE_STATS_SCHEMA:
+        conn.execute(statement)
+    # Stats are maintained by triggers from here on; backfill them once
+    if not conn.execute("SELECT 1 FROM catalogue_stats WHERE dimension = 'total'").fetchone():
+        rebuild_catalogue_stats(conn)
+    conn.commit()
+    return migrated
+
+
+def get_catalogue_version(conn):
+    """Current catalogue version (bumped on every restaurants change)"""
+    row = conn.execute("SELECT value FROM catalogue_meta WHERE key = 'version'").fetchone()
+    return row[0] if row else 0
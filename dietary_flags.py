@@ -0,0 +1,79 @@
+"""
+Precomputed dietary-restriction flags for AIEat
+
+calculate_match_score penalizes a restaurant whose cuisine, name,
+description or popular dishes mention something the user wants to avoid.
+Scanning those eight text fields for every restriction of every request
+is the most expensive part of scoring, so the common restrictions in
+DIETARY_VOCABULARY are evaluated once per restaurant when the catalogue is
+loaded (an edit bumps the catalogue version, which reloads it) and kept as
+one integer bitmask in restaurant['dietary_mask']. A restriction in the
+vocabulary then costs a bitwise AND; any other restriction is still
+matched against the text.
+
+A restriction is looked up by its name or one of its aliases (including
+the Chinese names users type), so "海鮮", "fish" and "seafood" share a flag,
+and each flag's keywords cover the English and the Chinese text.
+"""
+
+# restriction -> (aliases, keywords marking a restaurant as containing it)
+# The English keywords are what get_cuisine_keywords() expands the name and
+# each English alias to ('grill' included: the beef expansion has always
+# returned it), so they flag exactly what the text scan did. That scan
+# drops terms shorter than three characters and never matched Chinese
+# text; the Chinese keywords here do. They are dish or ingredient names,
+# never a bare character: 魚 would flag the 鰂魚涌 district as seafood, 辣
+# any 辣椒醬 on the side as spicy, 奶 椰奶 and 豆奶 as dairy, 牛 牛油
+# (butter) as beef, 雞 雞尾酒 as chicken and 酒 every 酒店 as alcohol.
+DIETARY_VOCABULARY = {
+    'seafood': (['fish', 'shellfish', '海鮮', '海產', '魚', '魚生'],
+                ['seafood', 'fish', 'oyster', 'lobster', 'crab', 'prawn',
+                 '海鮮', '海產', '魚生', '刺身', '清蒸魚', '炸魚', '龍蝦', '蝦餃', '大蝦', '蟹肉', '辣椒蟹',
+                 '生蠔', '扇貝']),
+    'pork': (['豬', '豬肉'], ['pork', '豬肉', '豬扒', '豬肋骨', '乳豬', '黑毛豬', '火腿', '豚骨', '五花腩', '叉燒', '咕嚕肉']),
+    'beef': (['牛', '牛肉'], ['beef', 'steak', 'steakhouse', 'grill', '牛肉', '牛扒', '牛腩', '肥牛', '和牛']),
+    'lamb': (['羊', '羊肉'], ['lamb', '羊肉', '羊架', '羊扒']),
+    'chicken': (['雞', '雞肉'], ['chicken', '雞肉', '雞翼', '雞扒', '炸雞', '燒雞', '子雞', '牛油雞']),
+    'spicy': (['辣', '麻辣', '辛辣', '食辣'], ['spicy', '麻辣', '辛辣', '香辣', '酸辣', '辣子雞', '辣椒蟹']),
+    'alcohol': (['酒', '酒精'], ['alcohol', '酒精', '酒吧', '啤酒', '紅酒', '白酒', '清酒', '雞尾酒']),
+    'dairy': (['奶', '奶類', '乳製品'], ['dairy', '乳製品', '芝士', '忌廉', '乳酪', '牛奶', '鮮奶', '奶茶']),
+    'nuts': (['果仁', '花生'], ['nuts', '果仁', '花生', '腰果', '杏仁', '合桃', '核桃']),
+}
+
+# Lower-cased restaurant fields the flags (and the text fallback) look in
+DIETARY_FIELDS = ['cuisine_en', 'cuisine_zh', 'name_en', 'name_zh',
+                  'description_en', 'description_zh', 'popular_dishes_en', 'popular_dishes_zh']
+
+DIETARY_BITS = {name: 1 << position for position, name in enumerate(DIETARY_VOCABULARY)}
+
+_RESTRICTION_BITS = {}
+for _name, (_aliases, _) in DIETARY_VOCABULARY.items():
+    for _alias in [_name, *_aliases]:
+        _RESTRICTION_BITS[_alias] = DIETARY_BITS[_name]
+
+
+def restriction_bit(restriction):
+    """Flag for a restriction (as lower-cased and stripped by the caller), or 0 if not in the vocabulary"""
+    return _RESTRICTION_BITS.get(restriction, 0)
+
+
+def dietary_text(restaurant):
+    """The restaurant text dietary restrictions are matched against, lower-cased"""
+    return [(restaurant.get(field) or '').lower() for field in DIETARY_FIELDS]
+
+
+def dietary_mask(restaurant):
+    """Bitmask of the DIETARY_VOCABULARY restrictions the restaurant's text mentions"""
+    texts = dietary_text(restaurant)
+    mask = 0
+    for name, (_, keywords) in DIETARY_VOCABULARY.items():
+        if any(keyword in text for keyword in keywords for text in texts):
+            mask |= DIETARY_BITS[name]
+    return mask
+
+
+def add_dietary_masks(restaurants):
+    """Store dietary_mask() on every restaurant dict of a freshly loaded catalogue"""
+    for restaurant in restaurants:
+        restaurant['dietary_mask'] = dietary_mask(restaurant)
+    return restaurants
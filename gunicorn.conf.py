@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration for AIEat (picked up automatically from the working directory)
+
+Sets up Prometheus multiprocess mode so /metrics aggregates all workers, and
+with GUNICORN_PRELOAD=1 initializes the app once in the master (see
+initialize_app in app.py) so workers fork with the catalogue already loaded.
+"""
+
+import gc
+import os
+import shutil
+
+# Must be set before any worker imports prometheus_client
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/aieat-metrics')
+
+preload_app = os.getenv('GUNICORN_PRELOAD', '0') == '1'
+if preload_app:
+    # A background initialization thread would not survive the fork into workers
+    os.environ['APP_INIT'] = 'eager'
+else:
+    # Every worker initializes; none of them embeds at startup (python semantic_search.py does)
+    os.environ.setdefault('SEMANTIC_EMBED_ON_START', '0')
+
+
+def on_starting(server):
+    # Start from a clean slate; stale files would be summed into the totals
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    if preload_app:
+        # Move the preloaded catalogue out of the garbage collector's reach: its
+        # passes would touch every object and copy the shared pages into each worker
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # The master initialized the app but never serves: each worker forks its
+        # own scoring pool, then starts its background threads
+        import app
+        app.start_scoring_pool()
+        app.health_prober.start()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
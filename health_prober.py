@@ -0,0 +1,133 @@
+"""
+Background AI provider health prober for AIEat
+
+/health used to call Ollama's /api/tags on every request, so load balancer
+probes from several nodes multiplied traffic to the model host and could
+each hold a worker for up to the 2s timeout. HealthProber checks the
+configured provider from a background thread every HEALTH_PROBE_INTERVAL
+seconds instead (once per worker, whatever the probe traffic) and /health
+returns the last result: provider status, probe latency, the models Ollama
+has available and which of them are loaded in memory.
+
+Cloud providers are not probed over the network; their status only says
+whether an API key is configured, as before.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+logger = logging.getLogger('aieat.health')
+
+HEALTH_PROBE_INTERVAL = float(os.getenv('HEALTH_PROBE_INTERVAL', '15'))
+HEALTH_PROBE_TIMEOUT = float(os.getenv('HEALTH_PROBE_TIMEOUT', '2'))
+
+
+def probe_ollama(ollama_url, model, timeout):
+    """Status, latency and model info of an Ollama server"""
+    start = time.perf_counter()
+    try:
+        response = requests.get(f"{ollama_url}/api/tags", timeout=timeout)
+    except requests.RequestException as e:
+        return {'ai_status': 'Disconnected', 'latency_ms': None, 'error': str(e)}
+    latency_ms = round((time.perf_counter() - start) * 1000, 1)
+    if response.status_code != 200:
+        return {'ai_status': 'Disconnected', 'latency_ms': latency_ms, 'error': f'HTTP {response.status_code}'}
+
+    available = [m.get('name', '') for m in response.json().get('models', [])]
+    result = {
+        'ai_status': 'Connected',
+        'latency_ms': latency_ms,
+        'model': model,
+        # Ollama names default to the ':latest' tag
+        'model_available': any(name in (model, f'{model}:latest') for name in available),
+        'models_available': available,
+    }
+    # Loaded models (older Ollama versions have no /api/ps)
+    try:
+        ps = requests.get(f"{ollama_url}/api/ps", timeout=timeout)
+        if ps.status_code == 200:
+            result['models_loaded'] = [m.get('name', '') for m in ps.json().get('models', [])]
+    except requests.RequestException:
+        pass
+    return result
+
+
+def probe_provider(settings, timeout):
+    """Health of the provider described by settings (see HealthProber)"""
+    service = settings['service']
+    if service == 'ollama':
+        return probe_ollama(settings['ollama_url'], settings['ollama_model'], timeout)
+    if service == 'openrouter':
+        return {'ai_status': 'OpenRouter' if settings['openrouter_configured'] else 'Not Configured'}
+    if service == 'openai':
+        return {'ai_status': 'OpenAI' if settings['openai_configured'] else 'Not Configured',
+                'model': settings['openai_model']}
+    return {'ai_status': 'Unknown Service'}
+
+
+class HealthProber:
+    """Background thread keeping the latest provider health for /health
+
+    settings is a callable returning the current provider settings, so a
+    change saved in the admin panel is picked up by the next probe (call
+    wake() to probe right away).
+    """
+
+    def __init__(self, settings, interval=HEALTH_PROBE_INTERVAL, timeout=HEALTH_PROBE_TIMEOUT):
+        self.settings = settings
+        self.interval = interval
+        self.timeout = timeout
+        self._state = {'ai_status': 'Checking', 'checked_at': None}
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the probe thread (and again after a fork: threads don't survive it)"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='health-prober', daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Probe now instead of at the next interval"""
+        self._wake.set()
+
+    def probe(self):
+        """Run one probe and store its result"""
+        settings = self.settings()
+        try:
+            result = probe_provider(settings, self.timeout)
+        except Exception as e:
+            result = {'ai_status': 'Disconnected', 'error': str(e)}
+        if result['ai_status'] != self._state['ai_status']:
+            logger.info("AI provider %s: %s -> %s", settings['service'], self._state['ai_status'], result['ai_status'])
+        result['ai_service'] = settings['service']
+        result['checked_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        result['_checked_monotonic'] = time.monotonic()
+        self._state = result
+        return result
+
+    def snapshot(self):
+        """Latest probe result, with its age in seconds; never blocks"""
+        self.start()
+        state = dict(self._state)
+        checked = state.pop('_checked_monotonic', None)
+        state['age_seconds'] = None if checked is None else round(time.monotonic() - checked, 1)
+        return state
+
+    def _run(self):
+        while True:
+            self.probe()
+            self._wake.wait(self.interval)
+            self._wake.clear()
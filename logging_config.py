@@ -0,0 +1,170 @@
+"""
+Structured logging for AIEat
+
+Log records are handed to a queue in the request thread and written by a
+background listener, so a slow stdout never blocks a request. Lines are
+JSON (or plain text with LOG_FORMAT=text) and carry the request id.
+
+DEBUG output is sampled per request: when LOG_LEVEL=DEBUG, only a
+LOG_DEBUG_SAMPLE_RATE fraction of requests emit their debug dumps.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0.01'))
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+_listener = None
+_stream_handler = None
+# Cleared while forking worker processes that log directly (see forking_workers)
+_restart_listener_after_fork = True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the message and any extra fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the request id and drop DEBUG records of unsampled requests"""
+
+    def filter(self, record):
+        record.request_id = '-'
+        if has_request_context():
+            record.request_id = g.get('request_id', '-')
+            if record.levelno <= logging.DEBUG and not g.get('debug_sampled', False):
+                return False
+        return True
+
+
+def setup_logging():
+    """Configure the 'aieat' logger with a non-blocking queue handler"""
+    logger = logging.getLogger('aieat')
+    if logger.handlers:
+        return logger
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+    global _stream_handler
+    stream_handler = _stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == 'text':
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(request_id)s] %(message)s'))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    logger.addHandler(queue_handler)
+
+    def start_listener():
+        global _listener
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+
+    def restart_listener_after_fork():
+        if _restart_listener_after_fork:
+            start_listener()
+
+    start_listener()
+    # The listener thread does not survive a fork (gunicorn --preload)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=restart_listener_after_fork)
+    atexit.register(lambda: _listener_running() and _listener.stop())
+    return logger
+
+
+def _listener_running():
+    return _listener is not None and _listener._thread is not None
+
+
+@contextmanager
+def forking_workers():
+    """Fork worker processes inside this block: the listener thread is stopped
+    meanwhile, so it can't hold a lock at fork time, and the workers don't
+    start their own (they call log_directly)"""
+    global _restart_listener_after_fork
+    running = _listener_running()
+    if running:
+        _listener.stop()
+    _restart_listener_after_fork = False
+    try:
+        yield
+    finally:
+        _restart_listener_after_fork = True
+        if running:
+            _listener.start()
+
+
+def log_directly():
+    """Write 'aieat' records straight to stdout instead of through the queue (worker processes)"""
+    global _listener
+    if _listener_running():
+        _listener.stop()
+    _listener = None
+    logger = logging.getLogger('aieat')
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+            _stream_handler.addFilter(RequestContextFilter())
+            logger.addHandler(_stream_handler)
+
+
+def start_request_logging():
+    """Assign a request id and decide whether this request logs DEBUG output"""
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+    g.debug_sampled = (logging.getLogger('aieat').isEnabledFor(logging.DEBUG)
+                       and random.random() < LOG_DEBUG_SAMPLE_RATE)
+    g.stage_timings = {}
+
+
+def debug_enabled():
+    """True if the current request's DEBUG output will actually be written"""
+    return bool(has_request_context() and g.get('debug_sampled', False))
+
+
+def record_stage(name, start):
+    """Record the time (ms) since perf_counter() value start under g.stage_timings[name]"""
+    if has_request_context():
+        g.setdefault('stage_timings', {})[name] = round((time.perf_counter() - start) * 1000, 2)
+
+
+@contextmanager
+def timed_stage(name):
+    """Record how long a block took (ms) under g.stage_timings[name]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, start)
@@ -0,0 +1,61 @@
+"""
+Prometheus metrics for AIEat
+
+Per-stage latency histograms for /recommend (by AI provider), request and
+fallback counters, and cache hit/miss counters, exposed on /metrics.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does) so each
+worker writes its samples to that directory and a scrape of any worker
+returns the totals across all of them.
+"""
+
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+# Stage latencies range from microseconds (formatting) to tens of seconds (LLM)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+RECOMMEND_STAGE_SECONDS = Histogram(
+    'aieat_recommend_stage_seconds',
+    'Time spent in each /recommend stage',
+    ['stage', 'provider'],
+    buckets=STAGE_BUCKETS
+)
+RECOMMEND_REQUESTS = Counter(
+    'aieat_recommend_requests_total',
+    '/recommend requests by outcome',
+    ['provider', 'outcome']
+)
+ANALYSIS_FALLBACKS = Counter(
+    'aieat_analysis_fallbacks_total',
+    'Preference analyses that fell back to the basic analysis',
+    ['provider', 'reason']
+)
+CACHE_REQUESTS = Counter(
+    'aieat_cache_requests_total',
+    'Cache lookups by cache and result (hit/miss)',
+    ['cache', 'result']
+)
+
+
+def observe_stages(stage_timings, provider):
+    """Record g.stage_timings (milliseconds) into the stage histogram"""
+    for stage, elapsed_ms in stage_timings.items():
+        RECOMMEND_STAGE_SECONDS.labels(stage=stage, provider=provider).observe(elapsed_ms / 1000)
+
+
+def record_cache(cache, hit):
+    """Count one cache lookup"""
+    CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def render_metrics():
+    """Current metrics in the Prometheus text format: (body, content type)"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
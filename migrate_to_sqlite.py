@@ -1,116 +1,232 @@
 """
 Migrate restaurant data from JSON to SQLite database
+
+Records are streamed from a JSON array or NDJSON file (bounded memory, so
+large exports are fine) and bulk-inserted in batched transactions. Rows
+are upserted by url, so the same file can be re-imported incrementally
+into an existing database.
+
+Usage:
+    python migrate_to_sqlite.py                                  # data/openrice_complete.json
+    python migrate_to_sqlite.py export.ndjson --db data/restaurants.db --batch-size 10000
 """
+import argparse
 import json
+import re
 import sqlite3
-from pathlib import Path
-
-def create_database():
-    """Create SQLite database with restaurants table"""
-    conn = sqlite3.connect('data/restaurants.db')
-    cursor = conn.cursor()
-    
-    # Create restaurants table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS restaurants (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name_en TEXT,
-        name_zh TEXT,
-        cuisine_en TEXT,
-        cuisine_zh TEXT,
-        district_en TEXT,
-        district_zh TEXT,
-        address_en TEXT,
-        address_zh TEXT,
-        price TEXT,
-        phone TEXT,
-        url TEXT,
-        rating_smile INTEGER DEFAULT 0,
-        rating_ok INTEGER DEFAULT 0,
-        rating_cry INTEGER DEFAULT 0,
-        description_en TEXT,
-        description_zh TEXT,
-        popular_dishes_en TEXT,
-        popular_dishes_zh TEXT,
-        opening_hours_en TEXT,
-        opening_hours_zh TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Create indexes for faster queries
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_cuisine_en ON restaurants(cuisine_en)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_district_en ON restaurants(district_en)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_price ON restaurants(price)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rating_smile ON restaurants(rating_smile)')
-    
+import time
+
+from db import RESTAURANT_INDEXES, RESTAURANTS_SCHEMA, migrate_restaurants_table
+
+IMPORT_COLUMNS = [
+    'name_en', 'name_zh', 'cuisine_en', 'cuisine_zh',
+    'district_en', 'district_zh', 'address_en', 'address_zh',
+    'price', 'phone', 'url',
+    'rating_smile', 'rating_ok', 'rating_cry',
+    'description_en', 'description_zh',
+    'popular_dishes_en', 'popular_dishes_zh',
+    'opening_hours_en', 'opening_hours_zh',
+]
+INTEGER_COLUMNS = {'rating_smile', 'rating_ok', 'rating_cry'}
+
+# Restaurants without a url can't be matched on re-import; they are always inserted
+URL_INDEX = '''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_url ON restaurants(url)
+    WHERE url IS NOT NULL AND url != ''
+'''
+
+UPSERT_SQL = f'''
+    INSERT INTO restaurants ({', '.join(IMPORT_COLUMNS)})
+    VALUES ({', '.join('?' for _ in IMPORT_COLUMNS)})
+    ON CONFLICT(url) WHERE url IS NOT NULL AND url != '' DO UPDATE SET
+    {', '.join(f'{column} = excluded.{column}' for column in IMPORT_COLUMNS if column != 'url')}
+'''
+
+DEFAULT_BATCH_SIZE = 5000
+READ_CHUNK_SIZE = 1 << 16
+SEPARATORS = re.compile(r'[\s,]*')
+
+def create_database(db_path='data/restaurants.db'):
+    """Create SQLite database with the canonical restaurants table (see db.py)"""
+    conn = sqlite3.connect(db_path)
+
+    # Create restaurants table, or bring a legacy one up to date
+    conn.execute(RESTAURANTS_SCHEMA)
+    migrate_restaurants_table(conn)
+
+    create_indexes(conn)
     conn.commit()
     return conn
 
-def migrate_data():
-    """Migrate data from JSON to SQLite"""
-    print("🔄 Starting migration from JSON to SQLite...")
-    
-    # Load JSON data
-    with open('data/openrice_complete.json', 'r', encoding='utf-8') as f:
-        restaurants = json.load(f)
-    
-    print(f"📂 Loaded {len(restaurants)} restaurants from JSON")
-    
-    # Create database
-    conn = create_database()
-    cursor = conn.cursor()
-    
-    # Insert data
-    inserted = 0
-    for restaurant in restaurants:
+def create_indexes(conn):
+    """Create the query indexes plus the unique url index used for upserts"""
+    for statement in RESTAURANT_INDEXES:
+        conn.execute(statement)
+    try:
+        conn.execute(URL_INDEX)
+    except sqlite3.IntegrityError:
+        raise RuntimeError("restaurants has duplicate urls; remove them before importing") from None
+
+def drop_indexes(conn):
+    """Drop the query indexes (not the url index) ahead of a bulk load into an empty table"""
+    for statement in RESTAURANT_INDEXES:
+        name = statement.split('EXISTS', 1)[1].split()[0]
+        conn.execute(f'DROP INDEX IF EXISTS {name}')
+
+def iter_json_array(f):
+    """Yield the elements of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("expected a JSON array of restaurants")
+    pos = 1
+    eof = False
+    while True:
+        pos = SEPARATORS.match(buffer, pos).end()
+        if buffer.startswith(']', pos):
+            return
         try:
-            cursor.execute('''
-            INSERT INTO restaurants (
-                name_en, name_zh, cuisine_en, cuisine_zh,
-                district_en, district_zh, address_en, address_zh,
-                price, phone, url,
-                rating_smile, rating_ok, rating_cry,
-                description_en, description_zh,
-                popular_dishes_en, popular_dishes_zh,
-                opening_hours_en, opening_hours_zh
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                restaurant.get('name_en', ''),
-                restaurant.get('name_zh', ''),
-                restaurant.get('cuisine_en', ''),
-                restaurant.get('cuisine_zh', ''),
-                restaurant.get('district_en', ''),
-                restaurant.get('district_zh', ''),
-                restaurant.get('address_en', ''),
-                restaurant.get('address_zh', ''),
-                restaurant.get('price', ''),
-                restaurant.get('phone', ''),
-                restaurant.get('url', ''),
-                int(restaurant.get('rating_smile', 0) or 0),
-                int(restaurant.get('rating_ok', 0) or 0),
-                int(restaurant.get('rating_cry', 0) or 0),
-                restaurant.get('description_en', ''),
-                restaurant.get('description_zh', ''),
-                restaurant.get('popular_dishes_en', ''),
-                restaurant.get('popular_dishes_zh', ''),
-                restaurant.get('opening_hours_en', ''),
-                restaurant.get('opening_hours_zh', '')
-            ))
-            inserted += 1
-            
-            if inserted % 500 == 0:
-                print(f"   ✓ Inserted {inserted} restaurants...")
-                
-        except Exception as e:
-            print(f"   ❌ Error inserting restaurant: {e}")
+            record, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Element cut off by the chunk boundary: keep the tail and read more
+            if eof:
+                raise
+            chunk = f.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
             continue
-    
-    conn.commit()
-    conn.close()
-    
-    print(f"✅ Migration complete! Inserted {inserted} restaurants into SQLite")
-    print(f"📊 Database saved to: data/restaurants.db")
+        yield record
+
+def iter_records(path):
+    """Stream restaurant records from a JSON array or NDJSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            yield from iter_json_array(f)
+            return
+        yield from iter_ndjson(f)
+
+def iter_ndjson(f):
+    """Yield one record per non-blank line of an NDJSON stream"""
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def to_int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return 0
+
+def normalize_record(record):
+    """Row tuple for IMPORT_COLUMNS, or None if the record is unusable"""
+    if not isinstance(record, dict):
+        return None
+    row = []
+    for column in IMPORT_COLUMNS:
+        value = record.get(column)
+        if column in INTEGER_COLUMNS:
+            row.append(to_int(value))
+        elif column == 'url':
+            row.append(value or None)
+        else:
+            row.append('' if value is None else str(value))
+    return tuple(row)
+
+def import_restaurants(records, db_path='data/restaurants.db', batch_size=DEFAULT_BATCH_SIZE, verbose=True):
+    """Bulk upsert an iterable of restaurant records; returns import statistics
+
+    An empty table gets the fast path: journaling off and query indexes built
+    after the load. Otherwise rows are upserted by url in batched transactions
+    with the existing journal mode kept, so readers are never disturbed.
+    """
+    start = time.perf_counter()
+    conn = create_database(db_path)
+    conn.isolation_level = None  # Transactions are managed per batch below
+    fresh = conn.execute('SELECT 1 FROM restaurants LIMIT 1').fetchone() is None
+    journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA cache_size = -200000')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    if fresh:
+        # Nothing to lose if the import dies half way: the table was empty
+        try:
+            conn.execute('PRAGMA journal_mode = OFF')
+        except sqlite3.OperationalError:
+            pass  # Another connection has the database open; keep its journal mode
+        drop_indexes(conn)
+
+    processed = skipped = 0
+    batch = []
+
+    def flush():
+        conn.execute('BEGIN')
+        conn.executemany(UPSERT_SQL, batch)
+        conn.execute('COMMIT')
+        batch.clear()
+
+    try:
+        for record in records:
+            row = normalize_record(record)
+            if row is None:
+                skipped += 1
+                continue
+            batch.append(row)
+            processed += 1
+            if len(batch) >= batch_size:
+                flush()
+                if verbose:
+                    elapsed = time.perf_counter() - start
+                    print(f"   ✓ {processed} restaurants ({processed / elapsed:,.0f} rows/s)")
+        if batch:
+            flush()
+
+        if fresh:
+            index_start = time.perf_counter()
+            create_indexes(conn)
+            if verbose:
+                print(f"   ✓ Built indexes in {time.perf_counter() - index_start:.1f}s")
+        conn.execute('ANALYZE restaurants')
+    finally:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        conn.execute(f'PRAGMA journal_mode = {journal_mode}')
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'processed': processed,
+        'skipped': skipped,
+        'fresh': fresh,
+        'seconds': round(elapsed, 2),
+        'rows_per_second': round(processed / elapsed) if elapsed else processed,
+    }
+
+def migrate_data(source='data/openrice_complete.json', db_path='data/restaurants.db', batch_size=DEFAULT_BATCH_SIZE):
+    """Migrate data from JSON to SQLite"""
+    print(f"🔄 Importing {source} into {db_path}...")
+    stats = import_restaurants(iter_records(source), db_path, batch_size)
+    mode = 'new database' if stats['fresh'] else 'upserted by url'
+    print(f"✅ Import complete! {stats['processed']} restaurants ({mode}) in {stats['seconds']}s "
+          f"({stats['rows_per_second']:,} rows/s)")
+    if stats['skipped']:
+        print(f"⚠️ Skipped {stats['skipped']} records that were not JSON objects")
+    print(f"📊 Database saved to: {db_path}")
 
 if __name__ == '__main__':
-    migrate_data()
+    parser = argparse.ArgumentParser(description='Import restaurants from JSON/NDJSON into SQLite')
+    parser.add_argument('source', nargs='?', default='data/openrice_complete.json',
+                        help='JSON array or NDJSON file')
+    parser.add_argument('--db', default='data/restaurants.db', help='SQLite database path')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='rows per transaction')
+    args = parser.parse_args()
+    migrate_data(args.source, args.db, args.batch_size)
@@ -0,0 +1,141 @@
+"""
+Parallel scoring over catalogue shards for AIEat (process pool)
+
+calculate_match_score is pure Python and CPU-bound, so threads can't speed
+up a pass over a large catalogue. start_pool() forks a persistent pool of
+worker processes once, while the app initializes (see initialize_app):
+every worker inherits the loaded restaurants list copy-on-write, so a
+request only ships the analysis and a shard number to each worker, never
+restaurant data. Workers return their shard's match count and local top-k,
+merged here into the global top-k in score_restaurants order (score
+descending, ties in catalogue order).
+
+The pool is never re-forked. Every task names the catalogue version it is
+for; a worker holding an older one reloads the catalogue itself first, so a
+reload in the web process reaches the workers without forking a process
+that by then runs background threads.
+
+Requires the 'fork' start method (Linux); elsewhere scoring stays in-process.
+"""
+
+import heapq
+import logging
+import multiprocessing
+import os
+
+from logging_config import forking_workers, log_directly
+
+logger = logging.getLogger('aieat.parallel_scoring')
+
+# 0 or 1 disables parallel scoring
+SCORING_WORKERS = int(os.getenv('SCORING_WORKERS', '0'))
+# Below this many restaurants the IPC round trip costs more than it saves
+PARALLEL_SCORING_MIN_ROWS = int(os.getenv('PARALLEL_SCORING_MIN_ROWS', '20000'))
+
+# Inherited by the forked workers (set just before the pool is created);
+# a worker replaces _catalogue when a task names another version
+_catalogue = None
+_catalogue_version = None
+_load = None
+_score = None
+_min_score = None
+
+
+def fork_available():
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def _init_worker():
+    # No log listener thread in the workers (see logging_config.forking_workers)
+    log_directly()
+
+
+def _score_shard(version, shard, shards, analysis, user_input, k, semantic):
+    """(match count, skipped count, top k as (-score, catalogue index, id, reasons)) for one shard"""
+    global _catalogue, _catalogue_version
+    if version != _catalogue_version:
+        _catalogue = _load()
+        _catalogue_version = version
+    size = len(_catalogue)
+    matches = []
+    skipped = 0
+    for idx in range(size * shard // shards, size * (shard + 1) // shards):
+        restaurant = _catalogue[idx]
+        # Same rules as score_restaurants
+        if not restaurant.get('name_en') or not restaurant.get('cuisine_en'):
+            skipped += 1
+            continue
+        score, reasons = _score(restaurant, analysis, user_input,
+                                semantic_similarity=semantic.get(restaurant['id']) if semantic else None)
+        if score >= _min_score:
+            matches.append((-score, idx, restaurant['id'], reasons))
+    return len(matches), skipped, heapq.nsmallest(k, matches)
+
+
+class ShardedScorer:
+    """Persistent worker pool scoring the catalogue, split into contiguous shards
+
+    load() returns the current catalogue list; workers call it after a
+    catalogue change. The pool is forked at construction, so create it
+    before starting any background thread.
+    """
+
+    def __init__(self, catalogue, version, load, score, min_score, workers):
+        global _catalogue, _catalogue_version, _load, _score, _min_score
+        _catalogue, _catalogue_version = catalogue, version
+        _load, _score, _min_score = load, score, min_score
+        self.workers = workers
+        self.pid = os.getpid()
+        self._indexed = None
+        self._by_id = {}
+        with forking_workers():
+            self.pool = multiprocessing.get_context('fork').Pool(workers, initializer=_init_worker)
+        logger.info("Parallel scoring: %d restaurants over %d worker processes", len(catalogue), workers)
+
+    def top_k(self, catalogue, version, analysis, user_input, k, semantic=None):
+        """(top k matches as score_restaurants dicts, total match count, skipped count)
+
+        catalogue is this process's list for version; matches are returned
+        as its restaurant dicts.
+        """
+        results = self.pool.starmap(
+            _score_shard,
+            [(version, shard, self.workers, analysis, user_input, k, semantic) for shard in range(self.workers)]
+        )
+        if self._indexed is not catalogue:
+            self._by_id = {restaurant['id']: restaurant for restaurant in catalogue}
+            self._indexed = catalogue
+        total = sum(count for count, _, _ in results)
+        skipped = sum(shard_skipped for _, shard_skipped, _ in results)
+        # Catalogue indexes are unique, so ties on score never compare reasons
+        merged = heapq.nsmallest(k, (match for _, _, top in results for match in top))
+        return [
+            {'restaurant': self._by_id[restaurant_id], 'score': -neg_score, 'reasons': reasons}
+            for neg_score, _, restaurant_id, reasons in merged
+            # A worker that reloaded mid-change may know a restaurant this process doesn't yet
+            if restaurant_id in self._by_id
+        ], total, skipped
+
+    def close(self):
+        # Requests still running on this pool finish; the workers exit after
+        self.pool.close()
+
+
+_scorer = None
+
+
+def start_pool(catalogue, version, load, score, min_score):
+    """Fork the scoring pool (once per process) if SCORING_WORKERS asks for one"""
+    global _scorer
+    if SCORING_WORKERS < 2 or not fork_available():
+        return None
+    if _scorer is None or _scorer.pid != os.getpid():
+        _scorer = ShardedScorer(catalogue, version, load, score, min_score, SCORING_WORKERS)
+    return _scorer
+
+
+def get_sharded_scorer(catalogue):
+    """This process's scorer, or None when parallel scoring is off or wouldn't pay off"""
+    if _scorer is None or _scorer.pid != os.getpid() or len(catalogue) < PARALLEL_SCORING_MIN_ROWS:
+        return None
+    return _scorer
@@ -9,9 +9,18 @@ Windows:
     waitress-serve --host=0.0.0.0 --port=5000 production:app
 """
 
+import gzip
 import os
 import sys
 
+from flask import request
+
+# Brotli is optional: pip install brotli
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(__file__))
 
@@ -23,6 +32,31 @@ app.config['ENV'] = 'production'
 app.config['DEBUG'] = False
 app.config['TESTING'] = False
 
+# Static asset URLs are content-hashed (see asset_url in app.py), so they never go stale
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
+
+# Response compression
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml'
+}
+COMPRESS_MIN_SIZE = 500
+# Compressed variants of responses with an ETag (rendered pages, static assets)
+PRECOMPRESSED_CACHE_SIZE = 64
+_precompressed = {}
+
+def _compress(data, encoding, best):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if best else 4)
+    return gzip.compress(data, compresslevel=9 if best else 6)
+
+def _choose_encoding():
+    offered = ['br', 'gzip'] if brotli else ['gzip']
+    for encoding in offered:
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
 # Security headers
 @app.after_request
 def add_security_headers(response):
@@ -32,6 +66,45 @@ def add_security_headers(response):
     response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
     return response
 
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+    if response.content_length is not None and response.content_length < COMPRESS_MIN_SIZE:
+        return response
+
+    # Static files are streamed from disk by default
+    response.direct_passthrough = False
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    etag, weak = response.get_etag()
+    if etag:
+        # Same ETag means same body: compress once at the best level and reuse
+        key = (etag, encoding)
+        compressed = _precompressed.get(key)
+        if compressed is None:
+            compressed = _compress(data, encoding, best=True)
+            if len(_precompressed) >= PRECOMPRESSED_CACHE_SIZE:
+                _precompressed.pop(next(iter(_precompressed)))
+            _precompressed[key] = compressed
+        # The encoded body is no longer byte-identical, so the validator is weak
+        response.set_etag(etag, weak=True)
+    else:
+        compressed = _compress(data, encoding, best=False)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.headers.pop('Accept-Ranges', None)
+    return response
+
 if __name__ == '__main__':
     # This won't be used in production, but useful for testing
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,161 @@
+"""
+Ranked result lists behind /recommend "show more" cursors
+
+recommend ranks every match but returns only the first page. The rest of
+the ranking (restaurant id, score and reasons, up to
+RESULT_CURSOR_MAX_ITEMS matches) is kept under a random token, so the
+follow-up request can serve the next page without re-running the analysis
+or the scoring pass. Entries expire after RESULT_CURSOR_TTL seconds.
+
+save_ranking() doesn't touch the database: the ranking goes into a bounded
+in-process LRU cache (RESULT_CURSOR_CACHE_SIZE entries) and its SQLite
+write is queued to the search history writer (search_logger), which
+commits it with the next batch. load_ranking() checks the cache first and
+falls back to SQLite, so a follow-up that lands on another worker finds
+the ranking once it is flushed. Tokens carry their creation time: until
+RESULT_CURSOR_PENDING_SECONDS have passed, a token found nowhere is
+reported by ranking_pending() as not written yet (retry) rather than
+expired. The table keeps at most RESULT_CURSOR_MAX_ENTRIES entries.
+"""
+
+import base64
+import itertools
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from search_logger import search_writer
+
+RESULT_CURSOR_TTL = int(os.getenv('RESULT_CURSOR_TTL', '900'))
+RESULT_CURSOR_MAX_ITEMS = int(os.getenv('RESULT_CURSOR_MAX_ITEMS', '100'))
+RESULT_CURSOR_MAX_ENTRIES = int(os.getenv('RESULT_CURSOR_MAX_ENTRIES', '5000'))
+# Rankings kept in memory per worker (least recently used evicted first)
+RESULT_CURSOR_CACHE_SIZE = int(os.getenv('RESULT_CURSOR_CACHE_SIZE', '500'))
+# How long another worker may take to see a new ranking (search writer flush interval plus slack)
+RESULT_CURSOR_PENDING_SECONDS = float(os.getenv('RESULT_CURSOR_PENDING_SECONDS', '5'))
+# Expired and surplus entries are swept every this many saves (per process)
+PRUNE_EVERY = 100
+
+RESULT_CURSOR_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS result_cursors (
+        token TEXT PRIMARY KEY,
+        created_at REAL NOT NULL,
+        total_matches INTEGER NOT NULL,
+        ranking TEXT NOT NULL  -- JSON [[restaurant id, score, reasons], ...], best first
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_result_cursors_created_at ON result_cursors(created_at)',
+]
+
+_saves = itertools.count(1)
+
+# token -> (created_at, total_matches, ranking), least recently used first
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def init_result_cursors(conn):
+    for statement in RESULT_CURSOR_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+
+
+def save_ranking(matches, total_matches):
+    """Keep ranked matches (score_restaurants dicts) and return their token"""
+    now = time.time()
+    # Creation time (ms, hex) first, for ranking_pending()
+    token = f'{int(now * 1000):x}.{secrets.token_urlsafe(12)}'
+    ranking = [[item['restaurant']['id'], item['score'], item['reasons']]
+               for item in matches[:RESULT_CURSOR_MAX_ITEMS]]
+    _cache_put(token, (now, total_matches, ranking))
+    search_writer.defer(store_ranking, token, now, total_matches, ranking)
+    return token
+
+
+def store_ranking(conn, token, created_at, total_matches, ranking):
+    """Write a ranking to SQLite inside the caller's transaction (search writer thread)"""
+    conn.execute(
+        'INSERT INTO result_cursors (token, created_at, total_matches, ranking) VALUES (?, ?, ?, ?)',
+        (token, created_at, total_matches, json.dumps(ranking, ensure_ascii=False))
+    )
+    if next(_saves) % PRUNE_EVERY == 0:
+        prune_rankings(conn, created_at)
+
+
+def _cache_put(token, entry):
+    with _cache_lock:
+        _cache[token] = entry
+        _cache.move_to_end(token)
+        while len(_cache) > RESULT_CURSOR_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _cache_get(token, oldest):
+    with _cache_lock:
+        entry = _cache.get(token)
+        if entry is None:
+            return None
+        if entry[0] < oldest:
+            del _cache[token]
+            return None
+        _cache.move_to_end(token)
+        return entry
+
+
+def prune_rankings(conn, now=None):
+    """Delete expired entries, then all but the newest RESULT_CURSOR_MAX_ENTRIES"""
+    now = now or time.time()
+    conn.execute('DELETE FROM result_cursors WHERE created_at < ?', (now - RESULT_CURSOR_TTL,))
+    conn.execute('''
+        DELETE FROM result_cursors WHERE created_at < (
+            SELECT created_at FROM result_cursors ORDER BY created_at DESC LIMIT 1 OFFSET ?
+        )
+    ''', (RESULT_CURSOR_MAX_ENTRIES - 1,))
+
+
+def load_ranking(conn, token):
+    """{'total_matches', 'ranking'} for a token, or None if unknown or expired"""
+    oldest = time.time() - RESULT_CURSOR_TTL
+    entry = _cache_get(token, oldest)
+    if entry is None:
+        # Saved by another worker (or evicted here)
+        row = conn.execute(
+            'SELECT created_at, total_matches, ranking FROM result_cursors WHERE token = ? AND created_at >= ?',
+            (token, oldest)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = (row[0], row[1], json.loads(row[2]))
+        _cache_put(token, entry)
+    return {'total_matches': entry[1], 'ranking': entry[2]}
+
+
+def ranking_pending(token):
+    """True if load_ranking() missed a token too recent to have been written to SQLite yet"""
+    try:
+        created_at = int(token.split('.', 1)[0], 16) / 1000
+    except ValueError:
+        return False
+    return 0 <= time.time() - created_at < RESULT_CURSOR_PENDING_SECONDS
+
+
+def encode_cursor(token, offset):
+    """Opaque cursor for the page of a stored ranking starting at offset"""
+    raw = json.dumps([token, offset]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor_value):
+    """(token, offset) from encode_cursor, or raise ValueError"""
+    try:
+        token, offset = json.loads(base64.urlsafe_b64decode(cursor_value.encode('ascii')))
+        offset = int(offset)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(token, str) or offset < 0:
+        raise ValueError('Invalid cursor')
+    return token, offset
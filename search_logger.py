@@ -0,0 +1,270 @@
+"""
+Asynchronous, batched search_history writer for AIEat
+
+/recommend only enqueues a search event; a background thread flushes the
+queue with executemany in one transaction every BATCH_SIZE events or
+FLUSH_INTERVAL_MS milliseconds, whichever comes first. Other writes that
+don't need to block a request (e.g. result cursor rankings) can ride along
+with defer().
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from db import connect
+
+logger = logging.getLogger('aieat.search_history')
+
+BATCH_SIZE = int(os.getenv('SEARCH_LOG_BATCH_SIZE', '200'))
+FLUSH_INTERVAL_MS = int(os.getenv('SEARCH_LOG_FLUSH_INTERVAL_MS', '1000'))
+MAX_QUEUE_SIZE = int(os.getenv('SEARCH_LOG_MAX_QUEUE', '10000'))
+# How long a request may block on a full queue before the event is dropped
+ENQUEUE_TIMEOUT_MS = int(os.getenv('SEARCH_LOG_ENQUEUE_TIMEOUT_MS', '50'))
+
+INSERT_SQL = '''
+    INSERT INTO search_history (timestamp, preferences, cuisine, district, budget, results_count, language, session_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_STOP = object()
+
+
+class DeferredWrite:
+    """write(conn, *args), queued with defer() and run in the next flush"""
+
+    __slots__ = ('write', 'args')
+
+    def __init__(self, write, args):
+        self.write = write
+        self.args = args
+
+# Daily rollups: one row per (date, dimension, value). Dimensions are
+# 'total', 'cuisine', 'district', 'budget', 'lang' and 'session' (new
+# sessions first seen that day), so the admin dashboard never has to scan
+# search_history.
+ROLLUP_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS search_rollup_daily (
+        date TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (date, dimension, value)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_rollup_dimension ON search_rollup_daily(dimension, date)',
+    '''
+    CREATE TABLE IF NOT EXISTS search_sessions (
+        session_id TEXT PRIMARY KEY,
+        first_seen TEXT NOT NULL
+    ) WITHOUT ROWID
+    ''',
+]
+
+UPSERT_ROLLUP_SQL = '''
+    INSERT INTO search_rollup_daily (date, dimension, value, count) VALUES (?, ?, ?, ?)
+    ON CONFLICT(date, dimension, value) DO UPDATE SET count = count + excluded.count
+'''
+
+
+def init_rollup_tables(conn):
+    """Create the rollup tables, backfilling them from search_history if new"""
+    for statement in ROLLUP_SCHEMA:
+        conn.execute(statement)
+    has_rollups = conn.execute('SELECT 1 FROM search_rollup_daily LIMIT 1').fetchone()
+    has_history = conn.execute('SELECT 1 FROM search_history LIMIT 1').fetchone()
+    if has_history and not has_rollups:
+        rebuild_rollups(conn)
+
+
+def rebuild_rollups(conn):
+    """Recompute all rollups from search_history (one-off, full scan)"""
+    conn.execute('DELETE FROM search_rollup_daily')
+    conn.execute('DELETE FROM search_sessions')
+    conn.execute('''
+        INSERT INTO search_rollup_daily (date, dimension, value, count)
+        SELECT DATE(timestamp), 'total', '', COUNT(*) FROM search_history GROUP BY DATE(timestamp)
+    ''')
+    for dimension, column, excluded in (('cuisine', 'cuisine', ("''",)),
+                                        ('district', 'district', ("''", "'Any'")),
+                                        ('budget', 'budget', ("''", "'Any'")),
+                                        ('lang', 'language', ("''",))):
+        conn.execute(f'''
+            INSERT INTO search_rollup_daily (date, dimension, value, count)
+            SELECT DATE(timestamp), '{dimension}', {column}, COUNT(*)
+            FROM search_history
+            WHERE {column} IS NOT NULL AND {column} NOT IN ({', '.join(excluded)})
+            GROUP BY DATE(timestamp), {column}
+        ''')
+    conn.execute('''
+        INSERT INTO search_sessions (session_id, first_seen)
+        SELECT session_id, MIN(DATE(timestamp)) FROM search_history
+        WHERE session_id IS NOT NULL
+        GROUP BY session_id
+    ''')
+    conn.execute('''
+        INSERT INTO search_rollup_daily (date, dimension, value, count)
+        SELECT first_seen, 'session', '', COUNT(*) FROM search_sessions GROUP BY first_seen
+    ''')
+
+
+def update_rollups(conn, events):
+    """Fold a batch of search events into the daily rollups"""
+    counts = Counter()
+    sessions = {}
+    for timestamp, _, cuisine, district, budget, _, language, session_id in events:
+        date = timestamp[:10]
+        counts[(date, 'total', '')] += 1
+        if cuisine:
+            counts[(date, 'cuisine', cuisine)] += 1
+        if district and district != 'Any':
+            counts[(date, 'district', district)] += 1
+        if budget and budget != 'Any':
+            counts[(date, 'budget', budget)] += 1
+        if language:
+            counts[(date, 'lang', language)] += 1
+        if session_id is not None:
+            sessions.setdefault(session_id, date)
+
+    for session_id, date in sessions.items():
+        cursor = conn.execute(
+            'INSERT OR IGNORE INTO search_sessions (session_id, first_seen) VALUES (?, ?)',
+            (session_id, date)
+        )
+        if cursor.rowcount == 1:
+            counts[(date, 'session', '')] += 1
+
+    conn.executemany(UPSERT_ROLLUP_SQL, [key + (count,) for key, count in counts.items()])
+
+
+def write_batch(conn, events):
+    """Write a batch of search events inside the caller's transaction"""
+    conn.executemany(INSERT_SQL, events)
+    update_rollups(conn, events)
+
+
+class SearchHistoryWriter:
+    """Background thread that batches search_history inserts"""
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval_ms=FLUSH_INTERVAL_MS,
+                 max_queue_size=MAX_QUEUE_SIZE, enqueue_timeout_ms=ENQUEUE_TIMEOUT_MS):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.dropped = 0
+        self.written = 0
+        self.flushes = 0
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def _ensure_started(self):
+        """Start the writer thread lazily (and again after a fork)"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._stop_event = threading.Event()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='search-history-writer', daemon=True)
+            self._thread.start()
+
+    def log(self, preferences, cuisine, district, budget, results_count, language, session_id):
+        """Queue one search event; returns False if it had to be dropped"""
+        self._ensure_started()
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        event = (timestamp, preferences, cuisine, district, budget, results_count, language, session_id)
+        try:
+            # Backpressure: wait briefly for room, then shed the event
+            self._queue.put(event, timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def defer(self, write, *args):
+        """Queue write(conn, *args) for the writer thread; returns False if it had to be dropped"""
+        self._ensure_started()
+        try:
+            self._queue.put(DeferredWrite(write, args), timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        conn = connect()
+        pending = []
+        deadline = None
+        stopping = False
+        while not stopping:
+            timeout = self.flush_interval if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            # The stop event covers a stop() that found the queue full
+            if item is _STOP or self._stop_event.is_set():
+                stopping = True
+            if item is not None and item is not _STOP:
+                if not pending:
+                    deadline = time.monotonic() + self.flush_interval
+                pending.append(item)
+
+            # Flush every batch_size events or flush_interval after the first queued one
+            if pending and (stopping or len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(conn, pending)
+                pending = []
+                deadline = None
+        conn.really_close()
+
+    def _flush(self, conn, items):
+        events = [item for item in items if not isinstance(item, DeferredWrite)]
+        if events:
+            try:
+                with conn:
+                    write_batch(conn, events)
+                self.written += len(events)
+            except Exception as e:
+                self.dropped += len(events)
+                logger.error("Error logging search history: %s", e)
+        # Each in its own transaction: a failing one costs neither the history batch nor the others
+        for item in items:
+            if not isinstance(item, DeferredWrite):
+                continue
+            try:
+                with conn:
+                    item.write(conn, *item.args)
+                self.written += 1
+            except Exception as e:
+                self.dropped += 1
+                logger.error("Error in deferred write %s: %s", getattr(item.write, '__name__', item.write), e)
+        self.flushes += 1
+
+    def stop(self, timeout=5):
+        """Drain queued events and stop the writer thread (waiting at most timeout seconds)"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=self.enqueue_timeout)
+        except queue.Full:
+            # Writer stalled (e.g. on a locked database): stop after its current batch
+            self._stop_event.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+
+search_writer = SearchHistoryWriter()
+atexit.register(search_writer.stop)
@@ -0,0 +1,405 @@
+"""
+Semantic retrieval over precomputed restaurant embeddings
+
+Each restaurant's cuisine, description and popular dishes (EN and ZH) are
+embedded once by a local backend and stored in restaurant_embeddings as
+float32 blobs, with a hash of the embedded text so edited restaurants are
+re-embedded. At query time the vectors sit in a NumPy matrix and the
+embedded request is compared by cosine similarity in one matrix product,
+or, for large catalogues, through a coarse IVF partition (k-means
+clusters) that only scans the clusters closest to the query.
+
+Backends (EMBEDDING_BACKEND):
+    stub    hashed words and character n-grams: deterministic, no model (tests, benchmarks)
+    ollama  an Ollama embedding model on OLLAMA_URL (EMBEDDING_MODEL, default nomic-embed-text)
+
+NumPy is optional (pip install numpy); without it semantic retrieval stays off.
+
+Usage:
+    python semantic_search.py                        # embed new and changed restaurants
+    python semantic_search.py --backend ollama --rebuild
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import requests
+
+from db import DB_PATH, connect
+
+# NumPy is optional: pip install numpy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger('aieat.semantic_search')
+
+SEMANTIC_SEARCH = os.getenv('SEMANTIC_SEARCH', '0') == '1'
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'stub')
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'nomic-embed-text')
+OLLAMA_URL = os.getenv('OLLAMA_URL', 'http://localhost:11434')
+SEMANTIC_TOP_K = int(os.getenv('SEMANTIC_TOP_K', '200'))
+SEMANTIC_MIN_SIMILARITY = float(os.getenv('SEMANTIC_MIN_SIMILARITY', '0.3'))
+# Catalogues at least this large are searched through the IVF partition
+SEMANTIC_IVF_MIN_ROWS = int(os.getenv('SEMANTIC_IVF_MIN_ROWS', '100000'))
+SEMANTIC_IVF_NPROBE = int(os.getenv('SEMANTIC_IVF_NPROBE', '8'))
+# How often a process checks whether another one has written new embeddings
+SEMANTIC_REFRESH_INTERVAL = float(os.getenv('SEMANTIC_REFRESH_INTERVAL', '5'))
+
+EMBEDDED_COLUMNS = ['cuisine_en', 'cuisine_zh', 'description_en', 'description_zh',
+                    'popular_dishes_en', 'popular_dishes_zh']
+EMBED_BATCH_SIZE = 256
+
+EMBEDDING_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS restaurant_embeddings (
+        restaurant_id INTEGER PRIMARY KEY,
+        model TEXT NOT NULL,
+        text_hash TEXT NOT NULL,
+        vector BLOB NOT NULL  -- float32 little-endian, L2-normalized
+    )
+    ''',
+    # Bumped by every build_embeddings write, so other processes know to reload their index
+    '''
+    CREATE TABLE IF NOT EXISTS restaurant_embeddings_meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    ''',
+    "INSERT OR IGNORE INTO restaurant_embeddings_meta (key, value) VALUES ('version', 0)",
+    '''
+    CREATE TRIGGER IF NOT EXISTS restaurant_embeddings_delete AFTER DELETE ON restaurants
+    BEGIN
+        DELETE FROM restaurant_embeddings WHERE restaurant_id = OLD.id;
+    END
+    ''',
+]
+
+
+# ============================================================================
+# EMBEDDING BACKENDS
+# ============================================================================
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class StubEmbedder:
+    """Feature-hashed words and character trigrams; same text, same vector, in any process"""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f'stub-{dim}'
+
+    def features(self, text):
+        text = text.lower()
+        for word in re.findall(r'\w+', text):
+            yield word
+            # Trigrams let CJK text (no spaces) and word variants overlap
+            for i in range(len(word) - 2):
+                yield word[i:i + 3]
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+                value = int.from_bytes(digest, 'little')
+                matrix[row, value % self.dim] += 1.0 if value >> 63 else -1.0
+        return normalize_rows(matrix)
+
+
+class OllamaEmbedder:
+    """Embeddings from a local Ollama model (/api/embed, batched)"""
+
+    def __init__(self, model=EMBEDDING_MODEL, url=OLLAMA_URL):
+        self.model = model
+        self.url = url
+        self.name = f'ollama:{model}'
+
+    def embed(self, texts):
+        response = requests.post(f"{self.url}/api/embed", json={'model': self.model, 'input': texts}, timeout=120)
+        response.raise_for_status()
+        return normalize_rows(np.asarray(response.json()['embeddings'], dtype=np.float32))
+
+
+def get_embedder(backend=EMBEDDING_BACKEND):
+    if backend == 'stub':
+        return StubEmbedder()
+    if backend == 'ollama':
+        return OllamaEmbedder()
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+# ============================================================================
+# PRECOMPUTED VECTORS
+# ============================================================================
+
+def init_embeddings(conn):
+    for statement in EMBEDDING_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+
+
+def embeddings_version(conn):
+    row = conn.execute("SELECT value FROM restaurant_embeddings_meta WHERE key = 'version'").fetchone()
+    return row[0] if row else None
+
+
+def bump_embeddings_version(conn):
+    conn.execute("UPDATE restaurant_embeddings_meta SET value = value + 1 WHERE key = 'version'")
+
+
+def restaurant_text(row):
+    return '\n'.join(row[column] or '' for column in EMBEDDED_COLUMNS)
+
+
+def build_embeddings(conn, embedder, rebuild=False, batch_size=EMBED_BATCH_SIZE, verbose=False):
+    """Embed restaurants that are new, edited or embedded by another model; returns the count"""
+    init_embeddings(conn)
+    if rebuild:
+        conn.execute('DELETE FROM restaurant_embeddings')
+        bump_embeddings_version(conn)
+        conn.commit()
+    current = {
+        restaurant_id: (model, text_hash)
+        for restaurant_id, model, text_hash in conn.execute(
+            'SELECT restaurant_id, model, text_hash FROM restaurant_embeddings'
+        )
+    }
+
+    embedded = 0
+    last_id = 0
+    while True:
+        # Keyset pages, so a big catalogue is never held in memory at once
+        rows = conn.execute(
+            f"SELECT id, {', '.join(EMBEDDED_COLUMNS)} FROM restaurants WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        pending = []
+        for row in rows:
+            text = restaurant_text(dict(zip(['id'] + EMBEDDED_COLUMNS, row)))
+            text_hash = hashlib.sha1(text.encode('utf-8')).hexdigest()
+            if current.get(row[0]) != (embedder.name, text_hash):
+                pending.append((row[0], text, text_hash))
+        if not pending:
+            continue
+
+        vectors = embedder.embed([text for _, text, _ in pending])
+        conn.executemany(
+            'INSERT OR REPLACE INTO restaurant_embeddings (restaurant_id, model, text_hash, vector) VALUES (?, ?, ?, ?)',
+            [(restaurant_id, embedder.name, text_hash, vector.astype('<f4').tobytes())
+             for (restaurant_id, _, text_hash), vector in zip(pending, vectors)]
+        )
+        bump_embeddings_version(conn)
+        conn.commit()
+        embedded += len(pending)
+        if verbose:
+            print(f"   ✓ {embedded} restaurants embedded")
+    return embedded
+
+
+# ============================================================================
+# VECTOR INDEX
+# ============================================================================
+
+class VectorIndex:
+    """Cosine top-k over normalized vectors, exhaustive or through an IVF partition"""
+
+    def __init__(self, ids, matrix, nlist=0, nprobe=SEMANTIC_IVF_NPROBE, seed=0):
+        self.ids = ids
+        self.matrix = matrix
+        self.nprobe = nprobe
+        self.centroids = None
+        self.lists = None
+        if nlist and len(ids) > nlist:
+            self.build_ivf(nlist, seed)
+
+    @classmethod
+    def load(cls, conn, model, **kwargs):
+        rows = conn.execute(
+            'SELECT restaurant_id, vector FROM restaurant_embeddings WHERE model = ? ORDER BY restaurant_id', (model,)
+        ).fetchall()
+        if not rows:
+            return cls(np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32))
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        matrix = np.frombuffer(b''.join(row[1] for row in rows), dtype='<f4').reshape(len(rows), -1)
+        return cls(ids, matrix, **kwargs)
+
+    def assign(self, vectors, chunk=65536):
+        """Nearest centroid per row, in chunks to bound the rows x centroids product"""
+        return np.concatenate([
+            np.argmax(vectors[start:start + chunk] @ self.centroids.T, axis=1)
+            for start in range(0, len(vectors), chunk)
+        ])
+
+    def build_ivf(self, nlist, seed, iterations=10, sample_per_list=40):
+        """Spherical k-means on a sample, then every vector goes to its nearest centroid"""
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(self.matrix), nlist * sample_per_list)
+        sample = self.matrix[rng.choice(len(self.matrix), sample_size, replace=False)]
+        self.centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = self.assign(sample)
+            for cluster in range(nlist):
+                members = sample[assignment == cluster]
+                if len(members):
+                    self.centroids[cluster] = members.sum(axis=0)
+            self.centroids = normalize_rows(self.centroids)
+        assignment = self.assign(self.matrix)
+        order = np.argsort(assignment, kind='stable')
+        bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(nlist)]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query, k):
+        """[(restaurant id, cosine similarity)] for the k nearest vectors, best first"""
+        if not len(self.ids):
+            return []
+        if self.centroids is not None:
+            probes = np.argsort(self.centroids @ query)[::-1][:self.nprobe]
+            rows = np.concatenate([self.lists[cluster] for cluster in probes])
+            similarities = self.matrix[rows] @ query
+        else:
+            rows = None
+            similarities = self.matrix @ query
+        k = min(k, len(similarities))
+        if k == 0:
+            return []
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind='stable')]
+        positions = rows[top] if rows is not None else top
+        return [(int(self.ids[position]), float(similarities[i])) for position, i in zip(positions, top)]
+
+
+class SemanticRetriever:
+    """Query-side entry point: embedder plus the index over the current embeddings
+
+    Only one process embeds: the one initializing with load(embed=True),
+    the worker handling an admin change (refresh(embed=True)) or the CLI
+    below; every other process only loads the stored vectors. A single
+    background thread per process swaps in a fresh index when refresh()
+    marks it dirty or another process has written embeddings (checked every
+    SEMANTIC_REFRESH_INTERVAL seconds); refreshes requested while one runs
+    are coalesced into one more pass. Until the first index is ready,
+    similar() finds nothing and recommendations are scored without it.
+    """
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.index = None
+        self.version = None
+        self._dirty = threading.Event()
+        self._embed = False
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the refresh thread lazily (and again after a fork: threads don't survive it)"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='semantic-index', daemon=True)
+            self._thread.start()
+
+    def refresh(self, embed=False):
+        """Reload the index in the background; embed=True embeds new and edited restaurants first"""
+        if embed:
+            self._embed = True
+        self._dirty.set()
+        self._ensure_started()
+
+    def _run(self):
+        conn = connect()
+        try:
+            while True:
+                if not self._dirty.wait(SEMANTIC_REFRESH_INTERVAL):
+                    try:
+                        if embeddings_version(conn) == self.version:
+                            continue
+                    except sqlite3.Error:
+                        continue
+                self._dirty.clear()
+                embed, self._embed = self._embed, False
+                self.load(embed)
+        finally:
+            conn.really_close()
+
+    def load(self, embed=False):
+        """Load the index in this thread; embed=True embeds new and edited restaurants first"""
+        start = time.perf_counter()
+        conn = connect()
+        try:
+            if embed:
+                embedded = build_embeddings(conn, self.embedder)
+            else:
+                init_embeddings(conn)
+                embedded = 0
+            # Read the version first: a write during the load triggers another one
+            version = embeddings_version(conn)
+            count = conn.execute('SELECT COUNT(*) FROM restaurant_embeddings WHERE model = ?',
+                                 (self.embedder.name,)).fetchone()[0]
+            nlist = int(4 * count ** 0.5) if count >= SEMANTIC_IVF_MIN_ROWS else 0
+            self.index = VectorIndex.load(conn, self.embedder.name, nlist=nlist)
+            self.version = version
+        except Exception:
+            logger.exception("Semantic index refresh failed")
+            return
+        finally:
+            conn.really_close()
+        logger.info("Semantic index ready: %d vectors (%d newly embedded, %s) in %.1fs",
+                    len(self.index), embedded, 'IVF' if nlist else 'exact', time.perf_counter() - start)
+
+    def similar(self, text, k=SEMANTIC_TOP_K, min_similarity=SEMANTIC_MIN_SIMILARITY):
+        """{restaurant id: similarity} of the restaurants closest to text"""
+        self._ensure_started()
+        index = self.index
+        if index is None or not len(index) or not text.strip():
+            return {}
+        query = self.embedder.embed([text])[0]
+        return {restaurant_id: similarity for restaurant_id, similarity in index.search(query, k)
+                if similarity >= min_similarity}
+
+
+def create_retriever():
+    """SemanticRetriever when SEMANTIC_SEARCH is on and NumPy is installed, else None"""
+    if not SEMANTIC_SEARCH:
+        return None
+    if np is None:
+        logger.warning("SEMANTIC_SEARCH is on but NumPy is not installed (pip install numpy); skipping")
+        return None
+    return SemanticRetriever(get_embedder())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Embed restaurants for semantic retrieval')
+    parser.add_argument('--db', default=DB_PATH, help='SQLite database path')
+    parser.add_argument('--backend', default=EMBEDDING_BACKEND, choices=['stub', 'ollama'])
+    parser.add_argument('--rebuild', action='store_true', help='re-embed every restaurant')
+    args = parser.parse_args()
+    if np is None:
+        raise SystemExit("NumPy is required: pip install numpy")
+
+    start = time.perf_counter()
+    conn = connect(args.db)
+    count = build_embeddings(conn, get_embedder(args.backend), rebuild=args.rebuild, verbose=True)
+    print(f"✅ Embedded {count} restaurants in {time.perf_counter() - start:.1f}s")
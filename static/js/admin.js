@@ -0,0 +1,704 @@
+let allRestaurants = [];  // restaurants on the current page
+let restaurantsPage = 1;
+let restaurantsTotalPages = 1;
+let currentEditId = null;
+
+// Translations
+const t = {
+    zh: {
+        dashboard: '儀表板',
+        restaurants: '餐廳管理',
+        analytics: '數據分析',
+        'search-history': '搜尋記錄',
+        settings: '設定',
+        mostPopularCuisine: '最受歡迎菜系',
+        mostPopularDistrict: '最受歡迎地區',
+        priceDistribution: '價格分佈',
+        restaurants_text: '間餐廳',
+        deleteConfirm: '確定要刪除',
+        deleteSuccess: '餐廳已成功刪除！',
+        deleteError: '刪除餐廳時發生錯誤',
+        addSuccess: '餐廳已成功新增！',
+        updateSuccess: '餐廳已成功更新！',
+        saveError: '儲存餐廳時發生錯誤',
+        duplicateUrl: '已有另一間餐廳使用此網址',
+        logoutConfirm: '確定要登出嗎？',
+        addRestaurant: '新增餐廳',
+        editRestaurant: '編輯餐廳',
+        noRestaurants: '找不到餐廳',
+        errorLoading: '載入餐廳時發生錯誤',
+        settingsSaved: '設定已成功儲存！',
+        settingsError: '儲存設定時發生錯誤',
+        settingsLoaded: '設定已載入',
+        connected: '已連接',
+        disconnected: '未連接',
+        checking: '檢查中...',
+        dbConnected: '資料庫已連接',
+        restaurants_loaded: '間餐廳已載入'
+    },
+    en: {
+        dashboard: 'Dashboard',
+        restaurants: 'Manage Restaurants',
+        analytics: 'Analytics',
+        'search-history': 'Search History',
+        settings: 'Settings',
+        mostPopularCuisine: 'Most Popular Cuisine',
+        mostPopularDistrict: 'Most Popular District',
+        priceDistribution: 'Price Range Distribution',
+        restaurants_text: ' restaurants',
+        deleteConfirm: 'Are you sure you want to delete',
+        deleteSuccess: 'Restaurant deleted successfully!',
+        deleteError: 'Error deleting restaurant',
+        addSuccess: 'Restaurant added successfully!',
+        updateSuccess: 'Restaurant updated successfully!',
+        saveError: 'Error saving restaurant',
+        duplicateUrl: 'Another restaurant already has this URL',
+        logoutConfirm: 'Are you sure you want to logout?',
+        addRestaurant: 'Add Restaurant',
+        editRestaurant: 'Edit Restaurant',
+        noRestaurants: 'No restaurants found',
+        errorLoading: 'Error loading restaurants',
+        settingsSaved: 'Settings saved successfully!',
+        settingsError: 'Error saving settings',
+        settingsLoaded: 'Settings loaded',
+        connected: 'Connected',
+        disconnected: 'Disconnected',
+        checking: 'Checking...',
+        dbConnected: 'Database connected',
+        restaurants_loaded: ' restaurants loaded'
+    }
+};
+
+// Navigation
+document.querySelectorAll('.nav-link').forEach(link => {
+    link.addEventListener('click', function() {
+        const section = this.dataset.section;
+
+        // Update active nav
+        document.querySelectorAll('.nav-link').forEach(l => l.classList.remove('active'));
+        this.classList.add('active');
+
+        // Show section
+        document.querySelectorAll('.section').forEach(s => s.classList.remove('active'));
+        document.getElementById(section).classList.add('active');
+
+        // Update title
+        const titles = t[lang];
+        document.getElementById('page-title').textContent = titles[section];
+
+        // Load data if needed
+        if (section === 'restaurants' && allRestaurants.length === 0) {
+            loadRestaurants();
+        }
+    });
+});
+
+// Load dashboard stats
+async function loadDashboardStats() {
+    try {
+        const response = await fetch('/admin/api/stats');
+        const data = await response.json();
+
+        document.getElementById('total-restaurants').textContent = data.total_restaurants;
+        document.getElementById('total-districts').textContent = data.total_districts;
+        document.getElementById('total-cuisines').textContent = data.total_cuisines;
+        document.getElementById('avg-rating').textContent = data.avg_rating + '%';
+
+        const statsHtml = `
+            <p><strong>${t[lang].mostPopularCuisine}:</strong> ${data.popular_cuisine}</p>
+            <p><strong>${t[lang].mostPopularDistrict}:</strong> ${data.popular_district}</p>
+            <p><strong>${t[lang].priceDistribution}:</strong></p>
+            <ul>
+                ${Object.entries(data.price_distribution).map(([range, count]) => 
+                    `<li>${range}: ${count}${t[lang].restaurants_text}</li>`
+                ).join('')}
+            </ul>
+        `;
+        document.getElementById('quick-stats').innerHTML = statsHtml;
+    } catch (error) {
+        console.error('Error loading stats:', error);
+    }
+}
+
+// Load one page of restaurants (filtered and sorted on the server)
+async function loadRestaurants(page = restaurantsPage) {
+    try {
+        const params = new URLSearchParams({ page: Math.max(1, page), per_page: 50 });
+        const query = document.getElementById('search-input').value.trim();
+        const price = document.getElementById('price-filter').value;
+        if (query) params.set('q', query);
+        if (price) params.set('price', price);
+
+        const response = await fetch(`/admin/api/restaurants?${params}`);
+        const data = await response.json();
+        allRestaurants = data.restaurants;
+        restaurantsPage = data.current_page || 1;
+        restaurantsTotalPages = data.total_pages || 1;
+        displayRestaurants(allRestaurants);
+        updateRestaurantsPagination();
+    } catch (error) {
+        console.error('Error loading restaurants:', error);
+        document.getElementById('restaurants-tbody').innerHTML = `
+            <tr><td colspan="6" style="text-align: center; color: red;">${t[lang].errorLoading}</td></tr>
+        `;
+    }
+}
+
+// Display restaurants in table
+function displayRestaurants(restaurants) {
+    const tbody = document.getElementById('restaurants-tbody');
+
+    if (restaurants.length === 0) {
+        tbody.innerHTML = `
+            <tr><td colspan="6" style="text-align: center; padding: 40px;">${t[lang].noRestaurants}</td></tr>
+        `;
+        return;
+    }
+
+    tbody.innerHTML = restaurants.map(r => {
+        const smileRatio = r.rating_smile / (r.rating_smile + r.rating_ok + r.rating_cry) * 100 || 0;
+        return `
+            <tr>
+                <td>
+                    <strong>${r.name_en}</strong><br>
+                    <small style="color: #7f8c8d;">${r.name_zh || '-'}</small>
+                </td>
+                <td>${r.cuisine_en}</td>
+                <td>${r.district_en}</td>
+                <td><span class="badge badge-blue">${r.price}</span></td>
+                <td>
+                    <span style="color: #43a047;">😊 ${r.rating_smile}</span>
+                    <span style="color: #ff9800;">😐 ${r.rating_ok}</span>
+                    <span style="color: #e74c3c;">😢 ${r.rating_cry}</span>
+                </td>
+                <td class="action-btns">
+                    <button class="btn btn-primary btn-sm" onclick="editRestaurant(${r.id})">
+                        <i class="fas fa-edit"></i>
+                    </button>
+                    <button class="btn btn-danger btn-sm" onclick="deleteRestaurant(${r.id}, '${r.name_en}')">
+                        <i class="fas fa-trash"></i>
+                    </button>
+                </td>
+            </tr>
+        `;
+    }).join('');
+}
+
+// Update restaurants pagination
+function updateRestaurantsPagination() {
+    document.getElementById('restaurants-page-info').textContent = lang === 'zh'
+        ? `第 ${restaurantsPage} / ${restaurantsTotalPages} 頁`
+        : `Page ${restaurantsPage} of ${restaurantsTotalPages}`;
+    document.getElementById('restaurants-prev-btn').disabled = restaurantsPage <= 1;
+    document.getElementById('restaurants-next-btn').disabled = restaurantsPage >= restaurantsTotalPages;
+}
+
+// Search restaurants
+function searchRestaurants() {
+    loadRestaurants(1);
+}
+
+// Open add modal
+function openAddModal() {
+    currentEditId = null;
+    document.getElementById('modal-title').textContent = t[lang].addRestaurant;
+    document.getElementById('restaurant-form').reset();
+    document.getElementById('restaurant-id').value = '';
+    document.getElementById('restaurant-modal').classList.add('active');
+}
+
+// Edit restaurant
+async function editRestaurant(id) {
+    currentEditId = id;
+    const restaurant = allRestaurants.find(r => r.id === id);
+
+    if (!restaurant) return;
+
+    document.getElementById('modal-title').textContent = t[lang].editRestaurant;
+    document.getElementById('restaurant-id').value = id;
+    document.getElementById('name-en').value = restaurant.name_en || '';
+    document.getElementById('name-zh').value = restaurant.name_zh || '';
+    document.getElementById('cuisine-en').value = restaurant.cuisine_en || '';
+    document.getElementById('cuisine-zh').value = restaurant.cuisine_zh || '';
+    document.getElementById('district-en').value = restaurant.district_en || '';
+    document.getElementById('district-zh').value = restaurant.district_zh || '';
+    document.getElementById('price').value = restaurant.price || '';
+    document.getElementById('phone').value = restaurant.phone || '';
+    document.getElementById('address-en').value = restaurant.address_en || '';
+    document.getElementById('address-zh').value = restaurant.address_zh || '';
+    document.getElementById('opening-hours-en').value = restaurant.opening_hours_en || '';
+    document.getElementById('opening-hours-zh').value = restaurant.opening_hours_zh || '';
+    document.getElementById('description-en').value = restaurant.description_en || '';
+    document.getElementById('description-zh').value = restaurant.description_zh || '';
+    document.getElementById('popular-dishes-en').value = restaurant.popular_dishes_en || '';
+    document.getElementById('popular-dishes-zh').value = restaurant.popular_dishes_zh || '';
+    document.getElementById('url').value = restaurant.url || '';
+
+    document.getElementById('restaurant-modal').classList.add('active');
+}
+
+// Delete restaurant
+async function deleteRestaurant(id, name) {
+    if (!confirm(`${t[lang].deleteConfirm} "${name}"?`)) return;
+
+    try {
+        const response = await fetch(`/admin/api/restaurants/${id}`, {
+            method: 'DELETE'
+        });
+
+        if (response.ok) {
+            alert(t[lang].deleteSuccess);
+            loadRestaurants();
+            loadDashboardStats();
+        } else {
+            alert(t[lang].deleteError);
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert(t[lang].deleteError);
+    }
+}
+
+// Close modal
+function closeModal() {
+    document.getElementById('restaurant-modal').classList.remove('active');
+}
+
+// Save restaurant
+document.getElementById('restaurant-form').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const id = document.getElementById('restaurant-id').value;
+    const data = {
+        name_en: document.getElementById('name-en').value,
+        name_zh: document.getElementById('name-zh').value,
+        cuisine_en: document.getElementById('cuisine-en').value,
+        cuisine_zh: document.getElementById('cuisine-zh').value,
+        district_en: document.getElementById('district-en').value,
+        district_zh: document.getElementById('district-zh').value,
+        price: document.getElementById('price').value,
+        phone: document.getElementById('phone').value,
+        address_en: document.getElementById('address-en').value,
+        address_zh: document.getElementById('address-zh').value,
+        opening_hours_en: document.getElementById('opening-hours-en').value,
+        opening_hours_zh: document.getElementById('opening-hours-zh').value,
+        description_en: document.getElementById('description-en').value,
+        description_zh: document.getElementById('description-zh').value,
+        popular_dishes_en: document.getElementById('popular-dishes-en').value,
+        popular_dishes_zh: document.getElementById('popular-dishes-zh').value,
+        url: document.getElementById('url').value
+    };
+
+    try {
+        const url = id ? `/admin/api/restaurants/${id}` : '/admin/api/restaurants';
+        const method = id ? 'PUT' : 'POST';
+
+        const response = await fetch(url, {
+            method: method,
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(data)
+        });
+
+        if (response.ok) {
+            alert(id ? t[lang].updateSuccess : t[lang].addSuccess);
+            closeModal();
+            loadRestaurants();
+            loadDashboardStats();
+        } else if (response.status === 409) {
+            alert(t[lang].duplicateUrl);
+        } else {
+            alert(t[lang].saveError);
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert(t[lang].saveError);
+    }
+});
+
+// Logout
+function logout() {
+    if (confirm(t[lang].logoutConfirm)) {
+        window.location.href = '/admin/logout';
+    }
+}
+
+// AI Service selector change handler
+document.getElementById('ai-service').addEventListener('change', function() {
+    const service = this.value;
+    document.getElementById('ollama-settings').style.display = service === 'ollama' ? 'block' : 'none';
+    document.getElementById('openrouter-settings').style.display = service === 'openrouter' ? 'block' : 'none';
+    document.getElementById('openai-settings').style.display = service === 'openai' ? 'block' : 'none';
+});
+
+// Load settings
+async function loadSettings() {
+    try {
+        const response = await fetch('/admin/api/settings');
+        const data = await response.json();
+
+        // AI Service
+        document.getElementById('ai-service').value = data.ai_service || 'ollama';
+        document.getElementById('ai-service').dispatchEvent(new Event('change'));
+
+        // Ollama
+        document.getElementById('ollama-url').value = data.ollama_url || '';
+        document.getElementById('ollama-model').value = data.ollama_model || '';
+
+        // OpenRouter
+        document.getElementById('openrouter-key').value = data.openrouter_key || '';
+
+        // OpenAI
+        document.getElementById('openai-key').value = data.openai_key || '';
+        document.getElementById('openai-model').value = data.openai_model || 'gpt-4o-mini';
+
+        // Admin
+        document.getElementById('admin-username').value = data.admin_username || '';
+
+        // Load system status
+        loadSystemStatus();
+    } catch (error) {
+        console.error('Error loading settings:', error);
+    }
+}
+
+// Load system status
+async function loadSystemStatus() {
+    try {
+        const response = await fetch('/health');
+        const data = await response.json();
+
+        // Database status
+        const dbStatus = `✅ ${t[lang].dbConnected} - ${data.restaurants_loaded}${t[lang].restaurants_loaded}`;
+        document.getElementById('db-status').innerHTML = dbStatus;
+
+        // AI status
+        let aiStatus = '';
+        if (data.ai_status === 'Connected' || data.ai_status === 'OpenRouter' || data.ai_status === 'OpenAI') {
+            aiStatus = `✅ ${t[lang].connected} - ${data.ai_service}`;
+        } else {
+            aiStatus = `❌ ${t[lang].disconnected} - ${data.ai_service}`;
+        }
+        document.getElementById('ai-status').innerHTML = aiStatus;
+    } catch (error) {
+        console.error('Error loading system status:', error);
+        document.getElementById('db-status').innerHTML = '❌ ' + t[lang].errorLoading;
+        document.getElementById('ai-status').innerHTML = '❌ ' + t[lang].errorLoading;
+    }
+}
+
+// Save settings
+async function saveSettings() {
+    const alertDiv = document.getElementById('settings-alert');
+
+    try {
+        const settings = {
+            ai_service: document.getElementById('ai-service').value,
+            ollama_url: document.getElementById('ollama-url').value,
+            ollama_model: document.getElementById('ollama-model').value,
+            openrouter_key: document.getElementById('openrouter-key').value,
+            openai_key: document.getElementById('openai-key').value,
+            openai_model: document.getElementById('openai-model').value,
+            admin_username: document.getElementById('admin-username').value,
+            admin_password: document.getElementById('admin-password').value
+        };
+
+        const response = await fetch('/admin/api/settings', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(settings)
+        });
+
+        if (response.ok) {
+            alertDiv.className = 'alert alert-success';
+            alertDiv.innerHTML = `<i class="fas fa-check-circle"></i> ${t[lang].settingsSaved}`;
+            alertDiv.style.display = 'flex';
+
+            // Clear password field
+            document.getElementById('admin-password').value = '';
+
+            // Reload system status
+            setTimeout(() => {
+                loadSystemStatus();
+                alertDiv.style.display = 'none';
+            }, 3000);
+        } else {
+            throw new Error('Failed to save settings');
+        }
+    } catch (error) {
+        console.error('Error saving settings:', error);
+        alertDiv.className = 'alert alert-error';
+        alertDiv.innerHTML = `<i class="fas fa-exclamation-circle"></i> ${t[lang].settingsError}`;
+        alertDiv.style.display = 'flex';
+    }
+}
+
+// Analytics variables
+let cuisineChart, districtChart, budgetChart, trendChart;
+let currentPage = 1;
+let totalPages = 1;
+let searchHistoryData = [];
+let historyCursors = [null];  // historyCursors[n] = cursor that loads page n + 1
+
+// Load Analytics
+async function loadAnalytics() {
+    try {
+        const response = await fetch('/admin/api/analytics');
+        const data = await response.json();
+
+        // Update stats
+        document.getElementById('total-searches').textContent = data.total_searches || 0;
+        document.getElementById('unique-users').textContent = data.unique_users || 0;
+        document.getElementById('popular-cuisine-stat').textContent = data.popular_cuisine || '-';
+        document.getElementById('popular-district-stat').textContent = data.popular_district || '-';
+
+        // Create charts
+        createCuisineChart(data.cuisine_stats || {});
+        createDistrictChart(data.district_stats || {});
+        createBudgetChart(data.budget_stats || {});
+        createTrendChart(data.trend_data || []);
+    } catch (error) {
+        console.error('Error loading analytics:', error);
+    }
+}
+
+// Create Cuisine Chart
+function createCuisineChart(data) {
+    const ctx = document.getElementById('cuisine-chart');
+    if (cuisineChart) cuisineChart.destroy();
+
+    cuisineChart = new Chart(ctx, {
+        type: 'doughnut',
+        data: {
+            labels: Object.keys(data),
+            datasets: [{
+                data: Object.values(data),
+                backgroundColor: [
+                    '#43a047', '#66bb6a', '#81c784', '#a5d6a7', '#c8e6c9',
+                    '#e8f5e9', '#42a5f5', '#ffa726', '#ab47bc', '#ef5350'
+                ]
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: { position: 'right' }
+            }
+        }
+    });
+}
+
+// Create District Chart
+function createDistrictChart(data) {
+    const ctx = document.getElementById('district-chart');
+    if (districtChart) districtChart.destroy();
+
+    districtChart = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: Object.keys(data),
+            datasets: [{
+                label: lang === 'zh' ? '搜尋次數' : 'Searches',
+                data: Object.values(data),
+                backgroundColor: '#43a047'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: { display: false }
+            }
+        }
+    });
+}
+
+// Create Budget Chart
+function createBudgetChart(data) {
+    const ctx = document.getElementById('budget-chart');
+    if (budgetChart) budgetChart.destroy();
+
+    budgetChart = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: Object.keys(data),
+            datasets: [{
+                label: lang === 'zh' ? '搜尋次數' : 'Searches',
+                data: Object.values(data),
+                backgroundColor: '#42a5f5'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            indexAxis: 'y'
+        }
+    });
+}
+
+// Create Trend Chart
+function createTrendChart(data) {
+    const ctx = document.getElementById('trend-chart');
+    if (trendChart) trendChart.destroy();
+
+    trendChart = new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: data.map(d => d.date),
+            datasets: [{
+                label: lang === 'zh' ? '搜尋次數' : 'Searches',
+                data: data.map(d => d.count),
+                borderColor: '#43a047',
+                backgroundColor: 'rgba(67, 160, 71, 0.1)',
+                tension: 0.4,
+                fill: true
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false
+        }
+    });
+}
+
+// Load Search History
+async function loadSearchHistory(page = 1, filter = 'all') {
+    try {
+        if (page === 1) {
+            historyCursors = [null];
+        }
+        const params = new URLSearchParams({ page, filter });
+        if (historyCursors[page - 1]) {
+            params.set('cursor', historyCursors[page - 1]);
+        }
+        const response = await fetch(`/admin/api/search-history?${params}`);
+        const data = await response.json();
+
+        searchHistoryData = data.history || [];
+        currentPage = data.current_page || 1;
+        totalPages = data.total_pages || 1;
+        historyCursors[currentPage] = data.next_cursor || null;
+
+        displaySearchHistory(searchHistoryData);
+        updatePagination();
+    } catch (error) {
+        console.error('Error loading search history:', error);
+        document.getElementById('search-history-tbody').innerHTML = `
+            <tr><td colspan="7" style="text-align: center; color: red;">${lang === 'zh' ? '載入失敗' : 'Failed to load'}</td></tr>
+        `;
+    }
+}
+
+// Display Search History
+function displaySearchHistory(history) {
+    const tbody = document.getElementById('search-history-tbody');
+
+    if (history.length === 0) {
+        tbody.innerHTML = `
+            <tr><td colspan="7" style="text-align: center; padding: 40px;">${lang === 'zh' ? '沒有搜尋記錄' : 'No search history'}</td></tr>
+        `;
+        return;
+    }
+
+    tbody.innerHTML = history.map(h => `
+        <tr>
+            <td>${new Date(h.timestamp).toLocaleString(lang === 'zh' ? 'zh-HK' : 'en-US')}</td>
+            <td style="max-width: 200px; overflow: hidden; text-overflow: ellipsis;">${h.preferences || '-'}</td>
+            <td>${h.cuisine || '-'}</td>
+            <td>${h.district || '-'}</td>
+            <td><span class="badge badge-blue">${h.budget || '-'}</span></td>
+            <td>${h.results_count || 0}</td>
+            <td>${h.language === 'zh' ? '中文' : 'English'}</td>
+        </tr>
+    `).join('');
+}
+
+// Update Pagination
+function updatePagination() {
+    document.getElementById('page-info').textContent = lang === 'zh' 
+        ? `第 ${currentPage} / ${totalPages} 頁`
+        : `Page ${currentPage} of ${totalPages}`;
+    document.getElementById('prev-btn').disabled = currentPage === 1;
+    document.getElementById('next-btn').disabled = currentPage >= totalPages || !historyCursors[currentPage];
+}
+
+// Pagination functions
+function previousPage() {
+    if (currentPage > 1) {
+        loadSearchHistory(currentPage - 1, document.getElementById('history-filter').value);
+    }
+}
+
+function nextPage() {
+    if (currentPage < totalPages && historyCursors[currentPage]) {
+        loadSearchHistory(currentPage + 1, document.getElementById('history-filter').value);
+    }
+}
+
+function filterSearchHistory() {
+    const filter = document.getElementById('history-filter').value;
+    loadSearchHistory(1, filter);
+}
+
+// Export Search History
+function exportSearchHistory() {
+    const csv = [
+        ['Time', 'Preferences', 'Cuisine', 'District', 'Budget', 'Results', 'Language'],
+        ...searchHistoryData.map(h => [
+            new Date(h.timestamp).toLocaleString(),
+            h.preferences || '-',
+            h.cuisine || '-',
+            h.district || '-',
+            h.budget || '-',
+            h.results_count || 0,
+            h.language === 'zh' ? '中文' : 'English'
+        ])
+    ].map(row => row.join(',')).join('\n');
+
+    const blob = new Blob([csv], { type: 'text/csv' });
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = `search_history_${new Date().toISOString().split('T')[0]}.csv`;
+    a.click();
+}
+
+// Clear Search History
+async function clearSearchHistory() {
+    if (!confirm(lang === 'zh' ? '確定要清除所有搜尋記錄嗎？' : 'Are you sure you want to clear all search history?')) {
+        return;
+    }
+
+    try {
+        const response = await fetch('/admin/api/search-history', { method: 'DELETE' });
+        if (response.ok) {
+            alert(lang === 'zh' ? '搜尋記錄已清除' : 'Search history cleared');
+            loadSearchHistory();
+        }
+    } catch (error) {
+        console.error('Error clearing history:', error);
+        alert(lang === 'zh' ? '清除失敗' : 'Failed to clear');
+    }
+}
+
+// Initialize
+loadDashboardStats();
+
+// Load settings when settings tab is opened
+document.querySelector('[data-section="settings"]').addEventListener('click', function() {
+    loadSettings();
+});
+
+// Load analytics when analytics tab is opened
+document.querySelector('[data-section="analytics"]').addEventListener('click', function() {
+    loadAnalytics();
+});
+
+// Load search history when search history tab is opened
+document.querySelector('[data-section="search-history"]').addEventListener('click', function() {
+    loadSearchHistory();
+});
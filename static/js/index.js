@@ -0,0 +1,1009 @@
+const chatForm = document.getElementById('chatForm');
+const chatInput = document.getElementById('chatInput');
+const chatMessages = document.getElementById('chatMessages');
+const typingIndicator = document.getElementById('typingIndicator');
+const sendBtn = document.getElementById('sendBtn');
+const currentLang = document.getElementById('currentLang').value;
+
+// Store current recommendations
+let currentRecommendations = [];
+let shownCount = 0;
+// Cursor for the rest of the server-side ranking (see /recommend/more)
+let nextCursor = null;
+let serverRemaining = 0;
+
+// Store conversation history for context
+let conversationHistory = [];
+
+// Modal functions
+async function openModal(index) {
+    let restaurant = window[`restaurant_${index}`];
+    if (!restaurant) {
+        console.error('Restaurant not found:', index);
+        return;
+    }
+
+    // Results come without descriptions; fetch the full details once
+    if (restaurant.truncated && restaurant.id) {
+        try {
+            const response = await fetch(`/restaurant/${restaurant.id}?lang=${currentLang}&projection=lang`);
+            const data = await response.json();
+            if (data.success) {
+                restaurant = Object.assign({}, restaurant, data.restaurant, { truncated: false });
+                window[`restaurant_${index}`] = restaurant;
+            }
+        } catch (err) {
+            console.error('Failed to load restaurant details:', err);
+        }
+    }
+
+    const modal = document.getElementById('restaurantModal');
+    const isZh = currentLang === 'zh';
+
+    const name = isZh && restaurant.name_zh ? restaurant.name_zh : restaurant.name_en;
+    const nameAlt = isZh ? restaurant.name_en : restaurant.name_zh;
+    const cuisine = isZh && restaurant.cuisine_zh ? restaurant.cuisine_zh : restaurant.cuisine_en;
+    const district = isZh && restaurant.district_zh ? restaurant.district_zh : restaurant.district_en;
+    const address = isZh && restaurant.address_zh ? restaurant.address_zh : restaurant.address_en;
+    const description = isZh && restaurant.description_zh ? restaurant.description_zh : restaurant.description_en;
+    const popularDishes = isZh && restaurant.popular_dishes_zh ? restaurant.popular_dishes_zh : restaurant.popular_dishes_en;
+    const openingHours = isZh && restaurant.opening_hours_zh ? restaurant.opening_hours_zh : restaurant.opening_hours_en;
+
+    document.getElementById('modalRestaurantName').textContent = name;
+    document.getElementById('modalRestaurantNameAlt').textContent = nameAlt || '';
+
+    const modalBody = document.getElementById('modalBody');
+    modalBody.innerHTML = `
+        <div class="modal-info-grid">
+            <div class="modal-info-item">
+                <div class="modal-info-label">${isZh ? '菜系' : 'Cuisine'}</div>
+                <div class="modal-info-value">${cuisine}</div>
+            </div>
+            <div class="modal-info-item">
+                <div class="modal-info-label">${isZh ? '地區' : 'District'}</div>
+                <div class="modal-info-value">${district}</div>
+            </div>
+            <div class="modal-info-item">
+                <div class="modal-info-label">${isZh ? '價格' : 'Price'}</div>
+                <div class="modal-info-value">${restaurant.price}</div>
+            </div>
+            ${restaurant.phone ? `
+            <div class="modal-info-item">
+                <div class="modal-info-label">${isZh ? '電話' : 'Phone'}</div>
+                <div class="modal-info-value">${restaurant.phone}</div>
+            </div>
+            ` : ''}
+        </div>
+
+        <div class="modal-rating">
+            <div class="modal-rating-item">
+                <div class="modal-rating-icon" style="color: #4caf50;">😊</div>
+                <div class="modal-rating-count">${restaurant.rating_smile}</div>
+                <div style="font-size: 0.85rem; color: #666;">${isZh ? '滿意' : 'Happy'}</div>
+            </div>
+            <div class="modal-rating-item">
+                <div class="modal-rating-icon" style="color: #ff9800;">😐</div>
+                <div class="modal-rating-count">${restaurant.rating_ok}</div>
+                <div style="font-size: 0.85rem; color: #666;">${isZh ? '一般' : 'Okay'}</div>
+            </div>
+            <div class="modal-rating-item">
+                <div class="modal-rating-icon" style="color: #f44336;">😢</div>
+                <div class="modal-rating-count">${restaurant.rating_cry}</div>
+                <div style="font-size: 0.85rem; color: #666;">${isZh ? '不滿' : 'Sad'}</div>
+            </div>
+        </div>
+
+        ${description ? `
+        <div class="modal-section">
+            <div class="modal-section-title">
+                <i class="fas fa-info-circle"></i>
+                ${isZh ? '關於餐廳' : 'About'}
+            </div>
+            <div class="modal-section-content">${description}</div>
+        </div>
+        ` : ''}
+
+        ${popularDishes ? `
+        <div class="modal-section">
+            <div class="modal-section-title">
+                <i class="fas fa-fire"></i>
+                ${isZh ? '熱門菜式' : 'Popular Dishes'}
+            </div>
+            <div class="modal-dishes">${popularDishes}</div>
+        </div>
+        ` : ''}
+
+        <div class="modal-section">
+            <div class="modal-section-title">
+                <i class="fas fa-map-marker-alt"></i>
+                ${isZh ? '地址' : 'Address'}
+            </div>
+            <div class="modal-section-content">${address}</div>
+
+            <div style="margin-top: 15px;">
+                <a href="https://www.google.com/maps/search/?api=1&query=${encodeURIComponent(name + ' ' + address + ' Hong Kong')}" 
+                   target="_blank" 
+                   style="display: inline-flex; align-items: center; justify-content: center; gap: 8px; padding: 12px 24px; background: linear-gradient(135deg, #66bb6a 0%, #43a047 100%); color: white; text-decoration: none; border-radius: 10px; font-weight: 500; transition: all 0.3s ease; box-shadow: 0 2px 8px rgba(67, 160, 71, 0.3); width: 100%;"
+                   onmouseover="this.style.transform='translateY(-2px)'; this.style.boxShadow='0 4px 12px rgba(67, 160, 71, 0.4)';"
+                   onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 2px 8px rgba(67, 160, 71, 0.3)';">
+                    <i class="fas fa-directions"></i>
+                    ${isZh ? '🗺️ 在 Google Maps 查看位置' : '🗺️ View Location on Google Maps'}
+                </a>
+            </div>
+        </div>
+
+        ${openingHours ? `
+        <div class="modal-section">
+            <div class="modal-section-title">
+                <i class="fas fa-clock"></i>
+                ${isZh ? '營業時間' : 'Opening Hours'}
+            </div>
+            <div class="modal-section-content">${openingHours}</div>
+        </div>
+        ` : ''}
+
+        <div class="modal-actions">
+            ${restaurant.phone ? `
+            <a href="tel:${restaurant.phone}" class="modal-btn modal-btn-secondary">
+                <i class="fas fa-phone"></i>
+                ${isZh ? '打電話' : 'Call'}
+            </a>
+            ` : ''}
+            ${restaurant.url ? `
+            <a href="${restaurant.url}" target="_blank" class="modal-btn modal-btn-primary">
+                <i class="fas fa-external-link-alt"></i>
+                ${isZh ? '在 OpenRice 查看' : 'View on OpenRice'}
+            </a>
+            ` : ''}
+        </div>
+    `;
+
+    modal.classList.add('active');
+    document.body.style.overflow = 'hidden';
+}
+
+function closeModal() {
+    const modal = document.getElementById('restaurantModal');
+    modal.classList.remove('active');
+    document.body.style.overflow = 'auto';
+}
+
+// Close modal when clicking outside
+document.getElementById('restaurantModal').addEventListener('click', function(e) {
+    if (e.target === this) {
+        closeModal();
+    }
+});
+
+// Auto-resize textarea
+chatInput.addEventListener('input', function() {
+    this.style.height = 'auto';
+    this.style.height = (this.scrollHeight) + 'px';
+});
+
+// Handle Enter key: Enter to send, Alt+Enter for new line
+chatInput.addEventListener('keydown', function(e) {
+    if (e.key === 'Enter' && !e.altKey && !e.shiftKey) {
+        e.preventDefault();
+        chatForm.dispatchEvent(new Event('submit'));
+    }
+});
+
+// Quick suggestions
+document.querySelectorAll('.suggestion-chip').forEach(chip => {
+    chip.addEventListener('click', () => {
+        chatInput.value = chip.dataset.text;
+        chatInput.focus();
+        chatInput.dispatchEvent(new Event('input'));
+    });
+});
+
+// Add message to chat
+function addMessage(text, isUser = false) {
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `message ${isUser ? 'user' : 'ai'}`;
+
+    const avatar = document.createElement('div');
+    avatar.className = 'message-avatar';
+    avatar.textContent = isUser ? '👤' : '🤖';
+
+    const bubble = document.createElement('div');
+    bubble.className = 'message-bubble';
+    bubble.innerHTML = text;
+
+    messageDiv.appendChild(avatar);
+    messageDiv.appendChild(bubble);
+
+    // Insert before typing indicator if it exists in the DOM
+    const typingParent = typingIndicator.parentElement;
+    if (typingParent && chatMessages.contains(typingParent)) {
+        chatMessages.insertBefore(messageDiv, typingParent);
+    } else {
+        // If typing indicator not in DOM, just append
+        chatMessages.appendChild(messageDiv);
+    }
+
+    chatMessages.scrollTop = chatMessages.scrollHeight;
+
+    return messageDiv;
+}
+
+// Show typing indicator
+function showTyping() {
+    typingIndicator.classList.add('active');
+    chatMessages.scrollTop = chatMessages.scrollHeight;
+}
+
+// Hide typing indicator
+function hideTyping() {
+    typingIndicator.classList.remove('active');
+}
+
+// Toggle optional filters
+function toggleOptionalFilters() {
+    const content = document.getElementById('optionalContent');
+    const icon = document.getElementById('filterToggleIcon');
+    content.classList.toggle('expanded');
+    icon.classList.toggle('fa-chevron-down');
+    icon.classList.toggle('fa-chevron-up');
+}
+
+// District data organized by region
+const districtData = {
+    'hk-island': {
+        en: ['Central', 'Admiralty', 'Wan Chai', 'Causeway Bay', 'Tin Hau', 'Fortress Hill', 'North Point', 'Quarry Bay', 'Tai Koo', 'Sai Wan Ho', 'Shau Kei Wan', 'Chai Wan', 'Sheung Wan', 'Sai Ying Pun', 'Kennedy Town', 'Pok Fu Lam', 'Aberdeen', 'Wong Chuk Hang', 'Stanley', 'Repulse Bay', 'Shek O'],
+        zh: ['中環', '金鐘', '灣仔', '銅鑼灣', '天后', '炮台山', '北角', '鰂魚涌', '太古', '西灣河', '筲箕灣', '柴灣', '上環', '西營盤', '堅尼地城', '薄扶林', '香港仔', '黃竹坑', '赤柱', '淺水灣', '石澳']
+    },
+    'kowloon': {
+        en: ['Tsim Sha Tsui', 'Jordan', 'Yau Ma Tei', 'Mong Kok', 'Prince Edward', 'Sham Shui Po', 'Cheung Sha Wan', 'Lai Chi Kok', 'Mei Foo', 'Kowloon Tong', 'Kowloon City', 'To Kwa Wan', 'Hung Hom', 'Whampoa', 'Ho Man Tin', 'Yau Tong', 'Lam Tin', 'Kwun Tong', 'Ngau Tau Kok', 'Kowloon Bay', 'Choi Hung', 'Diamond Hill', 'Wong Tai Sin', 'Lok Fu', 'San Po Kong'],
+        zh: ['尖沙咀', '佐敦', '油麻地', '旺角', '太子', '深水埗', '長沙灣', '荔枝角', '美孚', '九龍塘', '九龍城', '土瓜灣', '紅磡', '黃埔', '何文田', '油塘', '藍田', '觀塘', '牛頭角', '九龍灣', '彩虹', '鑽石山', '黃大仙', '樂富', '新蒲崗']
+    },
+    'nt': {
+        en: ['Tsuen Wan', 'Kwai Chung', 'Tsing Yi', 'Tuen Mun', 'Yuen Long', 'Tin Shui Wai', 'Sheung Shui', 'Fanling', 'Tai Po', 'Sha Tin', 'Ma On Shan', 'Tseung Kwan O', 'Sai Kung', 'Tung Chung', 'Discovery Bay'],
+        zh: ['荃灣', '葵涌', '青衣', '屯門', '元朗', '天水圍', '上水', '粉嶺', '大埔', '沙田', '馬鞍山', '將軍澳', '西貢', '東涌', '愉景灣']
+    }
+};
+
+const regionNames = {
+    'hk-island': { en: 'Hong Kong Island', zh: '港島' },
+    'kowloon': { en: 'Kowloon', zh: '九龍' },
+    'nt': { en: 'New Territories', zh: '新界' }
+};
+
+// Populate dropdown with districts
+function populateDistrictDropdown(filter) {
+    const select = document.getElementById('district');
+    const anyText = currentLang === 'zh' ? '任何地區' : 'Any District';
+
+    // Clear existing options
+    select.innerHTML = `<option value="Any">${anyText}</option>`;
+
+    if (filter === 'all') {
+        // Show all districts grouped by region
+        ['hk-island', 'kowloon', 'nt'].forEach(region => {
+            const optgroup = document.createElement('optgroup');
+            optgroup.label = regionNames[region][currentLang];
+
+            const districts = districtData[region][currentLang];
+            districts.forEach(district => {
+                const option = document.createElement('option');
+                option.value = district;
+                option.textContent = district;
+                optgroup.appendChild(option);
+            });
+
+            select.appendChild(optgroup);
+        });
+    } else {
+        // Show only selected region
+        const districts = districtData[filter][currentLang];
+        districts.forEach(district => {
+            const option = document.createElement('option');
+            option.value = district;
+            option.textContent = district;
+            select.appendChild(option);
+        });
+    }
+}
+
+// Quick filter buttons
+document.querySelectorAll('.quick-filter-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        // Remove active class from all buttons
+        document.querySelectorAll('.quick-filter-btn').forEach(b => {
+            b.classList.remove('active');
+        });
+
+        // Add active class to clicked button
+        btn.classList.add('active');
+
+        const filter = btn.dataset.filter;
+        populateDistrictDropdown(filter);
+    });
+});
+
+// Initialize dropdown on page load
+populateDistrictDropdown('all');
+
+// Chat form submission
+chatForm.addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const userMessage = chatInput.value.trim();
+    if (!userMessage) return;
+
+    // Check if user wants to see more restaurants (must be short and simple request)
+    const isShortMessage = userMessage.length < 20;
+    const wantsMore = isShortMessage && (currentLang === 'zh' 
+        ? /^(想睇多|show more|繼續|其他|more|yes|好|ok|要|睇多)$/i.test(userMessage.trim())
+        : /^(yes|yeah|sure|ok|more|show more|continue)$/i.test(userMessage.trim()));
+
+    if (wantsMore && currentRecommendations.length > 0 && shownCount < currentRecommendations.length) {
+        // Add user message to chat
+        addMessage(userMessage, true);
+
+        // Clear input
+        chatInput.value = '';
+        chatInput.style.height = 'auto';
+
+        // Show typing briefly
+        showTyping();
+        setTimeout(() => {
+            hideTyping();
+            const okMsg = currentLang === 'zh' ? '好！等我show你...' : 'Sure! Let me show you...';
+            addMessage(okMsg);
+            setTimeout(() => {
+                showMoreRestaurants();
+            }, 500);
+        }, 800);
+        return;
+    }
+
+    // Add user message to chat
+    addMessage(userMessage, true);
+
+    // Clear input and hide suggestions
+    chatInput.value = '';
+    chatInput.style.height = 'auto';
+    document.getElementById('quickSuggestions').style.display = 'none';
+
+    // Show typing indicator
+    showTyping();
+
+    // Disable send button
+    sendBtn.disabled = true;
+
+    // Send previous conversation history (before adding current message)
+    const previousHistory = [...conversationHistory]; // Copy before adding new message
+
+    // Add current message to conversation history
+    conversationHistory.push({
+        role: 'user',
+        message: userMessage
+    });
+
+    // Keep only last 5 exchanges for context
+    if (conversationHistory.length > 10) {
+        conversationHistory = conversationHistory.slice(-10);
+    }
+
+    console.log('📤 Sending conversation history:', previousHistory);
+
+    const formData = {
+        preferences: userMessage,
+        budget: document.getElementById('budget').value,
+        district: document.getElementById('district').value,
+        lang: currentLang,
+        conversation_history: previousHistory, // Send previous messages (not including current)
+        // Only our language, no descriptions: the detail view fetches them (openModal)
+        projection: 'lang',
+        description_chars: 0
+    };
+
+    try {
+        const response = await fetch('/recommend', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+
+        hideTyping();
+
+        if (data.success) {
+            // Add AI response to conversation history
+            if (data.analysis && data.analysis.ai_message) {
+                conversationHistory.push({
+                    role: 'assistant',
+                    message: data.analysis.ai_message,
+                    analysis: data.analysis
+                });
+            }
+
+            displayChatResults(data);
+            // Save chat after successful response
+            setTimeout(saveChatHistory, 1000);
+        } else {
+            addMessage(data.error || (currentLang === 'zh' ? '唔好意思，出咗啲問題...' : 'Sorry, something went wrong...'));
+            setTimeout(saveChatHistory, 500);
+        }
+    } catch (err) {
+        hideTyping();
+        addMessage(currentLang === 'zh' ? '😅 唔好意思，連接唔到server... 試下refresh？' : '😅 Oops, couldn\'t connect to the server... Try refreshing?');
+        setTimeout(saveChatHistory, 500);
+    } finally {
+        sendBtn.disabled = false;
+    }
+});
+
+function createRestaurantCard(rest, index) {
+    const isZh = currentLang === 'zh';
+    const name = isZh && rest.name_zh ? rest.name_zh : rest.name_en;
+    const cuisine = isZh && rest.cuisine_zh ? rest.cuisine_zh : rest.cuisine_en;
+    const district = isZh && rest.district_zh ? rest.district_zh : rest.district_en;
+
+    // Store restaurant data for modal
+    window[`restaurant_${index}`] = rest;
+
+    // Format match reasons
+    let reasonsHtml = '';
+    if (rest.match_reasons && rest.match_reasons.length > 0) {
+        reasonsHtml = `
+            <div style="margin-top: 12px; padding: 10px; background: #e8f5e9; border-radius: 8px; border-left: 3px solid #43a047;">
+                <div style="font-size: 0.85rem; font-weight: 600; color: #2e7d32; margin-bottom: 5px;">
+                    ${isZh ? '✨ 推薦原因：' : '✨ Why this match:'}
+                </div>
+                ${rest.match_reasons.map(reason => `
+                    <div style="font-size: 0.85rem; color: #558b2f; margin-top: 3px;">
+                        • ${reason}
+                    </div>
+                `).join('')}
+            </div>
+        `;
+    }
+
+    return `
+        <div style="background: #f8f9fa; padding: 15px; border-radius: 12px; margin-top: 10px;">
+            <div style="font-weight: 600; font-size: 1.1rem; margin-bottom: 8px;">${name}</div>
+            <div style="color: #666; font-size: 0.9rem; margin-bottom: 5px;">
+                ${cuisine} • ${district} • ${rest.price}
+            </div>
+            <div style="display: flex; gap: 10px; margin-top: 10px;">
+                <span style="color: #4caf50;">😊 ${rest.rating_smile}</span>
+                <span style="color: #ff9800;">😐 ${rest.rating_ok}</span>
+                <span style="color: #f44336;">😢 ${rest.rating_cry}</span>
+            </div>
+            ${reasonsHtml}
+            <button class="view-details-btn" data-restaurant-index="${index}" style="display: inline-block; margin-top: 10px; color: #43a047; background: none; border: none; cursor: pointer; font-weight: 500; font-size: 1rem; padding: 0;">${isZh ? '睇詳情 →' : 'View Details →'}</button>
+        </div>
+    `;
+}
+
+// Event delegation for view details buttons and show more buttons
+document.addEventListener('click', function(e) {
+    if (e.target.classList.contains('view-details-btn')) {
+        const index = parseInt(e.target.getAttribute('data-restaurant-index'));
+        openModal(index);
+    }
+
+    if (e.target.classList.contains('show-more-btn')) {
+        showMoreRestaurants();
+    }
+});
+
+async function loadMoreRecommendations(retries = 3) {
+    try {
+        const response = await fetch(`/recommend/more?cursor=${encodeURIComponent(nextCursor)}&lang=${currentLang}&projection=lang&description_chars=0`);
+        if (response.status === 503 && retries > 0) {
+            // The ranking is still being saved by the server that ran the search
+            const delay = Number(response.headers.get('Retry-After') || 1) * 1000;
+            await new Promise(resolve => setTimeout(resolve, delay));
+            return loadMoreRecommendations(retries - 1);
+        }
+        const data = await response.json();
+        if (data.success) {
+            currentRecommendations = currentRecommendations.concat(data.recommendations);
+            nextCursor = data.next_cursor;
+            serverRemaining = data.remaining;
+            return;
+        }
+    } catch (err) {
+        console.error('Failed to load more results:', err);
+    }
+    // Expired or failed: show what is already loaded
+    nextCursor = null;
+    serverRemaining = 0;
+}
+
+async function showMoreRestaurants() {
+    // Fetch the next page of the ranking once the loaded ones run out
+    if (currentRecommendations.length - shownCount < 3 && nextCursor) {
+        await loadMoreRecommendations();
+    }
+
+    const remaining = currentRecommendations.length - shownCount;
+    const toShow = Math.min(3, remaining);
+
+    if (toShow === 0) return;
+
+    // Hide all "Show More" buttons
+    document.querySelectorAll('.show-more-btn').forEach(btn => {
+        btn.style.display = 'none';
+    });
+
+    const nextBatch = currentRecommendations.slice(shownCount, shownCount + toShow);
+
+    nextBatch.forEach((rest, batchIndex) => {
+        setTimeout(() => {
+            addMessage(createRestaurantCard(rest, shownCount + batchIndex));
+        }, batchIndex * 300);
+    });
+
+    shownCount += toShow;
+
+    // Check if there are still more
+    setTimeout(() => {
+        if (shownCount < currentRecommendations.length || nextCursor) {
+            const stillRemaining = currentRecommendations.length - shownCount + serverRemaining;
+            const moreMsg = currentLang === 'zh' 
+                ? `仲有 ${stillRemaining} 間！` 
+                : `${stillRemaining} more left!`;
+
+            const buttonHtml = `
+                <div style="margin-top: 15px;">
+                    <button onclick="showMoreRestaurants()" class="show-more-btn" style="
+                        background: linear-gradient(135deg, #66bb6a 0%, #43a047 100%);
+                        color: white;
+                        border: none;
+                        padding: 12px 24px;
+                        border-radius: 25px;
+                        font-size: 1rem;
+                        font-weight: 600;
+                        cursor: pointer;
+                        box-shadow: 0 4px 12px rgba(67, 160, 71, 0.3);
+                        transition: all 0.3s ease;
+                    " onmouseover="this.style.transform='translateY(-2px)'; this.style.boxShadow='0 6px 16px rgba(67, 160, 71, 0.4)';" onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 12px rgba(67, 160, 71, 0.3)';">
+                        ${currentLang === 'zh' ? '🍽️ 睇多啲選擇' : '🍽️ Show More Options'}
+                    </button>
+                </div>
+            `;
+
+            addMessage(moreMsg + buttonHtml);
+        } else {
+            const doneMsg = currentLang === 'zh'
+                ? '呢啲就係全部啦！鍾意邊間？😊'
+                : 'That\'s all of them! Which one do you like? 😊';
+            addMessage(doneMsg);
+        }
+    }, toShow * 300 + 200);
+}
+
+function displayChatResults(data) {
+    const recommendations = data.recommendations;
+
+    if (recommendations.length === 0) {
+        const msg = currentLang === 'zh' ? '😅 唔好意思，搵唔到完全match你要求嘅餐廳... 試下講得再詳細啲？或者改下條件？' : '😅 Oops, couldn\'t find anything that perfectly matches what you want... Wanna try being more specific or adjust your criteria?';
+        addMessage(msg);
+        return;
+    }
+
+    // Store recommendations
+    currentRecommendations = recommendations;
+    shownCount = 0;
+    nextCursor = data.next_cursor || null;
+    serverRemaining = data.remaining || 0;
+
+    // AI response message - use AI-generated message if available
+    let aiResponse = '';
+
+    if (data.analysis && data.analysis.ai_message) {
+        // Use AI-generated conversational message
+        aiResponse = data.analysis.ai_message + '<br><br>';
+    } else {
+        // Fallback to template
+        if (currentLang === 'zh') {
+            if (data.analysis && data.analysis.cuisine_types && data.analysis.cuisine_types.length > 0) {
+                const cuisines = data.analysis.cuisine_types.join('、');
+                const atmosphere = data.analysis.atmosphere || '';
+                aiResponse = `明白！你想食${cuisines}${atmosphere ? '，要' + atmosphere + '啲嘅feel' : ''}。<br><br>`;
+            }
+        } else {
+            if (data.analysis && data.analysis.cuisine_types && data.analysis.cuisine_types.length > 0) {
+                const cuisines = data.analysis.cuisine_types.join(', ');
+                const atmosphere = data.analysis.atmosphere || '';
+                aiResponse = `Got it! You want ${cuisines}${atmosphere ? ' with a ' + atmosphere + ' vibe' : ''}.<br><br>`;
+            }
+        }
+    }
+
+    // Add result count
+    if (currentLang === 'zh') {
+        aiResponse += `我睇咗 ${data.total_matches} 間餐廳，幫你揀咗最好嘅 ${recommendations.length} 間出嚟！`;
+    } else {
+        aiResponse += `I checked out ${data.total_matches} places and picked the best ${recommendations.length} for you!`;
+    }
+
+    addMessage(aiResponse);
+
+    // Show first 3 restaurants
+    const firstBatch = recommendations.slice(0, 3);
+    firstBatch.forEach((rest, index) => {
+        setTimeout(() => {
+            addMessage(createRestaurantCard(rest, index));
+        }, index * 300);
+    });
+
+    shownCount = firstBatch.length;
+
+    // Add "see more" button if there are more restaurants
+    if (recommendations.length > 3 || nextCursor) {
+        setTimeout(() => {
+            const remaining = recommendations.length - 3 + serverRemaining;
+            const moreMsg = currentLang === 'zh' 
+                ? `仲有 ${remaining} 間餐廳都好match！` 
+                : `I found ${remaining} more great matches!`;
+
+            const buttonHtml = `
+                <div style="margin-top: 15px;">
+                    <button onclick="showMoreRestaurants()" class="show-more-btn" style="
+                        background: linear-gradient(135deg, #66bb6a 0%, #43a047 100%);
+                        color: white;
+                        border: none;
+                        padding: 12px 24px;
+                        border-radius: 25px;
+                        font-size: 1rem;
+                        font-weight: 600;
+                        cursor: pointer;
+                        box-shadow: 0 4px 12px rgba(67, 160, 71, 0.3);
+                        transition: all 0.3s ease;
+                    " onmouseover="this.style.transform='translateY(-2px)'; this.style.boxShadow='0 6px 16px rgba(67, 160, 71, 0.4)';" onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 12px rgba(67, 160, 71, 0.3)';">
+                        ${currentLang === 'zh' ? '🍽️ 睇多啲選擇' : '🍽️ Show More Options'}
+                    </button>
+                </div>
+            `;
+
+            addMessage(moreMsg + buttonHtml);
+        }, 1000);
+    }
+}
+
+function displayResults(data) {
+    displayChatResults(data);
+}
+
+function showError(message) {
+    addMessage('❌ ' + message);
+}
+
+// Old function kept for compatibility
+function oldDisplayResults(data) {
+    const recommendations = data.recommendations;
+    restaurantList.innerHTML = recommendations.map((rest, index) => {
+        const isZh = currentLang === 'zh';
+        const name = isZh && rest.name_zh ? rest.name_zh : rest.name_en;
+        const nameAlt = isZh ? rest.name_en : rest.name_zh;
+        const cuisine = isZh && rest.cuisine_zh ? rest.cuisine_zh : rest.cuisine_en;
+        const district = isZh && rest.district_zh ? rest.district_zh : rest.district_en;
+        const address = isZh && rest.address_zh ? rest.address_zh : rest.address_en;
+        const description = isZh && rest.description_zh ? rest.description_zh : rest.description_en;
+        const popularDishes = isZh && rest.popular_dishes_zh ? rest.popular_dishes_zh : rest.popular_dishes_en;
+        const openingHours = isZh && rest.opening_hours_zh ? rest.opening_hours_zh : rest.opening_hours_en;
+
+        return `
+        <div class="restaurant-card" style="animation-delay: ${index * 0.1}s">
+            <div class="restaurant-header">
+                <div class="restaurant-name">
+                    <h3>${name}</h3>
+                    ${nameAlt ? `<div class="name-zh">${nameAlt}</div>` : ''}
+                </div>
+                <div class="match-badge">
+                    ${rest.match_score}% ${isZh ? '配對' : 'Match'}
+                </div>
+            </div>
+
+            <div class="restaurant-info">
+                <div class="info-item">
+                    <i class="fas fa-utensils"></i>
+                    <span>${cuisine}</span>
+                </div>
+                <div class="info-item">
+                    <i class="fas fa-map-marker-alt"></i>
+                    <span>${district}</span>
+                </div>
+                <div class="info-item">
+                    <i class="fas fa-dollar-sign"></i>
+                    <span>${rest.price}</span>
+                </div>
+                ${rest.phone ? `
+                <div class="info-item">
+                    <i class="fas fa-phone"></i>
+                    <span>${rest.phone}</span>
+                </div>
+                ` : ''}
+            </div>
+
+            <div class="rating">
+                <div class="rating-item smile">
+                    <i class="fas fa-smile"></i>
+                    <span>${rest.rating_smile}</span>
+                </div>
+                <div class="rating-item ok">
+                    <i class="fas fa-meh"></i>
+                    <span>${rest.rating_ok}</span>
+                </div>
+                <div class="rating-item cry">
+                    <i class="fas fa-frown"></i>
+                    <span>${rest.rating_cry}</span>
+                </div>
+            </div>
+
+            ${description ? `
+            <div class="description">
+                ${description}
+            </div>
+            ` : ''}
+
+            ${popularDishes ? `
+            <div class="popular-dishes">
+                <h4><i class="fas fa-fire"></i> ${isZh ? '熱門菜式' : 'Popular Dishes'}</h4>
+                <p>${popularDishes}</p>
+            </div>
+            ` : ''}
+
+            ${rest.match_reasons && rest.match_reasons.length > 0 ? `
+            <div class="match-reasons">
+                <h4><i class="fas fa-check-circle"></i> ${isZh ? '為何推薦？' : 'Why This Match?'}</h4>
+                <ul>
+                    ${rest.match_reasons.map(reason => `<li>${reason}</li>`).join('')}
+                </ul>
+            </div>
+            ` : ''}
+
+            <div class="info-item" style="margin-bottom: 15px;">
+                <i class="fas fa-map-marked-alt"></i>
+                <span>${address}</span>
+            </div>
+
+            ${openingHours ? `
+            <div class="info-item" style="margin-bottom: 15px;">
+                <i class="fas fa-clock"></i>
+                <span>${openingHours}</span>
+            </div>
+            ` : ''}
+
+            <div class="restaurant-actions">
+                ${rest.url ? `
+                <a href="${rest.url}" target="_blank" class="btn-secondary">
+                    <i class="fas fa-external-link-alt"></i>
+                    ${isZh ? '在 OpenRice 查看' : 'View on OpenRice'}
+                </a>
+                ` : ''}
+                ${rest.phone ? `
+                <a href="tel:${rest.phone}" class="btn-secondary">
+                    <i class="fas fa-phone"></i>
+                    ${isZh ? '立即致電' : 'Call Now'}
+                </a>
+                ` : ''}
+            </div>
+        </div>
+    `}).join('');
+
+    results.classList.add('active');
+    results.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+}
+
+function showError(message) {
+    error.textContent = message;
+    error.classList.add('active');
+}
+
+// ===== Chat History Management =====
+let currentChatId = null;
+
+function generateChatId() {
+    return 'chat_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
+}
+
+function saveChatHistory() {
+    const chats = JSON.parse(localStorage.getItem('aieat_chats') || '[]');
+
+    if (!currentChatId) {
+        currentChatId = generateChatId();
+    }
+
+    // Get all messages except welcome and typing indicator
+    const messages = Array.from(chatMessages.querySelectorAll('.message')).filter(msg => 
+        !msg.querySelector('.typing-indicator') && 
+        msg !== chatMessages.firstElementChild
+    ).map(msg => ({
+        isUser: msg.classList.contains('user'),
+        content: msg.querySelector('.message-bubble').innerHTML
+    }));
+
+    console.log('Saving chat, messages count:', messages.length);
+
+    if (messages.length === 0) {
+        console.log('No messages to save');
+        return;
+    }
+
+    // Get first user message as title
+    const firstUserMsg = messages.find(m => m.isUser);
+    const title = firstUserMsg ? 
+        firstUserMsg.content.replace(/<[^>]*>/g, '').substring(0, 50) : 
+        (currentLang === 'zh' ? '新對話' : 'New Chat');
+
+    const chatIndex = chats.findIndex(c => c.id === currentChatId);
+    const chatData = {
+        id: currentChatId,
+        title: title,
+        messages: messages,
+        timestamp: Date.now(),
+        lang: currentLang,
+        recommendations: currentRecommendations,
+        shownCount: shownCount
+    };
+
+    if (chatIndex >= 0) {
+        chats[chatIndex] = chatData;
+    } else {
+        chats.unshift(chatData);
+    }
+
+    // Keep only last 50 chats
+    if (chats.length > 50) {
+        chats.splice(50);
+    }
+
+    localStorage.setItem('aieat_chats', JSON.stringify(chats));
+    console.log('Chat saved successfully:', chatData.id, 'Total chats:', chats.length);
+    loadChatHistory();
+}
+
+function loadChatHistory() {
+    const chats = JSON.parse(localStorage.getItem('aieat_chats') || '[]');
+    const historyContainer = document.getElementById('chatHistory');
+
+    if (chats.length === 0) {
+        historyContainer.innerHTML = `
+            <div style="padding: 20px; text-align: center; color: #888;">
+                ${currentLang === 'zh' ? '暫無對話記錄' : 'No chat history'}
+            </div>
+        `;
+        return;
+    }
+
+    historyContainer.innerHTML = chats.map(chat => {
+        const date = new Date(chat.timestamp);
+        const dateStr = date.toLocaleDateString(currentLang === 'zh' ? 'zh-HK' : 'en-US', {
+            month: 'short',
+            day: 'numeric',
+            hour: '2-digit',
+            minute: '2-digit'
+        });
+
+        return `
+            <div class="chat-history-item ${chat.id === currentChatId ? 'active' : ''}" onclick="loadChat('${chat.id}')">
+                <div class="chat-history-title">${chat.title}</div>
+                <div class="chat-history-date">${dateStr}</div>
+                <div class="chat-history-actions">
+                    <button class="chat-action-btn" onclick="event.stopPropagation(); deleteChat('${chat.id}')">
+                        <i class="fas fa-trash"></i>
+                    </button>
+                </div>
+            </div>
+        `;
+    }).join('');
+}
+
+function loadChat(chatId) {
+    const chats = JSON.parse(localStorage.getItem('aieat_chats') || '[]');
+    const chat = chats.find(c => c.id === chatId);
+
+    if (!chat) {
+        console.log('Chat not found:', chatId);
+        return;
+    }
+
+    console.log('Loading chat:', chat);
+    currentChatId = chatId;
+
+    // Restore recommendations data if available
+    if (chat.recommendations) {
+        currentRecommendations = chat.recommendations;
+        shownCount = chat.shownCount || 0;
+        console.log('Restored recommendations:', currentRecommendations.length, 'shown:', shownCount);
+
+        // Restore restaurant data to window for modal access
+        currentRecommendations.forEach((rest, index) => {
+            window[`restaurant_${index}`] = rest;
+        });
+    } else {
+        currentRecommendations = [];
+        shownCount = 0;
+    }
+
+    // Clear current messages (keep welcome message and typing indicator)
+    const welcomeMsg = chatMessages.firstElementChild.cloneNode(true);
+    const typingMsg = document.querySelector('.typing-indicator').parentElement.cloneNode(true);
+
+    chatMessages.innerHTML = '';
+    chatMessages.appendChild(welcomeMsg);
+
+    // Restore messages
+    if (chat.messages && chat.messages.length > 0) {
+        chat.messages.forEach(msg => {
+            const messageDiv = document.createElement('div');
+            messageDiv.className = `message ${msg.isUser ? 'user' : 'ai'}`;
+
+            const avatar = document.createElement('div');
+            avatar.className = 'message-avatar';
+            avatar.textContent = msg.isUser ? '👤' : '🤖';
+
+            const bubble = document.createElement('div');
+            bubble.className = 'message-bubble';
+            bubble.innerHTML = msg.content;
+
+            messageDiv.appendChild(avatar);
+            messageDiv.appendChild(bubble);
+            chatMessages.appendChild(messageDiv);
+        });
+    } else {
+        console.log('No messages in chat');
+    }
+
+    chatMessages.appendChild(typingMsg);
+    chatMessages.scrollTop = chatMessages.scrollHeight;
+    loadChatHistory();
+}
+
+function deleteChat(chatId) {
+    if (!confirm(currentLang === 'zh' ? '確定要刪除這個對話？' : 'Delete this chat?')) {
+        return;
+    }
+
+    let chats = JSON.parse(localStorage.getItem('aieat_chats') || '[]');
+    chats = chats.filter(c => c.id !== chatId);
+    localStorage.setItem('aieat_chats', JSON.stringify(chats));
+
+    if (currentChatId === chatId) {
+        startNewChat();
+    } else {
+        loadChatHistory();
+    }
+}
+
+function startNewChat() {
+    currentChatId = null;
+
+    // Clear messages (keep welcome)
+    const welcomeMsg = chatMessages.firstElementChild;
+    const typingMsg = chatMessages.querySelector('.message.ai:last-child');
+    chatMessages.innerHTML = '';
+    chatMessages.appendChild(welcomeMsg);
+    chatMessages.appendChild(typingMsg);
+
+    // Clear input
+    chatInput.value = '';
+    chatInput.style.height = 'auto';
+
+    // Show suggestions
+    document.getElementById('quickSuggestions').style.display = 'flex';
+
+    // Reset recommendations and conversation history
+    currentRecommendations = [];
+    shownCount = 0;
+    conversationHistory = [];
+
+    loadChatHistory();
+}
+
+function toggleSidebar() {
+    document.getElementById('sidebar').classList.toggle('open');
+}
+
+// Load chat history on page load
+loadChatHistory();
@@ -0,0 +1,119 @@
+"""
+Admin restaurant API (edits and bulk import) against a throwaway database
+
+Run with: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_tmpdir = tempfile.TemporaryDirectory()
+DB_FILE = os.path.join(_tmpdir.name, 'restaurants.db')
+# Read by db.py and app.py at import time
+os.environ['DATABASE_PATH'] = DB_FILE
+os.environ['AI_SERVICE'] = 'none'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from migrate_to_sqlite import import_restaurants
+
+
+def restaurant(index):
+    return {
+        'name_en': f'Test Kitchen {index}', 'name_zh': f'測試廚房{index}',
+        'cuisine_en': 'Thai', 'cuisine_zh': '泰國菜',
+        'district_en': 'Central', 'district_zh': '中環',
+        'price': '$101-200', 'url': f'https://example.com/r/{index}',
+    }
+
+
+import_restaurants([restaurant(i) for i in range(1, 4)], DB_FILE, verbose=False)
+
+import app as aieat
+
+
+def tearDownModule():
+    aieat.search_writer.stop()
+    aieat.close_thread_connection()
+    _tmpdir.cleanup()
+
+
+class AdminRestaurantUrlTest(unittest.TestCase):
+    def setUp(self):
+        self.client = aieat.app.test_client()
+        with self.client.session_transaction() as session:
+            session['admin_logged_in'] = True
+
+    def assert_not_locked(self):
+        self.assertFalse(aieat.get_db_connection().in_transaction)
+        other = sqlite3.connect(DB_FILE, timeout=0.2)
+        try:
+            other.execute('UPDATE restaurants SET phone = phone WHERE id = 1')
+            other.commit()
+        finally:
+            other.close()
+
+    def test_add_with_existing_url_is_409(self):
+        response = self.client.post('/admin/api/restaurants', json=restaurant(1))
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('url', response.json['error'])
+        self.assert_not_locked()
+
+    def test_update_to_existing_url_is_409(self):
+        response = self.client.put('/admin/api/restaurants/2', json=restaurant(1))
+        self.assertEqual(response.status_code, 409)
+        self.assert_not_locked()
+        url = aieat.get_db_connection().execute('SELECT url FROM restaurants WHERE id = 2').fetchone()[0]
+        self.assertEqual(url, 'https://example.com/r/2')
+
+    def test_add_with_new_url(self):
+        response = self.client.post('/admin/api/restaurants', json=restaurant(10))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json['success'])
+
+
+class AdminImportTest(unittest.TestCase):
+    def setUp(self):
+        self.client = aieat.app.test_client()
+        with self.client.session_transaction() as session:
+            session['admin_logged_in'] = True
+
+    def import_records(self, records):
+        body = '\n'.join(json.dumps(record) for record in records)
+        response = self.client.post('/admin/api/restaurants/import', data=body, content_type='application/x-ndjson')
+        return json.loads(response.data.decode('utf-8').splitlines()[-1])
+
+    def next_id(self):
+        return aieat.get_db_connection().execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'restaurants'").fetchone()[0]
+
+    def test_reimport_updates_without_using_up_ids(self):
+        records = [restaurant(i) for i in range(20, 25)]
+        self.assertEqual(self.import_records(records)['inserted'], 5)
+        seq = self.next_id()
+        records[0]['name_en'] = 'Renamed'
+        summary = self.import_records(records)
+        self.assertEqual((summary['inserted'], summary['updated']), (0, 5))
+        self.assertEqual(self.next_id(), seq)
+        name = aieat.get_db_connection().execute(
+            'SELECT name_en FROM restaurants WHERE url = ?', (records[0]['url'],)).fetchone()[0]
+        self.assertEqual(name, 'Renamed')
+
+    def test_last_record_for_a_url_wins(self):
+        first, last = restaurant(30), restaurant(30)
+        last['name_en'] = 'Last'
+        summary = self.import_records([first, last])
+        self.assertEqual(summary['inserted'], 1)
+        name = aieat.get_db_connection().execute(
+            'SELECT name_en FROM restaurants WHERE url = ?', (first['url'],)).fetchone()[0]
+        self.assertEqual(name, 'Last')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Full-text search over the bilingual restaurant text (SQLite FTS5)
+
+restaurants_fts is an external-content FTS5 index over the name, cuisine,
+district, description and popular dishes columns (EN and ZH), kept in sync
+by triggers like the catalogue stats in db.py. It uses the trigram
+tokenizer, so Chinese text needs no word segmentation: any substring of
+three or more characters matches, in any language.
+
+Trigrams can't index shorter terms, and common Cantonese terms are two
+characters (火鍋, 點心). Those fall back to an instr() scan of the same
+columns inside SQLite, which is still far cheaper than scoring in Python.
+
+relevance_join() limits a restaurants query to FTS hits and exposes their
+BM25 relevance, for the admin search. text_match_condition() is the same
+match as a WHERE condition, for the recommend candidate query (SQL
+retrieval mode), which filters on more than text.
+"""
+
+import sqlite3
+
+# (column, BM25 weight): a hit in the cuisine or name counts more than one
+# buried in a description
+FTS_COLUMNS = [
+    ('name_en', 4.0),
+    ('name_zh', 4.0),
+    ('cuisine_en', 6.0),
+    ('cuisine_zh', 6.0),
+    ('district_en', 2.0),
+    ('district_zh', 2.0),
+    ('description_en', 1.0),
+    ('description_zh', 1.0),
+    ('popular_dishes_en', 2.0),
+    ('popular_dishes_zh', 2.0),
+]
+MIN_TRIGRAM_CHARS = 3
+# The restaurants columns the index covers, for text_match_condition()
+TEXT_COLUMNS = [column for column, _ in FTS_COLUMNS]
+
+_COLUMN_LIST = ', '.join(TEXT_COLUMNS)
+_BM25 = f"bm25(restaurants_fts, {', '.join(str(weight) for _, weight in FTS_COLUMNS)})"
+
+
+def _row_values(row):
+    return ', '.join(f'{row}.{column}' for column in TEXT_COLUMNS)
+
+
+TEXT_SEARCH_SCHEMA = [
+    f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS restaurants_fts USING fts5(
+        {_COLUMN_LIST},
+        content='restaurants', content_rowid='id', tokenize='trigram'
+    )
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS restaurants_fts_insert AFTER INSERT ON restaurants
+    BEGIN
+        INSERT INTO restaurants_fts (rowid, {_COLUMN_LIST}) VALUES (NEW.id, {_row_values('NEW')});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS restaurants_fts_delete AFTER DELETE ON restaurants
+    BEGIN
+        INSERT INTO restaurants_fts (restaurants_fts, rowid, {_COLUMN_LIST})
+        VALUES ('delete', OLD.id, {_row_values('OLD')});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS restaurants_fts_update AFTER UPDATE OF {_COLUMN_LIST} ON restaurants
+    BEGIN
+        INSERT INTO restaurants_fts (restaurants_fts, rowid, {_COLUMN_LIST})
+        VALUES ('delete', OLD.id, {_row_values('OLD')});
+        INSERT INTO restaurants_fts (rowid, {_COLUMN_LIST}) VALUES (NEW.id, {_row_values('NEW')});
+    END
+    ''',
+]
+
+
+def init_text_search(conn):
+    """Create the FTS index and its triggers, building it on first run; False if FTS5 is unavailable"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'restaurants_fts'"
+    ).fetchone()
+    try:
+        for statement in TEXT_SEARCH_SCHEMA:
+            conn.execute(statement)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5 (or older than 3.34, no trigram tokenizer)
+        conn.rollback()
+        return False
+    if not exists:
+        conn.execute("INSERT INTO restaurants_fts (restaurants_fts) VALUES ('rebuild')")
+    conn.commit()
+    return True
+
+
+def fts_match_expression(terms):
+    """FTS5 query matching any of terms as a substring (terms shorter than a trigram are dropped)"""
+    phrases = []
+    for term in terms:
+        term = term.strip()
+        if len(term) >= MIN_TRIGRAM_CHARS:
+            phrases.append('"' + term.replace('"', '""') + '"')
+    return ' OR '.join(phrases)
+
+
+def relevance_join(terms):
+    """(JOIN clause, params) limiting a restaurants query to FTS hits, exposing fts.relevance
+
+    None if no term is long enough for the trigram index.
+    """
+    match = fts_match_expression(terms)
+    if not match:
+        return None
+    return (f'JOIN (SELECT rowid, -{_BM25} AS relevance FROM restaurants_fts '
+            f'WHERE restaurants_fts MATCH ?) AS fts ON fts.rowid = restaurants.id'), [match]
+
+
+def text_match_condition(terms, columns, indexed=True):
+    """(SQL condition, params) true for restaurants rows with any of terms in one of columns
+
+    Terms are matched as case-insensitive substrings, through the trigram
+    index when indexed and by an instr() scan for terms it can't hold.
+    """
+    terms = [term.strip().lower() for term in terms if term and term.strip()]
+    conditions, params = [], []
+    match = fts_match_expression(terms) if indexed else ''
+    if match:
+        conditions.append('restaurants.id IN (SELECT rowid FROM restaurants_fts WHERE restaurants_fts MATCH ?)')
+        params.append(f"{{{' '.join(columns)}}} : ({match})")
+    scan_terms = [term for term in terms if len(term) < MIN_TRIGRAM_CHARS or not match]
+    for column in columns:
+        for term in scan_terms:
+            conditions.append(f'instr(lower({column}), ?) > 0')
+            params.append(term)
+    if not conditions:
+        return '0', []
+    return '(' + ' OR '.join(conditions) + ')', params